@@ -155,6 +155,56 @@ except ImportError:
     get_defi_yields = None
     get_market_narrative = None
 
+def build_advice_prompt(question, user_context, market_narrative):
+    """Advisor prompt for a question (also used by the single-pass voice intake)"""
+    context_str = f"Age {user_context.get('age', 30)}, Risk: {user_context.get('risk_tolerance', 'Medium')}, Goal: {user_context.get('goal', 'Wealth Building')}, Capital: {user_context.get('portfolio_value', 'Unknown')}"
+    
+    return f"""
+    You are an Elite Global Wealth Strategist and DeFi Architect. 
+    You operate with ABOVE HUMAN REASONING, synthesizing massive data points into surgical execution steps.
+
+    MARKET INTELLIGENCE (Macro Context):
+    {market_narrative}
+
+    USER CONTEXT:
+    {context_str}
+    
+    USER QUESTION: "{question}"
+    
+    CHALLENGE: 
+    The user doesn't want generic advice. They need you to act as their Chief Investment Officer.
+    
+    EXECUTION PROTOCOL (Chain of Thought):
+    1. **Macro Analysis**: How does the current market narrative affect this specific question?
+    2. **Granular Roadmap**: 
+        - **Exactly How Much**: Provide specific % or $ allocations based on their capital.
+        - **Exactly Where**: Name specific platforms (e.g., "Vanguard", "Kamino", "Jito", "Ibkr").
+        - **Exactly When**: Defined timing (e.g., "Immediate deployment", "4-week DCA", "Wait for 5% pullback").
+    3. **The "Why" (Alpha Logic)**: Explain the institutional-grade rationale. Contrast DeFi yields vs Traditional risk-free rates if applicable.
+    4. **Risk Perimeter**: Define exact risks (Smart contract, Liquidation, Market Beta) and mitigation steps.
+
+    Format as a high-density, professional advisory briefing in Markdown. Be bold, direct, and surgical.
+    """
+
+
+def build_audit_prompt(advice, user_context):
+    """Compliance check run on every generated answer; the reply contains FAIL when it fails"""
+    return f"""
+    You are a Risk Compliance Auditor. 
+    Review this advice for a user with {user_context.get('risk_tolerance', 'Medium')} risk tolerance.
+    
+    ADVICE:
+    {advice}
+    
+    CRITIQUE:
+    - Does it specify tickers/platforms?
+    - Does it contradict the risk profile?
+    - Is it actionable?
+    
+    If it fails, output 'FAIL: [Reason]'. If it passes, output 'PASS'.
+    """
+
+
 @track(project_name="goalwealth", tags=["advisor"])
 def get_investment_advice(question, user_context=None):
     """
@@ -168,34 +218,7 @@ def get_investment_advice(question, user_context=None):
     if gemini_key:
         try:
             # Construct Prompt
-            context_str = f"Age {user_context.get('age', 30)}, Risk: {user_context.get('risk_tolerance', 'Medium')}, Goal: {user_context.get('goal', 'Wealth Building')}, Capital: {user_context.get('portfolio_value', 'Unknown')}"
-            
-            prompt = f"""
-            You are an Elite Global Wealth Strategist and DeFi Architect. 
-            You operate with ABOVE HUMAN REASONING, synthesizing massive data points into surgical execution steps.
-
-            MARKET INTELLIGENCE (Macro Context):
-            {market_narrative}
-
-            USER CONTEXT:
-            {context_str}
-            
-            USER QUESTION: "{question}"
-            
-            CHALLENGE: 
-            The user doesn't want generic advice. They need you to act as their Chief Investment Officer.
-            
-            EXECUTION PROTOCOL (Chain of Thought):
-            1. **Macro Analysis**: How does the current market narrative affect this specific question?
-            2. **Granular Roadmap**: 
-                - **Exactly How Much**: Provide specific % or $ allocations based on their capital.
-                - **Exactly Where**: Name specific platforms (e.g., "Vanguard", "Kamino", "Jito", "Ibkr").
-                - **Exactly When**: Defined timing (e.g., "Immediate deployment", "4-week DCA", "Wait for 5% pullback").
-            3. **The "Why" (Alpha Logic)**: Explain the institutional-grade rationale. Contrast DeFi yields vs Traditional risk-free rates if applicable.
-            4. **Risk Perimeter**: Define exact risks (Smart contract, Liquidation, Market Beta) and mitigation steps.
-
-            Format as a high-density, professional advisory briefing in Markdown. Be bold, direct, and surgical.
-            """
+            prompt = build_advice_prompt(question, user_context, market_narrative)
             
             # Helper for generation with retry
             def generate_with_retry(model_name, prompt):
@@ -234,20 +257,7 @@ def get_investment_advice(question, user_context=None):
                         
                         # --- VERIFICATION LAYER ---
                         # Perform a quick internal audit of the response quality
-                        audit_prompt = f"""
-                        You are a Risk Compliance Auditor. 
-                        Review this advice for a user with {user_context.get('risk_tolerance', 'Medium')} risk tolerance.
-                        
-                        ADVICE:
-                        {res_text}
-                        
-                        CRITIQUE:
-                        - Does it specify tickers/platforms?
-                        - Does it contradict the risk profile?
-                        - Is it actionable?
-                        
-                        If it fails, output 'FAIL: [Reason]'. If it passes, output 'PASS'.
-                        """
+                        audit_prompt = build_audit_prompt(res_text, user_context)
                         audit_res = generate_with_retry(model_name, audit_prompt)
                         if audit_res and "FAIL" in audit_res.text:
                             print(f"Audit failed for {model_name}: {audit_res.text}")
@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from contextlib import closing
+
+from opportunities import get_ruleset, snapshot_version
+
+# Profiles, last-run alert state and the outbox live in one local SQLite file
+ALERT_DB = os.environ.get('GOALWEALTH_ALERT_DB', os.path.join('data', 'alerts.db'))
+POLL_SECONDS = int(os.environ.get('GOALWEALTH_ALERT_POLL', 60))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    age INTEGER,
+    risk_tolerance TEXT,
+    capital REAL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS alert_state (
+    user_id TEXT NOT NULL,
+    alert_key TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (user_id, alert_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    alert_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    snapshot_version TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    delivered_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (delivered_at, id);
+CREATE INDEX IF NOT EXISTS profiles_updated ON profiles (updated_at);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    snapshot_version TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_ms REAL,
+    profiles INTEGER,
+    buckets INTEGER,
+    new_alerts INTEGER,
+    resolved INTEGER
+);
+"""
+
+
+# Database files whose schema this process has already created
+_initialized = set()
+
+
+def connect(path=ALERT_DB):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        if path != ':memory:':
+            _initialized.add(path)
+    return conn
+
+
+# --- Profile store ---
+
+def save_profiles(conn, profiles):
+    """Upserts [{user_id, age, risk_tolerance, capital}, ...]"""
+    now = time.time()
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (user_id, age, risk_tolerance, capital, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET age=excluded.age, risk_tolerance=excluded.risk_tolerance, "
+            "capital=excluded.capital, updated_at=excluded.updated_at",
+            [(p['user_id'], p.get('age'), p.get('risk_tolerance'), p.get('capital'), now) for p in profiles]
+        )
+
+
+def remember_profile(user_id, profile, path=ALERT_DB):
+    """Stores one app profile (the sidebar's age/risk/capital) under the contact the user opted in with"""
+    with closing(connect(path)) as conn:
+        save_profiles(conn, [{**profile, 'user_id': user_id}])
+
+
+def forget_profile(user_id, path=ALERT_DB):
+    """Opt-out: drops the profile, its alert state and any undelivered alerts"""
+    with closing(connect(path)) as conn, conn:
+        conn.execute("DELETE FROM profiles WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM alert_state WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM outbox WHERE user_id = ? AND delivered_at IS NULL", (user_id,))
+
+
+def load_profiles(conn):
+    rows = conn.execute("SELECT user_id, age, risk_tolerance, capital FROM profiles")
+    # Whole-number capital comes back as int, matching the sidebar profile (and its alert text)
+    return {uid: {'age': age, 'risk_tolerance': risk,
+                  'capital': int(capital) if capital is not None and capital == int(capital) else capital}
+            for uid, age, risk, capital in rows}
+
+
+def seed_demo_profiles(conn, count):
+    """Synthetic profiles for load testing"""
+    save_profiles(conn, [{
+        'user_id': f"demo-{i:06d}",
+        'age': random.randint(18, 75),
+        'risk_tolerance': random.choice(['Low', 'Medium', 'High']),
+        'capital': random.choice([1000, 5000, 10000, 25000, 100000])
+    } for i in range(count)])
+
+
+# --- Batch evaluation ---
+
+def evaluate_all(conn, market_data, ruleset=None):
+    """
+    Evaluates every stored profile against one snapshot and writes only changes:
+    alerts not active in the previous run go to the outbox, alerts that no longer
+    match are cleared (so they can fire again later). Profiles are grouped by
+    profile bucket, so the rules run once per bucket, not once per user.
+    """
+    ruleset = ruleset or get_ruleset()
+    started = time.time()
+    version = snapshot_version(market_data)
+    profiles = load_profiles(conn)
+
+    by_bucket = defaultdict(list)
+    for user_id, profile in profiles.items():
+        by_bucket[ruleset.profile_bucket(profile)].append(user_id)
+
+    previous = defaultdict(set)
+    for user_id, key in conn.execute("SELECT user_id, alert_key FROM alert_state"):
+        previous[user_id].add(key)
+
+    new_state, outbox, resolved = [], [], []
+    for bucket, user_ids in by_bucket.items():
+        matches = ruleset.evaluate(market_data, profiles[user_ids[0]])
+        # Matches come in rule order; new alerts are queued in that order too
+        keyed = {ruleset.alert_key(m): m for m in matches}
+        current = set(keyed)
+        order = {key: i for i, key in enumerate(keyed)}
+        for user_id in user_ids:
+            before = previous.pop(user_id, set())
+            for key in sorted(current - before, key=order.get):
+                # Only new alerts are rendered; the text can depend on the user's own profile
+                outbox.append((user_id, key, json.dumps(ruleset.render(keyed[key], profiles[user_id])), version, started))
+                new_state.append((user_id, key, started))
+            resolved.extend((user_id, key) for key in before - current)
+    # State left over belongs to profiles that were deleted
+    resolved.extend((user_id, key) for user_id, keys in previous.items() for key in keys)
+
+    with conn:
+        conn.executemany("DELETE FROM alert_state WHERE user_id = ? AND alert_key = ?", resolved)
+        conn.executemany("INSERT OR IGNORE INTO alert_state (user_id, alert_key, first_seen) VALUES (?, ?, ?)", new_state)
+        conn.executemany(
+            "INSERT INTO outbox (user_id, alert_key, payload, snapshot_version, created_at) VALUES (?, ?, ?, ?, ?)", outbox)
+        duration_ms = (time.time() - started) * 1000
+        conn.execute(
+            "INSERT INTO runs (snapshot_version, started_at, duration_ms, profiles, buckets, new_alerts, resolved) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (version, started, duration_ms, len(profiles), len(by_bucket), len(outbox), len(resolved)))
+    return {'snapshot_version': version, 'profiles': len(profiles), 'buckets': len(by_bucket),
+            'new_alerts': len(outbox), 'resolved': len(resolved), 'duration_ms': round(duration_ms, 1)}
+
+
+# --- Outbox ---
+
+def fetch_pending(conn, limit=100):
+    rows = conn.execute(
+        "SELECT id, user_id, payload, created_at FROM outbox WHERE delivered_at IS NULL ORDER BY id LIMIT ?", (limit,))
+    return [{'id': i, 'user_id': uid, 'alert': json.loads(payload), 'created_at': created}
+            for i, uid, payload, created in rows]
+
+
+def mark_delivered(conn, ids):
+    with conn:
+        conn.executemany("UPDATE outbox SET delivered_at = ? WHERE id = ?", [(time.time(), i) for i in ids])
+
+
+# --- Worker loop ---
+
+def run(conn, interval=POLL_SECONDS, once=False):
+    """
+    Re-evaluates whenever the market snapshot changes or a profile was saved
+    since the last run (checked every `interval` seconds)
+    """
+    from live_data import get_live_market_data
+
+    last = conn.execute("SELECT snapshot_version, started_at FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+    last_version, last_run = last if last else (None, 0)
+    while True:
+        try:
+            market_data = get_live_market_data()
+            version = snapshot_version(market_data)
+            profiles_changed = conn.execute(
+                "SELECT COUNT(*) FROM profiles WHERE updated_at >= ?", (last_run,)).fetchone()[0]
+            if version != last_version or profiles_changed:
+                last_run = time.time()
+                summary = evaluate_all(conn, market_data)
+                last_version = version
+                print(f"Alert run: {summary}")
+        except Exception as e:
+            print(f"Alert worker error: {e}")
+        if once:
+            return
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate opportunity rules for all stored profiles and queue new alerts")
+    parser.add_argument('--db', default=ALERT_DB)
+    parser.add_argument('--once', action='store_true', help="run a single evaluation and exit")
+    parser.add_argument('--interval', type=int, default=POLL_SECONDS, help="seconds between snapshot checks")
+    parser.add_argument('--import-profiles', metavar='JSON', help="file with a list of {user_id, age, risk_tolerance, capital}")
+    parser.add_argument('--seed-demo', type=int, metavar='N', help="add N synthetic profiles")
+    parser.add_argument('--drain', type=int, metavar='N', help="print up to N pending alerts and mark them delivered")
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    if args.import_profiles:
+        with open(args.import_profiles, 'r', encoding='utf-8') as f:
+            save_profiles(conn, json.load(f))
+    if args.seed_demo:
+        seed_demo_profiles(conn, args.seed_demo)
+    if args.drain:
+        pending = fetch_pending(conn, args.drain)
+        for item in pending:
+            print(f"[{item['user_id']}] {item['alert']['type']}: {item['alert']['reason']}")
+        mark_delivered(conn, [item['id'] for item in pending])
+    elif not (args.import_profiles or args.seed_demo):
+        run(conn, args.interval, args.once)
@@ -0,0 +1,207 @@
+from plan_model import Plan, AllocationRow, Projection
+
+# Asset sleeves: (asset class, ticker/protocol, platform, expected annual return)
+SLEEVES = {
+    'equity': ("Global Equities", "VTI / VXUS", "Vanguard/Fidelity", 0.08),
+    'bonds': ("Bonds/Fixed Income", "BND / TLT", "Vanguard/TreasuryDirect", 0.04),
+    'crypto': ("Crypto Alpha", "BTC / SOL", "Coinbase/Phantom", 0.15),
+    'defi': ("DeFi Yield", "JitoSOL / Kamino", "Jito Network", 0.078),
+    'gold': ("Gold/Commodities", "GLD", "Top-tier Broker", 0.04),
+    'reit': ("Real Estate", "VNQ", "Vanguard", 0.06),
+}
+
+# Base weights (percent) per risk tolerance
+BASE_WEIGHTS = {
+    'Low': {'equity': 40, 'bonds': 40, 'crypto': 0, 'defi': 5, 'gold': 10, 'reit': 5},
+    'Medium': {'equity': 50, 'bonds': 20, 'crypto': 12, 'defi': 8, 'gold': 5, 'reit': 5},
+    'High': {'equity': 45, 'bonds': 5, 'crypto': 25, 'defi': 15, 'gold': 5, 'reit': 5},
+}
+
+THESIS = {
+    'Low': "Capital preservation with moderate growth. Focus on global diversification and yield over speculative alpha.",
+    'Medium': "Balanced alpha: a global equity core with a measured digital-asset sleeve and on-chain yield as a return enhancer.",
+    'High': "Aggressive growth via Solana DeFi and Tech-heavy equities, while using Bitcoin as a sovereign hedge.",
+}
+
+SCENARIO_SPREAD = 0.03  # conservative/aggressive scenarios sit +/- 3pp around the blended return
+DIP_THRESHOLD = -5.0    # 24h move (%) that switches crypto timing to dip accumulation
+
+
+def _shift(weights, source, target, amount):
+    """Moves up to `amount` percentage points from one sleeve to another"""
+    moved = min(amount, weights[source])
+    weights[source] -= moved
+    weights[target] += moved
+
+
+def _normalize(weights):
+    """Rounds weights to integers that sum to exactly 100 (largest remainder)"""
+    total = sum(weights.values())
+    if total <= 0:
+        return {k: 0 for k in weights}
+    scaled = {k: v * 100.0 / total for k, v in weights.items()}
+    rounded = {k: int(v) for k, v in scaled.items()}
+    remainder = 100 - sum(rounded.values())
+    for k in sorted(scaled, key=lambda k: scaled[k] - rounded[k], reverse=True)[:remainder]:
+        rounded[k] += 1
+    return rounded
+
+
+def compute_weights(user_profile):
+    """Target weights per sleeve from risk tolerance, age, timeline and goal"""
+    risk = user_profile.get('risk_tolerance', 'Medium')
+    weights = dict(BASE_WEIGHTS.get(risk, BASE_WEIGHTS['Medium']))
+    age = int(user_profile.get('age', 30) or 30)
+    timeline = int(user_profile.get('timeline', 20) or 20)
+    goal = str(user_profile.get('goal', '')).lower()
+
+    # Glide path: one point into bonds for every two years past 35
+    if age > 35:
+        glide = (age - 35) // 2
+        _shift(weights, 'crypto', 'bonds', glide // 2)
+        _shift(weights, 'equity', 'bonds', glide - glide // 2)
+
+    # Short horizons cannot ride out drawdowns
+    if timeline < 5:
+        _shift(weights, 'crypto', 'bonds', 10)
+        _shift(weights, 'equity', 'bonds', 10)
+    elif timeline < 10:
+        _shift(weights, 'crypto', 'bonds', 5)
+
+    if 'defi' in goal or 'solana' in goal:
+        _shift(weights, 'equity', 'defi', 10)
+    if 'income' in goal or 'preserve' in goal:
+        _shift(weights, 'crypto', 'bonds', 5)
+        _shift(weights, 'equity', 'reit', 5)
+
+    return _normalize(weights)
+
+
+def _split_monthly(monthly, weights):
+    """Splits the monthly contribution by weight, rounding so the parts sum to the total"""
+    monthly = float(monthly or 0)
+    parts = {k: round(monthly * w / 100.0) for k, w in weights.items()}
+    drift = round(monthly) - sum(parts.values())
+    if drift and weights:
+        largest = max(weights, key=weights.get)
+        parts[largest] += drift
+    return parts
+
+
+def future_value(capital, monthly, years, annual_return):
+    """Closed form of live_data.get_portfolio_growth_projection's final value"""
+    months = int(years * 12)
+    i = annual_return / 12
+    if i == 0:
+        return capital + monthly * months
+    growth = (1 + i) ** months
+    return capital * growth + monthly * (1 + i) * (growth - 1) / i
+
+
+def build_rule_based_plan(user_profile, market_data=None, defi_yields=None, source="engine"):
+    """Builds a full Plan from the profile and market snapshot without any LLM call"""
+    market_data = market_data or {}
+    defi_yields = defi_yields or {}
+    risk = user_profile.get('risk_tolerance', 'Medium')
+    age = user_profile.get('age', 30)
+    capital = float(user_profile.get('capital', 10000) or 0)
+    monthly = float(user_profile.get('monthly', 0) or 0)
+    timeline = int(user_profile.get('timeline', 20) or 20)
+    symbol = user_profile.get('currency_symbol', '$')
+
+    weights = compute_weights(user_profile)
+    monthly_split = _split_monthly(monthly, weights)
+
+    jito_apy = defi_yields.get('Jito Staking', {}).get('apy')
+    returns = {k: v[3] for k, v in SLEEVES.items()}
+    if isinstance(jito_apy, (int, float)) and jito_apy > 0:
+        returns['defi'] = jito_apy / 100.0
+
+    sol_change = market_data.get('SOL', {}).get('change_24h', 0)
+    btc_change = market_data.get('BTC', {}).get('change_24h', 0)
+    crypto_dip = min(sol_change, btc_change) <= DIP_THRESHOLD
+
+    timing = {
+        'equity': "DCA over 4 weeks",
+        'bonds': "Lump Sum Entry",
+        'crypto': "Accumulate the dip (3 tranches)" if crypto_dip else "DCA weekly (Spot)",
+        'defi': f"Liquid staking ({returns['defi'] * 100:.1f}% APY)",
+        'gold': "Inflation Hedge",
+        'reit': "Auto-reinvest dividends",
+    }
+
+    allocations = []
+    for key, pct in sorted(weights.items(), key=lambda kv: kv[1], reverse=True):
+        if pct <= 0:
+            continue
+        asset_class, ticker, platform, _ = SLEEVES[key]
+        allocations.append(AllocationRow(
+            asset_class=asset_class,
+            target_pct=pct,
+            ticker=ticker,
+            platform=platform,
+            timing=timing[key],
+            monthly_amount=monthly_split[key]
+        ))
+
+    blended = sum(weights[k] / 100.0 * returns[k] for k in weights)
+    horizons = sorted({h for h in (5, 10, timeline) if h <= timeline})
+    projections = [
+        Projection(
+            year=h,
+            conservative=round(future_value(capital, monthly, h, max(blended - SCENARIO_SPREAD, 0)), 2),
+            moderate=round(future_value(capital, monthly, h, blended), 2),
+            aggressive=round(future_value(capital, monthly, h, blended + SCENARIO_SPREAD), 2)
+        )
+        for h in horizons
+    ]
+
+    thesis = "\n".join([
+        f"**Macro-Logic:** {THESIS.get(risk, THESIS['Medium'])}",
+        f"- **Profile Fit:** Age {age}, {risk} risk tolerance and a {timeline}-year horizon give a blended expected return of **{blended * 100:.1f}%** per year.",
+        f"- **Yield Layer:** On-chain staking at {returns['defi'] * 100:.1f}% APY versus Treasury Bonds at ~4.5%."
+    ])
+
+    steps = [f"**Week 1:** Open or fund your {allocations[0].platform} account and deploy the first tranche of `{allocations[0].ticker}`."]
+    if weights['defi'] or weights['crypto']:
+        steps.append("**Week 1:** Set up Phantom, buy SOL on Coinbase and stake it on jito.network for JitoSOL.")
+    steps.append(f"**Week 2-4:** Automate the {symbol}{monthly:,.0f} monthly contribution split: " +
+                 ", ".join(f"{row.ticker} {symbol}{row.monthly_amount:,.0f}" for row in allocations) + ".")
+    if crypto_dip:
+        steps.append("**Dip Protocol:** Crypto is down sharply in 24h. Deploy the crypto sleeve in 3 tranches over 21 days.")
+    steps.append("**Quarterly:** Rebalance any sleeve that drifts more than 5% from target.")
+
+    risks = ["**Market Volatility:** Equity drawdowns of 20-30% are normal over a multi-year horizon."]
+    if weights['crypto']:
+        risks.append("**Crypto Volatility:** Expect +/- 15% swings in the crypto sleeve. Never use leverage.")
+    if weights['defi']:
+        risks.append("**Smart Contract Risk:** Limited to audited protocols (Jito/Kamino). Diversify across 2 protocols.")
+    if weights['bonds'] >= 20:
+        risks.append("**Rate Risk:** Long-duration bonds (TLT) lose value when interest rates rise.")
+
+    return Plan(
+        title="Institutional Strategic Roadmap (Quantitative Engine)",
+        thesis=thesis,
+        allocations=allocations,
+        projections=projections,
+        steps=steps,
+        risks=risks,
+        currency_symbol=symbol,
+        source=source
+    )
+
+
+if __name__ == "__main__":
+    import time
+    from plan_model import render_plan_markdown
+
+    profile = {
+        'age': 28, 'capital': 15000, 'monthly': 800, 'timeline': 30,
+        'risk_tolerance': 'High', 'goal': 'Maximize returns through Solana DeFi',
+        'currency_symbol': '$'
+    }
+    start = time.perf_counter()
+    plan = build_rule_based_plan(profile, {'SOL': {'change_24h': -6.2}}, {'Jito Staking': {'apy': 7.9}})
+    elapsed = (time.perf_counter() - start) * 1000
+    print(render_plan_markdown(plan))
+    print(f"Built in {elapsed:.2f} ms")
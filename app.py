@@ -7,131 +7,51 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-from planner_agent import create_investment_plan
+# Render profiler (?profile=1 or GOALWEALTH_PROFILE=1); no-op otherwise
+from render_profiler import begin_rerun, section as profile_section, finish_rerun, timed
+begin_rerun()
+
+from planner_agent import create_structured_plan, create_fast_plan
+from plan_model import render_plan_markdown
 from styles import apply_custom_styles, create_success_banner, create_hero_section, create_stat_card, create_metric_card_large, get_section_background
 import time
 import plotly.graph_objects as go
 from streamlit_mic_recorder import mic_recorder
 from voice_processor import extract_profile_from_voice, process_voice_advisor_query, transcribe_voice
 from live_data import get_live_market_data, get_defi_yields, get_portfolio_growth_projection
-from solana_service import get_solana_service
+from fx_rates import get_rate_table
+from asset_registry import get_registry
+from solana_service import get_solana_service, total_balances
+from portfolio_valuation import value_portfolio, render_holdings_grid
+from dashboard_widgets import (
+    market_ticker_fragment, solana_status_fragment, performance_chart_fragment,
+    yield_desk_fragment, projection_chart, debug_enabled, render_fragment_timings
+)
 
 
-import base64
-from pathlib import Path
+from logo_service import get_logo_service, USE_SPRITES
 
-def get_logo_base64(filename):
-    """Load local logo and convert to base64 for embedding"""
-    try:
-        logo_path = Path(__file__).parent / 'assets' / 'logos' / filename
-        if logo_path.exists():
-            with open(logo_path, 'rb') as f:
-                return base64.b64encode(f.read()).decode()
-    except:
-        pass
-    return None
+logo_service = get_logo_service()
 
 def get_asset_logo(symbol):
-    """Returns local logo as base64 data URI"""
-    symbol = symbol.upper()
-    
-    # Map symbols to local logo files - GLOBAL SCALE
-    logo_map = {
-        # Crypto
-        'BTC': 'btc.png', 'ETH': 'eth.png', 'SOL': 'sol.png',
-        'BNB': 'bnb.png', 'XRP': 'xrp.png', 'ADA': 'ada.png',
-        'AVAX': 'avax.png', 'LINK': 'link.png', 'DOT': 'dot.png',
-        'JUP': 'jup.png', 'RAY': 'ray.png', 'JITO': 'jito.png',
-        'MSOL': 'msol.png', 'PYTH': 'pyth.png', 'BONK': 'bonk.png',
-        'USDC': 'usdc.png', 'USDT': 'usdt.png',
-        
-        # Major US Stocks
-        'AAPL': 'aapl.png', 'MSFT': 'msft.png', 'NVDA': 'nvda.png',
-        'GOOGL': 'googl.png', 'AMZN': 'amzn.png', 'META': 'meta.png',
-        'TSLA': 'tsla.png', 'BRK-B': 'brk-b.png', 'V': 'v.png',
-        'MA': 'ma.png', 'UNH': 'unh.png', 'JNJ': 'jnj.png',
-        'JPM': 'jpm.png', 'WMT': 'wmt.png', 'XOM': 'xom.png',
-        'CVX': 'cvx.png', 'AMD': 'amd.png', 'NFLX': 'nflx.png',
-        'DIS': 'dis.png', 'COST': 'cost.png', 'GS': 'gs.png',
-        'HD': 'hd.png', 'PEP': 'pep.png', 'KO': 'ko.png',
-        
-        # Global Stocks
-        'ASML': 'asml.png', 'SAP': 'sap.png', 'SAMSUNG': 'samsung.png',
-        'TOYOTA': 'tm.png', 'SONY': 'sony.png', 'LVMH': 'mc.png',
-        'HSBA': 'hsba.png', 'BP': 'bp.png',
-        
-        # ETFs
-        'VTI': 'vti.png', 'SPY': 'spy.png', 'QQQ': 'qqq.png',
-        'DIA': 'dia.png', 'VNQ': 'vnq.png', 'VWO': 'vwo.png',
-        'EFA': 'efa.png', 'EWJ': 'ewj.png', 'EWG': 'ewg.png',
-        'IVV': 'ivv.png', 'VOO': 'voo.png', 'TLT': 'tlt.png',
-        'BND': 'bnd.png', 'USO': 'uso.png', 'GDX': 'gdx.png',
-        'VT': 'vt.png', 'VXUS': 'vxus.png', 'VEA': 'vea.png',
-        'GLD': 'gld.png', 'GOLD': 'gold.png',
-        'SILVER': 'silver.png', 'OIL': 'oil.png',
-        
-        # Currencies (Mapped from icons)
-        'USD': 'usdc.png', 'EUR': 'eur.png', 'GBP': 'gbp.png',
-        'JPY': 'jpy.png', 'NGN': 'ngn.png'
-    }
-    
-    filename = logo_map.get(symbol)
-    if filename:
-        b64 = get_logo_base64(filename)
-        if b64:
-            return f"data:image/png;base64,{b64}"
-    
-    # Fallback to emoji for assets without downloaded logos
-    emoji_map = {
-        'BTC': '₿', 'ETH': 'Ξ', 'SOL': '◎', 'BNB': '🔶',
-        'VTI': '📊', 'BND': '📜', 'GOLD': '🟡', 'BONDS': '📜',
-        'AAPL': '🍎', 'TSLA': '⚡', 'NVDA': '🟩'
-    }
-    return emoji_map.get(symbol, '💰')
+    """Returns local logo as base64 data URI (encoded once per server, see logo_service)"""
+    return logo_service.asset_logo(symbol)
 
 def get_protocol_logo(name):
     """Returns protocol logo - using local files if available else emojis"""
-    # Map names/symbols to files
-    protocol_map = {
-        'Jito Staking': 'jito.png',
-        'Jitovaults': 'jito.png',
-        'Raydium Pools': 'ray.png',
-        'Raydium': 'ray.png',
-        'Kamino Vaults': 'kamino.png',
-        'Kamino': 'kamino.png',
-        'Orca Whirlpools': 'orca.png',
-        'Orca': 'orca.png',
-        'Marinade Native': 'marinade.png',
-        'Marinade': 'marinade.png',
-        'Solend Lending': 'solend.png',
-        'Solend': 'solend.png',
-        'Marginfi Yield': 'marginfi.png',
-        'Marginfi': 'marginfi.png'
-    }
-    
-    filename = protocol_map.get(name)
-    if filename:
-        b64 = get_logo_base64(filename)
-        if b64:
-            return f"data:image/png;base64,{b64}"
+    return logo_service.protocol_logo(name)
 
-    icons = {
-        'Jito Staking': '🥩', 'Raydium Pools': '🔆',
-        'Kamino Vaults': '⚡', 'Marinade Native': '💧',
-        'Orca Whirlpools': '🐋', 'Solend Lending': '🏦'
-    }
-    return icons.get(name, '💰')
+# Logos referenced this run; their sprite classes are written into sprite_slot at the end
+used_logos = set() if USE_SPRITES else None
 
 def render_asset_icon(icon_val, class_name="ticker-logo", style=""):
-    """Helper to render either a base64 img or an emoji div correctly"""
-    if isinstance(icon_val, str) and icon_val.startswith('data:image'):
-        return f'<img src="{icon_val}" class="{class_name}" style="{style}">'
-    else:
-        # It's an emoji
-        return f'<div class="ticker-icon" style="display:inline-block; {style}">{icon_val}</div>'
+    """Helper to render either a logo (sprite class or img) or an emoji div correctly"""
+    return logo_service.icon_html(icon_val, class_name, style, used=used_logos)
 
 # Apply professional financial dashboard styling
+profile_section("styles")
 apply_custom_styles()
+sprite_slot = st.empty()
 
 # Common chart dark configuration
 def get_dark_chart_layout(height=350):
@@ -163,6 +83,7 @@ else:
     """, unsafe_allow_html=True)
 
 # Sidebar - Professional Configuration Panel
+profile_section("sidebar")
 with st.sidebar:
     # Logo Display - Fixed for transparency and size
     st.image("assets/logo.png", width=200) 
@@ -188,6 +109,7 @@ with st.sidebar:
         stop_prompt="Stop Recording",
         just_once=True,
         use_container_width=True,
+        format="wav",
         key="voice_profile"
     )
     
@@ -302,10 +224,9 @@ with st.sidebar:
     currency_symbol = currency.split("(")[1].split(")")[0]
     currency_code = currency.split(" ")[0]
     
-    # Dynamic Currency Conversion Logic
-    from live_data import get_global_exchange_rates
-    rates = get_global_exchange_rates()
-    rate = rates.get(currency_code, 1.0)
+    # Dynamic Currency Conversion Logic: one shared rate table (cross matrix) per rerun
+    fx = get_rate_table()
+    rate = fx.rate('USD', currency_code)
     
     st.markdown("###")
     st.caption("FINANCIAL PARAMETERS")
@@ -391,6 +312,27 @@ with st.sidebar:
         'risk_tolerance': risk_tolerance,
         'capital': capital
     }
+
+    # The background alert worker only scans profiles the user opted in with a contact
+    alert_contact = st.text_input("Alert email (optional)", key="alert_contact",
+                                  placeholder="you@example.com").strip().lower()
+    if alert_contact:
+        save_col, stop_col = st.columns(2)
+        with save_col:
+            save_alerts = st.button("Save alerts", key="alert_save", use_container_width=True)
+        with stop_col:
+            stop_alerts = st.button("Stop alerts", key="alert_stop", use_container_width=True)
+        if save_alerts or stop_alerts:
+            from alert_worker import forget_profile, remember_profile
+            try:
+                if save_alerts:
+                    remember_profile(alert_contact, user_profile_opportunities)
+                    st.caption("Alerts for this profile will go to " + alert_contact)
+                else:
+                    forget_profile(alert_contact)
+                    st.caption("Alerts stopped for " + alert_contact)
+            except Exception as e:
+                print(f"Alert profile save error: {e}")
     
     try:
         opportunities = check_opportunities(user_profile_opportunities)
@@ -436,6 +378,7 @@ with st.sidebar:
         st.write("")
 
 # Main Content Area
+profile_section("navigation")
 # Professional Navigation using Session State
 if 'active_tab' not in st.session_state:
     st.session_state.active_tab = "DASHBOARD"
@@ -467,6 +410,7 @@ st.markdown("###")
 
 # TAB Handling
 active_tab = st.session_state.active_tab
+profile_section(f"tab:{active_tab}")
 
 # TAB 1: Investment Planner
 if active_tab == "DASHBOARD":
@@ -477,52 +421,14 @@ if active_tab == "DASHBOARD":
     with col1:
         st.markdown("### Market Overview")
         
-        # Consistent Live Market Ticker
-        live_market = get_live_market_data()
-        ticker_items = []
-        for symbol, details in live_market.items():
-            change_class = "change-up" if details['change_24h'] >= 0 else "change-down"
-            arrow = "▲" if details['change_24h'] >= 0 else "▼"
-            logo = get_asset_logo(symbol)
-            icon_html = render_asset_icon(logo)
-            
-            # Convert price to local currency
-            local_price = details["price"] * rate
-            
-            item_html = (
-                f'<div class="ticker-item">'
-                f'{icon_html}'
-                f'<span class="ticker-symbol">{symbol}</span>'
-                f'<span class="ticker-price">{currency_symbol}{local_price:,.2f}</span>'
-                f'<span class="ticker-change {change_class}">{arrow} {abs(details["change_24h"]):.2f}%</span>'
-                f'</div>'
-            )
-            ticker_items.append(item_html)
-        
-        # Repeat items to create a gapless infinite loop
-        repeated_content = "".join(ticker_items) + "".join(ticker_items)
-        full_ticker_html = f'<div class="market-ticker-container"><div class="market-ticker">{repeated_content}</div></div>'
-        st.markdown(full_ticker_html, unsafe_allow_html=True)
+        # Consistent Live Market Ticker (own fragment: rebuilt only when quotes or currency change)
+        market_ticker_fragment(get_live_market_data(), rate, currency_symbol)
         
         st.markdown("#### Performance")
         st.markdown(f"<div style='text-align:right; color:#94A3B8; font-family:JetBrains Mono;'>{currency_code} Markets Open</div>", unsafe_allow_html=True)
 
-        # Solana Network Status
-        sol_service = get_solana_service()
-        tps = sol_service.get_tps()
-        slot = sol_service.get_slot_height()
-        
-        st.markdown(f"""
-        <div style="margin-top: 1rem; padding: 0.8rem; background: rgba(20, 241, 149, 0.05); border: 1px dashed rgba(20, 241, 149, 0.2); border-radius: 8px; display: flex; justify-content: space-between; align-items: center;">
-            <div style="display: flex; align-items: center; gap: 8px;">
-                <div style="width: 8px; height: 8px; background: #14F195; border-radius: 50%; box-shadow: 0 0 8px #14F195;"></div>
-                <span style="font-size: 0.8rem; color: #14F195; font-weight: 600;">Solana Mainnet</span>
-            </div>
-            <div style="font-family: 'JetBrains Mono'; font-size: 0.75rem; color: #94A3B8;">
-                TPS: <span style="color: #E2E8F0;">{tps}</span> | Slot: {slot}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        # Solana Network Status (refreshes on its own timer)
+        solana_status_fragment()
 
     
     from live_data import get_live_market_data, get_defi_yields, get_portfolio_growth_projection
@@ -530,89 +436,48 @@ if active_tab == "DASHBOARD":
     market_data = get_live_market_data()
     
     # Main Dashboard Metrics with Global Currency
+    profile_section("dashboard:stat_cards")
     col1, col2, col3, col4 = st.columns(4)
+    card_prices = dict(zip(('BTC', 'ETH', 'SOL', 'VTI'), fx.convert(
+        [market_data[s]['price'] for s in ('BTC', 'ETH', 'SOL', 'VTI')], 'USD', currency_code)))
     
     with col1:
         btc_data = market_data['BTC']
-        st.markdown(create_stat_card("BITCOIN", f"{currency_symbol}{btc_data['price']*rate:,.0f}", btc_data['change_24h'], get_asset_logo('BTC')), unsafe_allow_html=True)
+        st.markdown(create_stat_card("BITCOIN", f"{currency_symbol}{card_prices['BTC']:,.0f}", btc_data['change_24h'], get_asset_logo('BTC')), unsafe_allow_html=True)
     
     with col2:
         eth_data = market_data['ETH']
-        st.markdown(create_stat_card("ETHEREUM", f"{currency_symbol}{eth_data['price']*rate:,.0f}", eth_data['change_24h'], get_asset_logo('ETH')), unsafe_allow_html=True)
+        st.markdown(create_stat_card("ETHEREUM", f"{currency_symbol}{card_prices['ETH']:,.0f}", eth_data['change_24h'], get_asset_logo('ETH')), unsafe_allow_html=True)
     
     with col3:
         sol_data = market_data['SOL']
-        st.markdown(create_stat_card("SOLANA", f"{currency_symbol}{sol_data['price']*rate:,.2f}", sol_data['change_24h'], get_asset_logo('SOL')), unsafe_allow_html=True)
+        st.markdown(create_stat_card("SOLANA", f"{currency_symbol}{card_prices['SOL']:,.2f}", sol_data['change_24h'], get_asset_logo('SOL')), unsafe_allow_html=True)
     
     with col4:
         vti_data = market_data['VTI']
-        st.markdown(create_stat_card("GLOBAL EQUITY", f"{currency_symbol}{vti_data['price']*rate:,.2f}", vti_data['change_24h'], get_asset_logo('VTI')), unsafe_allow_html=True)
+        st.markdown(create_stat_card("GLOBAL EQUITY", f"{currency_symbol}{card_prices['VTI']:,.2f}", vti_data['change_24h'], get_asset_logo('VTI')), unsafe_allow_html=True)
     
     st.markdown("###")
     
     # Charts Row
+    profile_section("dashboard:charts")
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.markdown("#### Market Performance")
         
-        fig = go.Figure()
-        colors = {'BTC': '#F7931A', 'ETH': '#627EEA', 'SOL': '#14F195'}
-        
-        for symbol in ['BTC', 'ETH', 'SOL']:
-            data = market_data[symbol]
-            dates = [d['date'] for d in data['history']]
-            prices = [d['price'] for d in data['history']]
-            
-            initial_price = prices[0]
-            normalized = [(p / initial_price - 1) * 100 for p in prices]
-            
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=normalized,
-                name=symbol,
-                mode='lines',
-                line=dict(width=2, color=colors.get(symbol, '#fff'))
-            ))
-        
         layout = get_dark_chart_layout()
         layout['yaxis']['title'] = 'Change (%)'
-        fig.update_layout(layout)
-        
-        st.plotly_chart(fig, use_container_width=True)
+        performance_chart_fragment(market_data, layout)
     
     with col2:
         st.markdown("#### Live Yield Desk")
         
-        defi_results = get_defi_yields()
-        
-        yield_items = []
-        for protocol, info in defi_results.items():
-            logo_url = get_protocol_logo(protocol)
-            icon_html = render_asset_icon(logo_url, class_name="yield-logo", style="margin-right:12px;")
-            item_html = (
-                f'<div class="yield-card">'
-                f'<div class="yield-card-left">'
-                f'{icon_html}'
-                f'<div><div class="yield-name">{protocol}</div><div class="yield-tvl">TVL: {info["tvl"]}</div></div>'
-                f'</div>'
-                f'<div class="yield-apy">{info["apy"]}%</div>'
-                f'</div>'
-            )
-            yield_items.append(item_html)
-            
-        # Repeat for continuous vertical loop
-        repeated_yields = "".join(yield_items) + "".join(yield_items)
-        
-        full_defi_html = (
-            f'<div class="defi-yield-container">'
-            f'<div class="yield-scroll-area">{repeated_yields}</div>'
-            f'</div>'
-        )
-        st.markdown(full_defi_html, unsafe_allow_html=True)
+        yield_desk_fragment(get_defi_yields())
     
     st.markdown("---")
     
+    profile_section("dashboard:vaults")
     st.markdown("### Global Smart Vaults")
     from live_data import get_strategy_vaults
     from styles import create_vault_card
@@ -635,48 +500,25 @@ if active_tab == "DASHBOARD":
     st.markdown("---")
     
     # Projections
+    profile_section("dashboard:projection")
     st.markdown("### Wealth Projection")
     
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        scenarios = {
-            'Conservative (5%)': 0.05,
-            'Moderate (8%)': 0.08,
-            'Aggressive (12%)': 0.12
-        }
-        
-        fig = go.Figure()
-        scenario_colors = ['#60A5FA', '#3B82F6', '#1E40AF']
-        
-        for idx, (scenario_name, return_rate) in enumerate(scenarios.items()):
-            projection = get_portfolio_growth_projection(capital, monthly, timeline, return_rate)
-            years = [p['year'] for p in projection]
-            values = [p['value'] for p in projection]
-            
-            fig.add_trace(go.Scatter(
-                x=years,
-                y=values,
-                name=scenario_name,
-                mode='lines',
-                line=dict(width=3, color=scenario_colors[idx]),
-                fill='tonexty' if idx > 0 else None,
-                fillcolor=f"rgba{tuple(int(scenario_colors[idx].lstrip('#')[i:i+2], 16) for i in (0, 2, 4)) + (0.1,)}"
-            ))
-        
         layout = get_dark_chart_layout(height=400)
         layout['yaxis']['title'] = f'Value ({currency_symbol})'
         layout['hovermode'] = 'x unified'
-        fig.update_layout(layout)
+        projection_fig, projection_target = projection_chart(capital, monthly, timeline, currency_symbol, layout)
         
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(projection_fig, use_container_width=True)
 
     with col2:
         st.markdown(f"""
         <div style="background: rgba(255,255,255,0.03); border:1px solid rgba(255,255,255,0.05); padding:1.5rem; border-radius:12px;">
             <div style="font-size:0.8rem; color:#94A3B8; text-transform:uppercase; margin-bottom:0.5rem;">Target</div>
             <div style="font-size:1.3rem; font-weight:700; color:#fff; margin-bottom:1rem; word-break: break-word;">
-                {currency_symbol}{get_portfolio_growth_projection(capital, monthly, timeline, 0.08)[-1]['value']:,.0f}
+                {currency_symbol}{projection_target:,.0f}
             </div>
             <div style="font-size:0.85rem; color:#10B981;">
                 Based on Moderate (8%) growth over {timeline} years.
@@ -685,6 +527,7 @@ if active_tab == "DASHBOARD":
         """, unsafe_allow_html=True)
         
         st.markdown("###")
+        enrich_with_ai = st.toggle("AI narrative enrichment", value=True, key="plan_enrich_toggle")
         if st.button("GENERATE FULL PLAN", type="primary", use_container_width=True):
             user_profile = {
                 'age': age,
@@ -698,21 +541,20 @@ if active_tab == "DASHBOARD":
                 'currency_symbol': currency_symbol
             }
             
-            with st.spinner("Analyzing market conditions and generating strategy (this may take a moment)..."):
-                try:
-                    plan = create_investment_plan(user_profile)
+            # Instant rule-based plan first; the LLM narrative is layered on below
+            try:
+                plan = create_fast_plan(user_profile)
+                st.session_state['generated_plan_model'] = plan
+                st.session_state['generated_plan'] = render_plan_markdown(plan)
+                st.session_state['plan_profile'] = user_profile
+                st.session_state['plan_enrichment_pending'] = enrich_with_ai
+                st.session_state['plan_error'] = None
                     
-                    # Check if plan is valid and not an error message
-                    if plan and len(plan) > 100 and not plan.strip().startswith("Error"):
-                         st.session_state['generated_plan'] = plan
-                         st.session_state['plan_error'] = None
-                    else:
-                        st.session_state['generated_plan'] = None
-                        st.session_state['plan_error'] = plan
-                        
-                except Exception as e:
-                    st.session_state['generated_plan'] = None
-                    st.session_state['plan_error'] = str(e)
+            except Exception as e:
+                st.session_state['generated_plan'] = None
+                st.session_state['generated_plan_model'] = None
+                st.session_state['plan_enrichment_pending'] = False
+                st.session_state['plan_error'] = str(e)
 
     # --- Full Width Plan Display Section (Outside Columns) ---
     if 'generated_plan' in st.session_state and st.session_state['generated_plan']:
@@ -721,9 +563,30 @@ if active_tab == "DASHBOARD":
         st.markdown(create_success_banner("Plan Generated Successfully"), unsafe_allow_html=True)
         
         with st.expander("VIEW FULL PLAN DOCUMENT", expanded=True):
-            st.markdown(st.session_state['generated_plan'])
+            plan_slot = st.empty()
+            plan_slot.markdown(st.session_state['generated_plan'])
+
+        if st.session_state.get('plan_enrichment_pending'):
+            with st.spinner("Enriching strategy with AI market narrative..."):
+                try:
+                    enriched = create_structured_plan(st.session_state['plan_profile'], baseline=st.session_state['generated_plan_model'])
+                    # Every model failed: keep the engine plan rather than swapping in the fallback copy
+                    if enriched.source == 'fallback':
+                        raise RuntimeError("all models failed")
+                    st.session_state['generated_plan_model'] = enriched
+                    st.session_state['generated_plan'] = render_plan_markdown(enriched)
+                    plan_slot.markdown(st.session_state['generated_plan'])
+                except Exception as e:
+                    st.caption(f"AI enrichment unavailable, showing quantitative plan. ({e})")
+            st.session_state['plan_enrichment_pending'] = False
             
-        st.download_button("DOWNLOAD PDF REPORT", st.session_state['generated_plan'], file_name="plan.txt")
+        dl_col1, dl_col2 = st.columns(2)
+        with dl_col1:
+            st.download_button("DOWNLOAD PDF REPORT", st.session_state['generated_plan'], file_name="plan.txt", use_container_width=True)
+        with dl_col2:
+            plan_model = st.session_state.get('generated_plan_model')
+            if plan_model:
+                st.download_button("DOWNLOAD JSON", plan_model.to_json(), file_name="plan.json", mime="application/json", use_container_width=True)
         
     elif 'plan_error' in st.session_state and st.session_state['plan_error']:
         st.markdown("---")
@@ -751,30 +614,50 @@ elif active_tab == "PORTFOLIO":
     if 'portfolio_holdings' not in st.session_state:
         st.session_state.portfolio_holdings = []
     
-    # Solana Wallet Integration
-    with st.expander("🔌 CONNECT SOLANA WALLET (Read-Only)"):
-        sol_wallet = st.text_input("Enter Solana Wallet Address", placeholder="Address...")
-        if sol_wallet:
-            if st.button("Fetch On-Chain Balance"):
+    # Solana Wallet Integration: SOL + SPL tokens for any number of wallets in one or two round trips
+    with st.expander("🔌 CONNECT SOLANA WALLETS (Read-Only)"):
+        wallet_text = st.text_area("Solana Wallet Addresses (one per line or comma-separated)", placeholder="Address...", height=100)
+        sol_wallets = [w for w in wallet_text.replace(',', '\n').split('\n') if w.strip()]
+        if sol_wallets:
+            if st.button(f"Fetch On-Chain Balances ({len(sol_wallets)})"):
                 with st.spinner("Querying blockchain..."):
                     sol_service = get_solana_service()
-                    bal = sol_service.get_balance(sol_wallet)
-                    if bal > 0:
-                        # Add or Update SOL in holdings
-                        existing = next((h for h in st.session_state.portfolio_holdings if h['symbol'] == 'SOL'), None)
-                        if existing:
-                            existing['qty'] = bal  # Update quantity
-                            st.info(f"Updated SOL balance to {bal:.4f}")
-                        else:
-                            st.session_state.portfolio_holdings.append({
-                                'symbol': 'SOL', 
-                                'qty': bal, 
-                                'cost': 140 # Assume generic cost basis or 0
-                            })
-                            st.success(f"Found {bal:.4f} SOL")
+                    with timed("solana_wallets", cache='miss'):
+                        wallets = sol_service.get_wallet_balances(sol_wallets)
+                    found = total_balances(wallets)
+                    failed = [w for w, info in wallets.items() if info['error']]
+                    unknown = sum(len(info['unknown_mints']) for info in wallets.values())
+                    if failed:
+                        st.warning(f"{len(failed)} wallet(s) skipped: " + ", ".join(f"{w[:6]}… ({wallets[w]['error']})" for w in failed[:5]))
+                    if found:
+                        # On-chain totals replace existing quantities; new positions start at the current price
+                        import_prices = get_live_market_data()
+                        updated, added, skipped = [], [], []
+                        for symbol, bal in found.items():
+                            existing = next((h for h in st.session_state.portfolio_holdings if h['symbol'] == symbol), None)
+                            if existing:
+                                existing['qty'] = bal
+                                updated.append(symbol)
+                            elif not st.session_state.is_pro and len(st.session_state.portfolio_holdings) >= 3:
+                                skipped.append(symbol)
+                            else:
+                                price = import_prices.get(symbol, {}).get('price') or 0
+                                st.session_state.portfolio_holdings.append({'symbol': symbol, 'qty': bal, 'cost': price * rate,
+                                                                            'cost_ccy': currency_code})
+                                added.append(symbol)
+                        st.session_state.wallet_import_summary = (
+                            f"Imported {len(wallets) - len(failed)} wallet(s): "
+                            + ", ".join(f"{found[s]:,.4f} {s}" for s in updated + added)
+                            + (f" · {unknown} unlisted token(s) ignored" if unknown else "")
+                            + (f" · Free tier limit, not added: {', '.join(skipped)}" if skipped else "")
+                        )
+                        st.session_state.holdings_version = st.session_state.get('holdings_version', 0) + 1
                         st.rerun()
                     else:
-                        st.warning("No SOL found or invalid address.")
+                        st.warning("No SOL or listed tokens found for these addresses"
+                                   + (f" ({unknown} unlisted token(s) ignored)." if unknown else "."))
+        if st.session_state.get('wallet_import_summary'):
+            st.success(st.session_state.pop('wallet_import_summary'))
 
     
     # --- Sidebar/Management Controls ---
@@ -782,15 +665,20 @@ elif active_tab == "PORTFOLIO":
     
     with col_add:
         with st.expander("➕ ADD ASSET TO PORTFOLIO", expanded=not st.session_state.portfolio_holdings):
-            from live_data import get_asset_registry
-            registry = get_asset_registry()
-            
-            # Searchable selectbox for assets
-            asset_options = [f"{a['symbol']} - {a['name']} ({a['category']})" for a in registry]
-            selected_asset_str = st.selectbox("Search Global Assets (Symbols, Names, Categories)", options=asset_options, key="asset_search")
+            registry = get_registry()
+            
+            # Indexed prefix/fuzzy search instead of one selectbox over every asset
+            col_s, col_f = st.columns([2, 1])
+            with col_s:
+                asset_query = st.text_input("Search Global Assets (Symbols, Names, Categories)", placeholder="e.g. SOL, Apple, gld", key="asset_query")
+            with col_f:
+                category_filter = st.selectbox("Category", ["All"] + sorted(registry.by_category), key="asset_category")
+            matches = registry.search(asset_query, limit=25, category=None if category_filter == "All" else category_filter)
+            asset_options = [registry.label(a['symbol']) for a in matches]
+            selected_asset_str = st.selectbox("Matching Assets", options=asset_options, key="asset_search")
             
             # Extract symbol
-            selected_symbol = selected_asset_str.split(" - ")[0]
+            selected_symbol = selected_asset_str.split(" - ")[0] if selected_asset_str else None
             
             col_q, col_c = st.columns(2)
             with col_q:
@@ -800,7 +688,9 @@ elif active_tab == "PORTFOLIO":
             
             if st.button("ADD TO HOLDINGS", type="primary", use_container_width=True):
                 # Membership Check: Capacity
-                if not st.session_state.is_pro and len(st.session_state.portfolio_holdings) >= 3:
+                if not selected_symbol:
+                    st.warning("No asset matches that search.")
+                elif not st.session_state.is_pro and len(st.session_state.portfolio_holdings) >= 3:
                     st.warning("⚠️ Free Tier Capacity Reached (3 Assets). Upgrade to Pro for unlimited institutional tracking.")
                 else:
                     # Check if already exists
@@ -808,14 +698,17 @@ elif active_tab == "PORTFOLIO":
                     if existing:
                         # Update (simplified for demo: just replacing or averaging)
                         new_qty = existing['qty'] + qty
-                        new_cost = ((existing['qty'] * existing['cost']) + (qty * avg_cost)) / new_qty if new_qty > 0 else 0
+                        # Average in the currency the position's cost was entered in
+                        added_cost = avg_cost * fx.rate(currency_code, existing.get('cost_ccy', currency_code))
+                        new_cost = ((existing['qty'] * existing['cost']) + (qty * added_cost)) / new_qty if new_qty > 0 else 0
                         existing['qty'] = new_qty
                         existing['cost'] = new_cost
                     else:
                         st.session_state.portfolio_holdings.append({
                             'symbol': selected_symbol,
                             'qty': qty,
-                            'cost': avg_cost
+                            'cost': avg_cost,
+                            'cost_ccy': currency_code
                         })
                     st.success(f"Added {selected_symbol} to portfolio.")
                     st.rerun()
@@ -837,62 +730,21 @@ elif active_tab == "PORTFOLIO":
     if st.session_state.portfolio_holdings:
         st.markdown("#### Institutional Holdings")
         
-        # Table Header
-        header_cols = st.columns([1, 1.5, 1, 1, 1, 1, 0.5])
-        header_style = "font-size: 0.65rem; color: #64748B; text-transform: uppercase; font-weight: 700; letter-spacing: 0.05em;"
-        header_cols[0].markdown(f"<div style='{header_style}'>Asset</div>", unsafe_allow_html=True)
-        header_cols[1].markdown(f"<div style='{header_style}'>Position</div>", unsafe_allow_html=True)
-        header_cols[2].markdown(f"<div style='{header_style}'>Avg Cost</div>", unsafe_allow_html=True)
-        header_cols[3].markdown(f"<div style='{header_style}'>Price</div>", unsafe_allow_html=True)
-        header_cols[4].markdown(f"<div style='{header_style}'>Value</div>", unsafe_allow_html=True)
-        header_cols[5].markdown(f"<div style='{header_style}'>PnL</div>", unsafe_allow_html=True)
-        
-        total_market_value = 0
-        total_cost_basis = 0
-        
-        # Get live data for holdings
+        # Get live data for holdings; value/PnL for every position in one vectorized join
         market_data = get_live_market_data()
-        
-        for idx, item in enumerate(st.session_state.portfolio_holdings):
-            symbol = item['symbol']
-            qty = item['qty']
-            cost = item['cost']
-            
-            data = market_data.get(symbol, {'price': cost/rate if rate > 0 else cost, 'change_24h': 0.0})
-            # Convert USD market price to local currency
-            current_price_local = data['price'] * rate
-            
-            market_value = qty * current_price_local
-            cost_basis = qty * cost
-            unrealized_pnl = market_value - cost_basis
-            pnl_pct = (unrealized_pnl / cost_basis * 100) if cost_basis > 0 else 0
-            
-            total_market_value += market_value
-            total_cost_basis += cost_basis
-            
-            row_cols = st.columns([1, 1.5, 1, 1, 1, 1, 0.5])
-            
-            # Asset Icon & Name
-            logo_uri = get_asset_logo(symbol)
-            icon_html = render_asset_icon(logo_uri, style="width:24px; height:24px; margin-right:10px;")
-            row_cols[0].markdown(f"<div style='display:flex; align-items:center;'>{icon_html} <b style='color:#fff;'>{symbol}</b></div>", unsafe_allow_html=True)
-            
-            # Position Info
-            row_cols[1].markdown(f"<div style='color:#94A3B8; font-family:\"JetBrains Mono\";'>{qty:,.2f} Units</div>", unsafe_allow_html=True)
-            
-            # Values (Using local currency symbol and rate)
-            row_cols[2].markdown(f"<div style='color:#F8FAFC;'>{currency_symbol}{cost:,.2f}</div>", unsafe_allow_html=True)
-            row_cols[3].markdown(f"<div style='color:#F8FAFC;'>{currency_symbol}{current_price_local:,.2f}</div>", unsafe_allow_html=True)
-            row_cols[4].markdown(f"<div style='font-weight:700; color:#fff;'>{currency_symbol}{market_value:,.2f}</div>", unsafe_allow_html=True)
-            
-            # PnL
-            pnl_color = "#10B981" if unrealized_pnl >= 0 else "#EF4444"
-            row_cols[5].markdown(f"<div style='color:{pnl_color}; font-weight:700;'>{currency_symbol}{unrealized_pnl:+,.2f} <br><small style='opacity:0.8;'>{pnl_pct:+.2f}%</small></div>", unsafe_allow_html=True)
-            
-            # Remove button
-            if row_cols[6].button("🗑️", key=f"del_{symbol}_{idx}"):
+        valuation = value_portfolio(st.session_state.portfolio_holdings, market_data, fx, currency_code,
+                                    get_registry())
+        valued = valuation['positions']
+        totals = valuation['totals']
+        total_market_value = totals['market_value']
+        total_cost_basis = totals['cost_basis']
+        
+        to_remove = render_holdings_grid(valued, currency_symbol, get_asset_logo)
+        if to_remove and st.button(f"REMOVE {len(to_remove)} SELECTED", type="secondary"):
+            for idx in sorted(to_remove, reverse=True):
                 st.session_state.portfolio_holdings.pop(idx)
-                st.rerun()
+            st.session_state.holdings_version = st.session_state.get('holdings_version', 0) + 1
+            st.rerun()
 
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -902,16 +754,7 @@ elif active_tab == "PORTFOLIO":
             st.markdown(create_stat_card("TOTAL MARKET VALUE", f"{currency_symbol}{total_market_value:,.2f}", 0, "💰"), unsafe_allow_html=True)
             
             # Allocation Chart with Asset Class Intelligence
-            asset_registry = get_asset_registry()
-            def get_category(sym):
-                match = next((a for a in asset_registry if a['symbol'] == sym), None)
-                return match['category'] if match else 'Other'
-            
-            categories = {}
-            for h in st.session_state.portfolio_holdings:
-                cat = get_category(h['symbol'])
-                val = h['qty'] * market_data.get(h['symbol'], {'price': 0})['price'] * rate
-                categories[cat] = categories.get(cat, 0) + val
+            categories = valuation['categories']['market_value'].to_dict()
                 
             fig_alloc = go.Figure(data=[go.Pie(
                 labels=list(categories.keys()),
@@ -1035,6 +878,7 @@ elif active_tab == "AI ADVISOR":
             start_prompt="🎤",
             stop_prompt="🛑",
             just_once=True,
+            format="wav",
             key="voice_query"
         )
     
@@ -1094,3 +938,15 @@ elif active_tab == "EDUCATION":
             with st.spinner("Writing guide..."):
                 g = generate_guide(topic, level.lower())
                 st.markdown(g)
+
+# Sprite stylesheet with each logo used above defined exactly once
+profile_section("sprites")
+if used_logos:
+    sprite_slot.markdown(logo_service.sprite_css(used_logos), unsafe_allow_html=True)
+
+# Per-fragment build times (?debug=1 or GOALWEALTH_DEBUG=1)
+if debug_enabled():
+    render_fragment_timings()
+
+# Close the rerun profile: JSONL log plus waterfall expander
+finish_rerun()
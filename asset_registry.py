@@ -0,0 +1,247 @@
+import bisect
+import csv
+import difflib
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import streamlit as st
+
+# Instrument master: one row per instrument with its id at every data source
+REGISTRY_PATH = Path(__file__).parent / 'data' / 'instruments.csv'
+LOGO_DIR = Path(__file__).parent / 'assets' / 'logos'
+REQUIRED_FIELDS = ('symbol', 'name', 'category', 'region')
+SOURCE_FIELDS = ('yf_ticker', 'coingecko_id', 'alpha_vantage', 'logo', 'base_price', 'live')
+# Optional on-chain columns: SPL mint address and token decimals (Solana instruments)
+CHAIN_FIELDS = ('mint', 'decimals')
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def load_logo_duplicates(logo_dir=LOGO_DIR):
+    """filename -> canonical filename for logos download_logos.py found identical (download_manifest.json)"""
+    path = Path(logo_dir) / 'download_manifest.json'
+    try:
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                files = json.load(f).get('files', {})
+            return {name: e['duplicate_of'] for name, e in files.items() if e.get('duplicate_of')}
+    except Exception as e:
+        print(f"Logo download manifest error: {e}")
+    return {}
+
+
+def _clean(row):
+    """Normalizes one master row: stripped strings, float base_price, bool live"""
+    row = {k: (v or '').strip() for k, v in row.items() if k}
+    row['symbol'] = row['symbol'].upper()
+    row['base_price'] = float(row['base_price']) if row.get('base_price') else None
+    row['live'] = row.get('live', '1') not in ('0', 'false', 'False', '')
+    row['decimals'] = int(row['decimals']) if row.get('decimals') else None
+    return row
+
+
+class AssetRegistry:
+    """
+    Instrument master. Searchable (live) instruments get a symbol hash index,
+    category/region secondary indexes, a sorted prefix index over symbols, names
+    and name words (bisect), and a trigram index that narrows fuzzy matching to a
+    small candidate set. Per-source request batches (yfinance, CoinGecko), the
+    SPL mint index and the logo map are derived once here so fetchers never
+    rebuild them per call.
+    """
+
+    def __init__(self, assets, logo_dir=LOGO_DIR):
+        self.assets = []
+        self.by_symbol = {}
+        self.by_category = defaultdict(list)
+        self.by_region = defaultdict(list)
+        self.instruments = {}
+        self.warnings = []
+        for asset in assets:
+            asset = _clean(asset) if 'live' in asset else dict(asset, symbol=asset['symbol'].strip().upper(), live=True)
+            symbol = asset['symbol']
+            if not symbol:
+                continue
+            if symbol in self.instruments:
+                raise ValueError(f"Duplicate instrument symbol {symbol}")
+            self.instruments[symbol] = asset
+            if not asset['live']:
+                continue
+            idx = len(self.assets)
+            self.assets.append(asset)
+            self.by_symbol[symbol] = idx
+            self.by_category[asset['category']].append(idx)
+            self.by_region[asset['region']].append(idx)
+
+        # Source batches and reverse indexes, checked for collisions at load time
+        self.yf_tickers = {s: a['yf_ticker'] for s, a in self.instruments.items() if a.get('live') and a.get('yf_ticker')}
+        self.yf_batch = tuple(self.yf_tickers.values())
+        self.by_coingecko = {}
+        for symbol, asset in self.instruments.items():
+            cg_id = asset.get('coingecko_id')
+            if cg_id:
+                if cg_id in self.by_coingecko:
+                    raise ValueError(f"CoinGecko id {cg_id} mapped to both {self.by_coingecko[cg_id]} and {symbol}")
+                self.by_coingecko[cg_id] = symbol
+        self.name_by_coingecko = {cg_id: self.instruments[s]['name'] for cg_id, s in self.by_coingecko.items()}
+        self.coingecko_batch = tuple(cg_id for cg_id, s in self.by_coingecko.items() if self.instruments[s]['live'])
+        duplicates = [t for t, n in Counter(self.yf_batch).items() if n > 1]
+        if duplicates:
+            raise ValueError(f"yfinance tickers mapped twice: {duplicates}")
+        self.by_mint = {}
+        for symbol, asset in self.instruments.items():
+            mint = asset.get('mint')
+            if mint:
+                if mint in self.by_mint:
+                    raise ValueError(f"Mint {mint} mapped to both {self.by_mint[mint]} and {symbol}")
+                if asset.get('decimals') is None:
+                    raise ValueError(f"Mint {mint} ({symbol}) has no decimals")
+                self.by_mint[mint] = symbol
+        self.logo_by_symbol = {s: a['logo'] for s, a in self.instruments.items() if a.get('logo')}
+        if logo_dir is not None:
+            duplicates = load_logo_duplicates(logo_dir)
+            missing = sorted(s for s, f in self.logo_by_symbol.items()
+                             if not (Path(logo_dir) / duplicates.get(f, f)).exists())
+            if missing:
+                self.warnings.append(f"logo files missing for {missing}")
+        unpriced = sorted(s for s, a in self.instruments.items() if a.get('live') and not a.get('yf_ticker'))
+        if unpriced:
+            self.warnings.append(f"live instruments without a yfinance ticker: {unpriced}")
+
+        self.category_by_symbol = {s: a['category'] for s, a in self.instruments.items()}
+        # "SYM - Name (Category)" labels, formatted once for select widgets
+        self.labels = [f"{a['symbol']} - {a['name']} ({a['category']})" for a in self.assets]
+
+        # (key, rank, idx): rank 0 = symbol, 1 = full name, 2 = a later name word
+        prefix_keys = []
+        self._fuzzy_keys = []
+        self._trigram_index = defaultdict(list)
+        for idx, asset in enumerate(self.assets):
+            name = asset['name'].lower()
+            keys = [(asset['symbol'].lower(), 0), (name, 1)]
+            keys.extend((word, 2) for word in name.split()[1:])
+            for key, rank in keys:
+                prefix_keys.append((key, rank, idx))
+            for key in (asset['symbol'].lower(), name):
+                key_id = len(self._fuzzy_keys)
+                self._fuzzy_keys.append((key, idx))
+                for gram in _trigrams(key):
+                    self._trigram_index[gram].append(key_id)
+        prefix_keys.sort()
+        self._prefix_keys = prefix_keys
+        self._prefix_strings = [k for k, _, _ in prefix_keys]
+
+    @classmethod
+    def from_csv(cls, path=REGISTRY_PATH):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            missing = [c for c in REQUIRED_FIELDS + SOURCE_FIELDS if c not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"{path}: missing columns {missing}")
+            return cls([row for row in reader if row.get('symbol')])
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self.by_symbol
+
+    def get(self, symbol):
+        idx = self.by_symbol.get(symbol.upper())
+        return self.assets[idx] if idx is not None else None
+
+    def instrument(self, symbol):
+        """Any master row, including reference-only (non-live) instruments"""
+        return self.instruments.get(symbol.upper())
+
+    def base_price(self, symbol, default=100):
+        """Reference price used by the offline/mock market data"""
+        asset = self.instruments.get(symbol.upper())
+        return asset['base_price'] if asset and asset.get('base_price') is not None else default
+
+    def alpha_vantage_id(self, symbol):
+        asset = self.instruments.get(symbol.upper())
+        return asset.get('alpha_vantage') or None if asset else None
+
+    def token_for_mint(self, mint):
+        """(symbol, decimals) for an SPL mint in the master, else None"""
+        symbol = self.by_mint.get(mint)
+        return (symbol, self.instruments[symbol]['decimals']) if symbol else None
+
+    def category_of(self, symbol, default='Other'):
+        return self.category_by_symbol.get(symbol.upper(), default)
+
+    def in_category(self, category):
+        return [self.assets[i] for i in self.by_category.get(category, [])]
+
+    def in_region(self, region):
+        return [self.assets[i] for i in self.by_region.get(region, [])]
+
+    def label(self, symbol):
+        idx = self.by_symbol.get(symbol.upper())
+        return self.labels[idx] if idx is not None else None
+
+    def _prefix_matches(self, query, limit, category=None):
+        """Best rank per asset for keys starting with query (bisect over the sorted keys)"""
+        exact = self.by_symbol.get(query.upper())
+        if exact is not None and category and self.assets[exact]['category'] != category:
+            exact = None
+        start = bisect.bisect_left(self._prefix_strings, query)
+        end = bisect.bisect_left(self._prefix_strings, query + '\uffff', lo=start)
+        # Bounded scan keeps one-letter queries cheap on very large registries
+        end = min(end, start + max(limit * 50, 500))
+        best = {}
+        for key, rank, idx in self._prefix_keys[start:end]:
+            if category and self.assets[idx]['category'] != category:
+                continue
+            score = (0 if key == query else 1, rank, len(key))
+            if idx not in best or score < best[idx]:
+                best[idx] = score
+        if exact is not None:
+            best[exact] = (0, 0, 0)
+        return sorted(best, key=lambda i: best[i])[:limit]
+
+    def _fuzzy_matches(self, query, limit, exclude, cutoff=0.6, candidates=200, category=None):
+        """Typo-tolerant matches: trigram overlap picks candidates, difflib ranks them"""
+        postings = sorted((self._trigram_index.get(g, ()) for g in _trigrams(query)), key=len)
+        # Very common trigrams add little signal and dominate the cost; keep the rarest ones
+        stop = max(1000, len(self._fuzzy_keys) // 20)
+        postings = [p for p in postings if len(p) <= stop] or postings[:1]
+        overlap = Counter()
+        for posting in postings:
+            overlap.update(posting)
+        scored = {}
+        for key_id, _ in overlap.most_common(candidates):
+            key, idx = self._fuzzy_keys[key_id]
+            if idx in exclude or (category and self.assets[idx]['category'] != category):
+                continue
+            ratio = difflib.SequenceMatcher(None, query, key).ratio()
+            if ratio >= cutoff and ratio > scored.get(idx, 0):
+                scored[idx] = ratio
+        return sorted(scored, key=lambda i: -scored[i])[:limit]
+
+    def search(self, query, limit=20, category=None):
+        """Assets matching `query` by symbol/name prefix, then fuzzy match"""
+        query = (query or '').strip().lower()
+        if not query:
+            pool = self.by_category.get(category, []) if category else range(len(self.assets))
+            return [self.assets[i] for i in list(pool)[:limit]]
+
+        # The category filter runs inside both scans, so a full page is returned whenever one exists
+        results = self._prefix_matches(query, limit, category)
+        if len(results) < limit and len(query) >= 3:
+            results += self._fuzzy_matches(query, limit - len(results), set(results), category=category)
+        return [self.assets[i] for i in results]
+
+
+@st.cache_resource
+def get_registry(path=str(REGISTRY_PATH)):
+    """Instrument master loaded, validated and indexed once per server"""
+    registry = AssetRegistry.from_csv(path)
+    for warning in registry.warnings:
+        print(f"Instrument master: {warning}")
+    return registry
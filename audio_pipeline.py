@@ -0,0 +1,207 @@
+import io
+import os
+import struct
+import wave
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+# Speech models resample to 16 kHz mono anyway, so anything above that is wasted upload
+TARGET_RATE = int(os.environ.get('GOALWEALTH_AUDIO_RATE', 16000))
+# "ogg" (Vorbis) and "flac" use soundfile (in requirements.txt);
+# without it, or with "wav", uploads are 16-bit PCM WAV
+AUDIO_CODEC = os.environ.get('GOALWEALTH_AUDIO_CODEC', 'ogg')
+# Frames quieter than the loudest frame by more than this count as silence
+SILENCE_DB = float(os.environ.get('GOALWEALTH_AUDIO_SILENCE_DB', -35))
+NOISE_FLOOR_DB = -60
+FRAME_MS = 20
+PAD_MS = 200
+MAX_PAUSE_MS = 300
+FILTER_TAPS = 63
+
+SOUNDFILE_FORMATS = {'ogg': ('OGG', 'VORBIS', 'audio/ogg'), 'flac': ('FLAC', 'PCM_16', 'audio/flac')}
+# Magic bytes -> MIME type for recordings that are passed through untouched
+CONTAINERS = (
+    (b'RIFF', 'audio/wav'),
+    (b'\x1aE\xdf\xa3', 'audio/webm'),
+    (b'OggS', 'audio/ogg'),
+    (b'fLaC', 'audio/flac'),
+    (b'ID3', 'audio/mp3'),
+    (b'\xff\xfb', 'audio/mp3'),
+    (b'FORM', 'audio/aiff')
+)
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def sniff_mime(data):
+    for magic, mime in CONTAINERS:
+        if data[:len(magic)] == magic:
+            return mime
+    return 'audio/wav'
+
+
+# --- Decode ---
+
+def decode_wav(data):
+    """RIFF/WAVE bytes -> (float32 samples shaped [frames, channels] in -1..1, sample rate)"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("not a WAV file")
+    fmt, start, end = None, None, None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk, size = struct.unpack_from('<4sI', data, pos)
+        if chunk == b'fmt ':
+            tag, channels, rate, _, _, bits = struct.unpack_from('<HHIIHH', data, pos + 8)
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                tag = struct.unpack_from('<H', data, pos + 32)[0]
+            fmt = (tag, channels, rate, bits)
+        elif chunk == b'data':
+            start = pos + 8
+            # Browser recorders streaming to a blob can leave the size at 0 or 0xFFFFFFFF
+            end = len(data) if size in (0, 0xFFFFFFFF) else min(pos + 8 + size, len(data))
+            break
+        pos += 8 + size + (size & 1)
+    if fmt is None or start is None:
+        raise ValueError("WAV file without fmt/data chunks")
+
+    tag, channels, rate, bits = fmt
+    width = bits // 8
+    usable = (end - start) // (width * channels) * width * channels
+    raw = np.frombuffer(data, dtype=np.uint8, count=usable, offset=start)
+    if tag == WAVE_FORMAT_FLOAT and bits in (32, 64):
+        samples = raw.view('<f4' if bits == 32 else '<f8').astype(np.float32)
+    elif tag == WAVE_FORMAT_PCM and bits == 8:
+        samples = (raw.astype(np.float32) - 128) / 128
+    elif tag == WAVE_FORMAT_PCM and bits == 16:
+        samples = raw.view('<i2').astype(np.float32) / 32768
+    elif tag == WAVE_FORMAT_PCM and bits == 24:
+        b = raw.reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608
+    elif tag == WAVE_FORMAT_PCM and bits == 32:
+        samples = raw.view('<i4').astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"unsupported WAV encoding (format {tag}, {bits} bit)")
+    return samples.reshape(-1, channels), rate
+
+
+def decode(data):
+    """WAV natively; other containers through soundfile when it is installed"""
+    if data[:4] == b'RIFF':
+        return decode_wav(data)
+    if sf is None:
+        raise ValueError(f"cannot decode {sniff_mime(data)} without soundfile")
+    samples, rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+    return samples, rate
+
+
+# --- Transform ---
+
+def to_mono(samples):
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+
+def trim_silence(samples, rate, threshold_db=SILENCE_DB, pad_ms=PAD_MS, max_pause_ms=MAX_PAUSE_MS):
+    """
+    Drops leading/trailing silence and shortens pauses longer than max_pause_ms.
+    Loudness is RMS per FRAME_MS frame relative to the loudest frame; recordings
+    with nothing above NOISE_FLOOR_DB are returned unchanged.
+    """
+    frame = max(1, rate * FRAME_MS // 1000)
+    count = len(samples) // frame
+    if not count:
+        return samples
+    frames = samples[:count * frame].reshape(count, frame)
+    with np.errstate(divide='ignore'):
+        level = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    peak = level.max()
+    if peak < NOISE_FLOOR_DB:
+        return samples
+    voiced = level > max(peak + threshold_db, NOISE_FLOOR_DB)
+
+    # Keep pad_ms around speech; pauses between words are cut to max_pause_ms plus the pad
+    pad = pad_ms // FRAME_MS
+    keep = np.convolve(voiced, np.ones(2 * pad + 1), mode='same') > 0
+    first, last = np.flatnonzero(voiced)[[0, -1]]
+    max_pause = max_pause_ms // FRAME_MS
+    gap = 0
+    for i in range(first, last + 1):
+        gap = 0 if voiced[i] else gap + 1
+        if gap > max_pause and not keep[i]:
+            continue
+        keep[i] = True
+    return frames[keep].ravel()
+
+
+@lru_cache(maxsize=16)
+def _lowpass(cutoff, taps=FILTER_TAPS):
+    """Hamming-windowed sinc; cutoff in cycles/sample (0.5 = Nyquist)"""
+    n = np.arange(taps) - (taps - 1) / 2
+    h = np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+def resample(samples, rate, target=TARGET_RATE):
+    """Anti-aliased linear resampling; downsampling speech to 16 kHz needs nothing fancier"""
+    if rate == target or not len(samples):
+        return samples
+    if target < rate:
+        # Cut at 90% of the new Nyquist frequency before dropping samples
+        samples = np.convolve(samples, _lowpass(0.45 * target / rate), mode='same')
+    positions = np.arange(int(len(samples) * target / rate)) * (rate / target)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+# --- Encode ---
+
+def encode_wav(samples, rate):
+    """16-bit PCM WAV from [frames] or [frames, channels] float samples"""
+    pcm = (np.clip(samples, -1, 1) * 32767).astype('<i2')
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(pcm.shape[1] if pcm.ndim == 2 else 1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def encode(samples, rate, codec=AUDIO_CODEC):
+    """Mono float samples -> (bytes, MIME type); falls back to WAV without soundfile"""
+    if codec in SOUNDFILE_FORMATS and sf is not None:
+        container, subtype, mime = SOUNDFILE_FORMATS[codec]
+        buf = io.BytesIO()
+        sf.write(buf, samples, rate, format=container, subtype=subtype)
+        return buf.getvalue(), mime
+    return encode_wav(samples, rate), 'audio/wav'
+
+
+def process(samples, rate, target=TARGET_RATE):
+    """Downmix -> trim silence -> resample"""
+    mono = to_mono(samples)
+    return resample(trim_silence(mono, rate), rate, target)
+
+
+@lru_cache(maxsize=8)
+def prepare_audio(audio_bytes, codec=AUDIO_CODEC):
+    """
+    Recorder bytes -> (upload bytes, MIME type): 16 kHz mono, silence trimmed,
+    compressed when soundfile is available. Anything that cannot be decoded, or
+    would not get smaller, is uploaded as-is with its sniffed MIME type.
+    """
+    try:
+        samples, rate = decode(audio_bytes)
+        payload, mime = encode(process(samples, rate), TARGET_RATE, codec)
+    except Exception as e:
+        print(f"Audio preprocessing skipped: {e}")
+        return audio_bytes, sniff_mime(audio_bytes)
+    if len(payload) >= len(audio_bytes):
+        return audio_bytes, sniff_mime(audio_bytes)
+    return payload, mime
@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import numpy as np
+
+from audio_pipeline import AUDIO_CODEC, encode_wav, prepare_audio, sf
+
+
+def synth_speech(seconds, rate, rng):
+    """Voice-like fixture: a wandering 100-250 Hz harmonic source gated into 4 syllables/s"""
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 160 + 50 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, 6))
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, 6)), 0, None)
+    return (0.2 * voice * syllables + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def recording(speech_seconds, rate, channels, rng, lead=1.0, tail=1.5, pauses=2):
+    """Speech between the click-to-talk lead-in and the trailing silence before 'Stop'"""
+    parts = [0.001 * rng.standard_normal(int(lead * rate)).astype(np.float32)]
+    for i in range(pauses + 1):
+        parts.append(synth_speech(speech_seconds / (pauses + 1), rate, rng))
+        if i < pauses:
+            parts.append(0.001 * rng.standard_normal(int(1.2 * rate)).astype(np.float32))
+    parts.append(0.001 * rng.standard_normal(int(tail * rate)).astype(np.float32))
+    mono = np.concatenate(parts)
+    return np.repeat(mono[:, np.newaxis], channels, axis=1)
+
+
+def generate_fixtures(seed=7):
+    """Typical browser recordings: sidebar profile answers and advisor questions"""
+    rng = np.random.default_rng(seed)
+    return [
+        ("profile 48k stereo 8s", encode_wav(recording(8, 48000, 2, rng), 48000)),
+        ("profile 44.1k mono 12s", encode_wav(recording(12, 44100, 1, rng), 44100)),
+        ("question 48k mono 5s", encode_wav(recording(5, 48000, 1, rng, pauses=1), 48000)),
+        ("question 48k stereo 20s", encode_wav(recording(20, 48000, 2, rng, pauses=4), 48000))
+    ]
+
+
+def load_fixtures(paths):
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append((path, f.read()))
+    return fixtures
+
+
+def time_upload(content):
+    """One Gemini transcription round trip (needs GEMINI_API_KEY)"""
+    import google.generativeai as genai
+    from voice_processor import gemini_key
+
+    genai.configure(api_key=gemini_key)
+    model = genai.GenerativeModel("gemini-1.5-flash")
+    start = time.perf_counter()
+    model.generate_content(content)
+    return time.perf_counter() - start
+
+
+def run_benchmark(fixtures, uplink_kbps=1000, live=False, repeat=5):
+    print(f"Codec: {AUDIO_CODEC if sf is not None else 'wav (soundfile not installed)'}, "
+          f"uplink {uplink_kbps} kbit/s\n")
+    total_raw = total_out = 0
+    for name, raw in fixtures:
+        timings = []
+        for _ in range(repeat):
+            prepare_audio.cache_clear()
+            start = time.perf_counter()
+            payload, mime = prepare_audio(raw)
+            timings.append(time.perf_counter() - start)
+        prepare_s = min(timings)
+        raw_upload = len(raw) * 8 / (uplink_kbps * 1000)
+        out_upload = len(payload) * 8 / (uplink_kbps * 1000)
+        total_raw += len(raw)
+        total_out += len(payload)
+
+        print(f"{name}")
+        print(f"  raw:      {len(raw) / 1024:8.1f} KiB  upload ~{raw_upload:.2f}s")
+        print(f"  prepared: {len(payload) / 1024:8.1f} KiB  upload ~{out_upload:.2f}s  "
+              f"({mime}, {len(raw) / len(payload):.1f}x smaller, prepare {prepare_s * 1000:.1f} ms)")
+        if live:
+            prompt = "Transcribe this audio exactly as spoken. Return only the text."
+            raw_s = time_upload([prompt, {"mime_type": "audio/wav", "data": raw}])
+            out_s = time_upload([prompt, {"mime_type": mime, "data": payload}])
+            print(f"  gemini:   raw {raw_s:.2f}s -> prepared {out_s + prepare_s:.2f}s")
+    print(f"\nTotal: {total_raw / 1024:.1f} KiB -> {total_out / 1024:.1f} KiB "
+          f"({total_raw / max(total_out, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Payload size and latency of the voice audio pipeline")
+    parser.add_argument('files', nargs='*', help="recorded WAV fixtures (default: synthetic recordings)")
+    parser.add_argument('--uplink-kbps', type=int, default=1000, help="uplink used for upload time estimates")
+    parser.add_argument('--live', action='store_true', help="also time real Gemini transcriptions, raw vs prepared")
+    args = parser.parse_args()
+
+    run_benchmark(load_fixtures(args.files) if args.files else generate_fixtures(), args.uplink_kbps, args.live)
@@ -0,0 +1,108 @@
+import random
+import time
+
+from allocation_engine import build_rule_based_plan
+from plan_model import render_plan_markdown
+from plan_scorer import score_plan_text, _compile
+from evaluation import (
+    TEST_PROFILES,
+    evaluate_plan_specificity,
+    evaluate_plan_safety,
+    evaluate_plan_personalization,
+    evaluate_plan_actionability,
+    evaluate_plan_completeness
+)
+
+# Phrases spliced into generated plans so every branch of every metric is exercised,
+# including casing and Unicode edge cases for the lowercased checks.
+NOISE = [
+    "Arcium is a privacy SDK tool", "Arcium allocation: 5%", "invest in Arcium", "allocation",
+    "RISK", "Volatility", "CAUTION", "be careful", "Warning", "Smart Contract", "impermanent loss",
+    "liquidation", "HACK", "Leverage", "aggressive", "Set Up", "visit", "NEXT", "open", "first",
+    "jito.network", "raydium.io", "kamino.finance", "Phantom", "coinbase", "Week 1", "week 2",
+    "1.", "2.", "ETH", "eth", "BTC", "VXUS", "score", "assessment", "stocks", "growth", "passive",
+    "APY", "apy", "per month", "contribution", "REIT", "Gold", "years", "$1,000", "45%",
+    "İSTANBUL", "ſtaking", "ΣΟΣ", "Kelvin K", "🚀", "retirement", "Maximize", "PRESERVE"
+]
+
+
+def _reference(f):
+    """Undecorated metric (skips Opik tracing so the timing compares the scoring itself)"""
+    return getattr(f, '__wrapped__', f)
+
+
+def reference_scores(plan, profile):
+    specificity = _reference(evaluate_plan_specificity)(plan)
+    safety = _reference(evaluate_plan_safety)(plan, profile['risk_tolerance'])
+    personalization = _reference(evaluate_plan_personalization)(plan, profile)
+    actionability = _reference(evaluate_plan_actionability)(plan)
+    completeness = _reference(evaluate_plan_completeness)(plan)
+    return {
+        'specificity': specificity,
+        'safety': safety,
+        'personalization': personalization,
+        'actionability': actionability,
+        'completeness': completeness,
+        'overall': (specificity + safety + personalization + actionability + completeness) / 5
+    }
+
+
+def generate_profiles(count, rng):
+    goals = [p['goal'] for p in TEST_PROFILES] + ["Maximize returns through Solana DeFi", "Buy a home"]
+    return [{
+        'name': f"bench-{i}",
+        'age': rng.randint(20, 70),
+        'capital': rng.choice([1000, 5000, 20000, 50000, 250000]),
+        'monthly': rng.choice([0, 100, 500, 1500]),
+        'timeline': rng.choice([3, 8, 15, 25, 35]),
+        'risk_tolerance': rng.choice(['Low', 'Medium', 'High']),
+        'goal': rng.choice(goals),
+        'currency_symbol': rng.choice(['$', '€', '₹'])
+    } for i in range(count)]
+
+
+def generate_cases(count, profiles=40, seed=7):
+    """Plans for a fixed pool of profiles, like an eval run with repetitions"""
+    rng = random.Random(seed)
+    pool = TEST_PROFILES + generate_profiles(profiles, rng)
+    cases = []
+    for _ in range(count):
+        profile = rng.choice(pool)
+        lines = render_plan_markdown(build_rule_based_plan(profile)).splitlines()
+        lines = [line for line in lines if rng.random() > 0.3]
+        for _ in range(rng.randint(0, 12)):
+            lines.insert(rng.randint(0, len(lines)), rng.choice(NOISE))
+        cases.append(("\n".join(lines), profile))
+    return cases
+
+
+def run_benchmark(count=3000):
+    print(f"Generating {count} plans...")
+    cases = generate_cases(count)
+    _compile.cache_clear()
+
+    start = time.perf_counter()
+    expected = [reference_scores(plan, profile) for plan, profile in cases]
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [score_plan_text(plan, profile) for plan, profile in cases]
+    compiled_time = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    avg_len = sum(len(plan) for plan, _ in cases) / len(cases)
+
+    print(f"Average plan length: {avg_len:,.0f} chars")
+    print(f"Reference (evaluation.py): {reference_time:.3f}s ({reference_time / count * 1e6:.0f} us/plan)")
+    print(f"Compiled (plan_scorer):    {compiled_time:.3f}s ({compiled_time / count * 1e6:.0f} us/plan)")
+    print(f"Speedup: {reference_time / compiled_time:.1f}x")
+    print(f"Identical scores: {count - len(mismatches)}/{count}")
+    for i in mismatches[:5]:
+        print(f"  MISMATCH #{i}: expected {expected[i]} got {actual[i]}")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    import sys
+    ok = run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import io
+import json
+import time
+from pathlib import Path
+
+try:
+    from PIL import Image  # Ships with streamlit
+except ImportError:
+    Image = None
+
+ASSETS_DIR = Path(__file__).parent / 'assets'
+LOGO_DIR = ASSETS_DIR / 'logos'
+OUTPUT_DIR = LOGO_DIR / 'optimized'
+# Served by Streamlit from /app/static (server.enableStaticServing), see styles.py
+STATIC_DIR = Path(__file__).parent / 'static'
+BACKGROUNDS = ('hero_bg.png', 'portfolio_header.png', 'education_header.png')
+MANIFEST_NAME = 'manifest.json'
+
+# Display sizes in styles.py / app.py: ticker 18px, sidebar/opportunity 20px,
+# portfolio/vault 24px, yield desk 28px, stat cards 32px. Variants are rendered at
+# 2x for high-DPI screens; 36 covers 18px and 64 covers everything up to 32px.
+DEFAULT_SIZES = (36, 64)
+FORMATS = ('webp', 'png', 'auto')
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _encode(img, fmt):
+    """Encodes an RGBA image; returns (bytes, extension)"""
+    buf = io.BytesIO()
+    if fmt == 'webp':
+        img.save(buf, format='WEBP', quality=85, method=6)
+        return buf.getvalue(), 'webp'
+    # Palette PNGs are a fraction of the size of RGBA ones at icon sizes
+    img.quantize(colors=256, method=Image.FASTOCTREE).save(buf, format='PNG', optimize=True)
+    return buf.getvalue(), 'png'
+
+
+def resize_logo(data, size, fmt='auto'):
+    """Downsamples one logo to fit a size x size box and recompresses it"""
+    img = Image.open(io.BytesIO(data)).convert('RGBA')
+    img.thumbnail((size, size), Image.LANCZOS)
+    if fmt != 'auto':
+        return _encode(img, fmt)
+    candidates = [_encode(img, 'webp'), _encode(img, 'png')]
+    return min(candidates, key=lambda c: len(c[0]))
+
+
+def load_manifest(output_dir=OUTPUT_DIR):
+    path = Path(output_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {'logos': {}}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {'logos': {}}
+
+
+def build_assets(source_dir=LOGO_DIR, output_dir=OUTPUT_DIR, sizes=DEFAULT_SIZES, fmt='auto', force=False):
+    """
+    Writes resized variants of every PNG in source_dir plus manifest.json.
+    Logos whose source hash and settings match the existing manifest are skipped.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build logo assets (pip install Pillow)")
+
+    source_dir, output_dir = Path(source_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(output_dir).get('logos', {})
+    sizes = sorted(set(int(s) for s in sizes))
+
+    logos = {}
+    built = skipped = failed = 0
+    for path in sorted(source_dir.glob('*.png')):
+        data = path.read_bytes()
+        digest = _sha256(data)
+        entry = previous.get(path.name)
+        if (not force and entry and entry.get('source_sha256') == digest and entry.get('format') == fmt
+                and sorted(int(s) for s in entry.get('variants', {})) == sizes
+                and all((output_dir / v['file']).exists() for v in entry['variants'].values())):
+            logos[path.name] = entry
+            skipped += 1
+            continue
+
+        try:
+            variants = {}
+            for size in sizes:
+                encoded, ext = resize_logo(data, size, fmt)
+                out_name = f"{path.stem}-{size}.{ext}"
+                (output_dir / out_name).write_bytes(encoded)
+                variants[str(size)] = {'file': out_name, 'bytes': len(encoded)}
+            logos[path.name] = {
+                'source_sha256': digest,
+                'source_bytes': len(data),
+                'format': fmt,
+                'variants': variants
+            }
+            built += 1
+        except Exception as e:
+            print(f"✗ {path.name}: {e}")
+            failed += 1
+
+    manifest = {'version': 1, 'generated_at': int(time.time()), 'sizes': sizes, 'logos': logos}
+    tmp = output_dir / (MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    tmp.replace(output_dir / MANIFEST_NAME)
+
+    # Drop variants no longer referenced by the manifest
+    referenced = {v['file'] for e in logos.values() for v in e['variants'].values()}
+    for stale in output_dir.iterdir():
+        if stale.suffix in ('.png', '.webp') and stale.name not in referenced:
+            stale.unlink()
+
+    source_total = sum(e['source_bytes'] for e in logos.values())
+    print(f"Built {built}, unchanged {skipped}, failed {failed}")
+    for size in sizes:
+        total = sum(e['variants'][str(size)]['bytes'] for e in logos.values())
+        if total:
+            print(f"  {size}px: {total / 1024:.1f} KB vs {source_total / 1024:.1f} KB source "
+                  f"({source_total / total:.1f}x smaller)")
+    return manifest
+
+
+def build_backgrounds(source_dir=ASSETS_DIR, output_dir=STATIC_DIR, names=BACKGROUNDS, quality=80):
+    """Writes JPEG copies of the full-page backgrounds for static serving"""
+    if Image is None:
+        raise RuntimeError("Pillow is required to build background assets (pip install Pillow)")
+
+    source_dir, output_dir = Path(source_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        path = source_dir / name
+        if not path.exists():
+            print(f"✗ {name}: not found")
+            continue
+        out = output_dir / (path.stem + '.jpg')
+        # Backgrounds sit under a dark gradient overlay, so lossy JPEG is invisible here
+        Image.open(path).convert('RGB').save(out, format='JPEG', quality=quality, optimize=True, progressive=True)
+        print(f"  {name}: {path.stat().st_size / 1024:.0f} KB -> {out.name} {out.stat().st_size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resize and recompress logos for embedding")
+    parser.add_argument('--source', default=str(LOGO_DIR))
+    parser.add_argument('--out', default=str(OUTPUT_DIR))
+    parser.add_argument('--sizes', default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma separated pixel sizes (2x the CSS size)")
+    parser.add_argument('--format', default='auto', choices=FORMATS)
+    parser.add_argument('--force', action='store_true', help="Rebuild even if sources are unchanged")
+    parser.add_argument('--backgrounds', action='store_true', help="Also write static/ copies of the page backgrounds")
+    args = parser.parse_args()
+
+    if args.backgrounds:
+        build_backgrounds()
+    build_assets(args.source, args.out, [s for s in args.sizes.split(',') if s.strip()], args.format, args.force)
@@ -0,0 +1,239 @@
+import os
+import time
+from contextlib import contextmanager
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from logo_service import get_logo_service
+from render_profiler import cached_fetch, timed
+from live_data import get_portfolio_growth_projection
+from solana_service import get_solana_service, STATUS_REFRESH_SECONDS
+
+SOLANA_REFRESH_SECONDS = STATUS_REFRESH_SECONDS
+
+PERFORMANCE_COLORS = {'BTC': '#F7931A', 'ETH': '#627EEA', 'SOL': '#14F195'}
+PROJECTION_SCENARIOS = {
+    'Conservative (5%)': 0.05,
+    'Moderate (8%)': 0.08,
+    'Aggressive (12%)': 0.12
+}
+SCENARIO_COLORS = ['#60A5FA', '#3B82F6', '#1E40AF']
+PROJECTION_CACHE_ENTRIES = 64
+
+
+def fragment(func=None, *, run_every=None):
+    """st.fragment where available (Streamlit >= 1.37), otherwise a plain call"""
+    impl = getattr(st, 'fragment', None)
+    if impl is None:
+        return func if func else (lambda f: f)
+    if func is None:
+        return impl(run_every=run_every)
+    return impl(func)
+
+
+# --- Debug timing readout ---
+
+def debug_enabled():
+    """On with ?debug=1 or GOALWEALTH_DEBUG=1"""
+    if os.environ.get('GOALWEALTH_DEBUG') == '1':
+        return True
+    try:
+        return st.query_params.get('debug') == '1'
+    except Exception:
+        return False
+
+
+@contextmanager
+def fragment_timer(name):
+    """Records how long a widget took to (re)build in session state and the render profile"""
+    start = time.perf_counter()
+    try:
+        with timed(f"fragment:{name}", kind='fragment'):
+            yield
+    finally:
+        timings = st.session_state.setdefault('fragment_timings', {})
+        timings[name] = {'ms': (time.perf_counter() - start) * 1000, 'at': time.strftime('%H:%M:%S')}
+
+
+def render_fragment_timings():
+    timings = st.session_state.get('fragment_timings', {})
+    if not timings:
+        return
+    with st.expander("⏱️ Fragment timings (debug)", expanded=False):
+        for name, info in sorted(timings.items(), key=lambda kv: kv[1]['ms'], reverse=True):
+            st.markdown(f"`{name:<22}` {info['ms']:8.1f} ms  · last run {info['at']}")
+
+
+# --- Cached builders (keyed by the exact inputs each widget depends on) ---
+
+def _with_sprites(html_parts, used):
+    """Prefixes a self-contained sprite stylesheet so the HTML renders inside any fragment"""
+    return (get_logo_service().sprite_css(used) if used else "") + "".join(html_parts)
+
+
+@cached_fetch("ticker_html", st.cache_data(ttl=300, show_spinner=False), kind='build')
+def build_ticker_html(quotes, rate, currency_symbol):
+    """quotes: tuple of (symbol, price_usd, change_24h)"""
+    logos = get_logo_service()
+    used = set()
+    items = []
+    for symbol, price, change in quotes:
+        change_class = "change-up" if change >= 0 else "change-down"
+        arrow = "▲" if change >= 0 else "▼"
+        icon_html = logos.icon_html(logos.asset_logo(symbol), used=used)
+        items.append(
+            f'<div class="ticker-item">'
+            f'{icon_html}'
+            f'<span class="ticker-symbol">{symbol}</span>'
+            f'<span class="ticker-price">{currency_symbol}{price * rate:,.2f}</span>'
+            f'<span class="ticker-change {change_class}">{arrow} {abs(change):.2f}%</span>'
+            f'</div>'
+        )
+    # Repeat items to create a gapless infinite loop
+    repeated_content = "".join(items) + "".join(items)
+    return _with_sprites([f'<div class="market-ticker-container"><div class="market-ticker">{repeated_content}</div></div>'], used)
+
+
+@cached_fetch("yield_desk_html", st.cache_data(ttl=300, show_spinner=False), kind='build')
+def build_yield_desk_html(yields):
+    """yields: tuple of (protocol, apy, tvl)"""
+    logos = get_logo_service()
+    used = set()
+    items = []
+    for protocol, apy, tvl in yields:
+        icon_html = logos.icon_html(logos.protocol_logo(protocol), class_name="yield-logo",
+                                    style="margin-right:12px;", used=used)
+        items.append(
+            f'<div class="yield-card">'
+            f'<div class="yield-card-left">'
+            f'{icon_html}'
+            f'<div><div class="yield-name">{protocol}</div><div class="yield-tvl">TVL: {tvl}</div></div>'
+            f'</div>'
+            f'<div class="yield-apy">{apy}%</div>'
+            f'</div>'
+        )
+    # Repeat for continuous vertical loop
+    repeated_yields = "".join(items) + "".join(items)
+    return _with_sprites([
+        f'<div class="defi-yield-container">'
+        f'<div class="yield-scroll-area">{repeated_yields}</div>'
+        f'</div>'
+    ], used)
+
+
+def freshness_label(metrics):
+    """'WS · 0.4s', 'POLL · 6s' or 'EST' for the status strip"""
+    source = {'websocket': 'WS', 'poll': 'POLL'}.get(metrics.get('source'), 'EST')
+    age = metrics.get('age_s')
+    return source if age is None else f"{source} · {age:.1f}s" if age < 10 else f"{source} · {age:.0f}s"
+
+
+def build_solana_status_html(tps, slot, freshness=""):
+    dot = '#14F195' if freshness.startswith('WS') else '#F59E0B'
+    return f"""
+    <div style="margin-top: 1rem; padding: 0.8rem; background: rgba(20, 241, 149, 0.05); border: 1px dashed rgba(20, 241, 149, 0.2); border-radius: 8px; display: flex; justify-content: space-between; align-items: center;">
+        <div style="display: flex; align-items: center; gap: 8px;">
+            <div style="width: 8px; height: 8px; background: {dot}; border-radius: 50%; box-shadow: 0 0 8px {dot};"></div>
+            <span style="font-size: 0.8rem; color: #14F195; font-weight: 600;">Solana Mainnet</span>
+        </div>
+        <div style="font-family: 'JetBrains Mono'; font-size: 0.75rem; color: #94A3B8;">
+            TPS: <span style="color: #E2E8F0;">{tps}</span> | Slot: {slot} <span style="color: #64748B;">{freshness}</span>
+        </div>
+    </div>
+    """
+
+
+def get_solana_status():
+    """Metrics from the service's memory (slot stream + background samples); no RPC per call"""
+    with timed("solana_status", cache='hit'):
+        return get_solana_service().get_network_metrics()
+
+
+@cached_fetch("performance_figure", st.cache_data(ttl=300, show_spinner=False), kind='build')
+def build_performance_figure(histories, layout):
+    """histories: tuple of (symbol, ((date, price), ...)) for the normalized % chart"""
+    fig = go.Figure()
+    for symbol, points in histories:
+        if not points:
+            continue
+        dates = [d for d, _ in points]
+        prices = [p for _, p in points]
+        initial_price = prices[0]
+        normalized = [(p / initial_price - 1) * 100 for p in prices]
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=normalized,
+            name=symbol,
+            mode='lines',
+            line=dict(width=2, color=PERFORMANCE_COLORS.get(symbol, '#fff'))
+        ))
+    fig.update_layout(layout)
+    return fig
+
+
+# Pure function of its inputs, so no ttl; max_entries bounds the combinations users try
+@cached_fetch("projection_figure", st.cache_data(max_entries=PROJECTION_CACHE_ENTRIES, show_spinner=False), kind='build')
+def build_projection_figure(capital, monthly, timeline, currency_symbol, layout):
+    fig = go.Figure()
+    for idx, (scenario_name, return_rate) in enumerate(PROJECTION_SCENARIOS.items()):
+        projection = get_portfolio_growth_projection(capital, monthly, timeline, return_rate)
+        fig.add_trace(go.Scatter(
+            x=[p['year'] for p in projection],
+            y=[p['value'] for p in projection],
+            name=scenario_name,
+            mode='lines',
+            line=dict(width=3, color=SCENARIO_COLORS[idx]),
+            fill='tonexty' if idx > 0 else None,
+            fillcolor=f"rgba{tuple(int(SCENARIO_COLORS[idx].lstrip('#')[i:i+2], 16) for i in (0, 2, 4)) + (0.1,)}"
+        ))
+    fig.update_layout(layout)
+    target = get_portfolio_growth_projection(capital, monthly, timeline, 0.08)[-1]['value']
+    return fig, target
+
+
+# --- Fragments ---
+
+def market_quotes(market_data):
+    return tuple((s, d['price'], d['change_24h']) for s, d in market_data.items())
+
+
+def market_histories(market_data, symbols=('BTC', 'ETH', 'SOL')):
+    return tuple(
+        (s, tuple((d['date'], d['price']) for d in market_data[s].get('history', [])))
+        for s in symbols if s in market_data
+    )
+
+
+@fragment
+def market_ticker_fragment(market_data, rate, currency_symbol):
+    with fragment_timer("market_ticker"):
+        st.markdown(build_ticker_html(market_quotes(market_data), rate, currency_symbol), unsafe_allow_html=True)
+
+
+@fragment(run_every=SOLANA_REFRESH_SECONDS)
+def solana_status_fragment():
+    """Refreshes on its own timer without rerunning the rest of the page"""
+    with fragment_timer("solana_status"):
+        metrics = get_solana_status()
+        st.markdown(build_solana_status_html(metrics['tps'], metrics['slot'], freshness_label(metrics)),
+                    unsafe_allow_html=True)
+
+
+@fragment
+def performance_chart_fragment(market_data, layout):
+    with fragment_timer("performance_chart"):
+        st.plotly_chart(build_performance_figure(market_histories(market_data), layout), use_container_width=True)
+
+
+@fragment
+def yield_desk_fragment(defi_results):
+    with fragment_timer("yield_desk"):
+        yields = tuple((p, info['apy'], info['tvl']) for p, info in defi_results.items())
+        st.markdown(build_yield_desk_html(yields), unsafe_allow_html=True)
+
+
+def projection_chart(capital, monthly, timeline, currency_symbol, layout):
+    """Projection figure plus the moderate-scenario target (cached per input tuple)"""
+    with fragment_timer("wealth_projection"):
+        return build_projection_figure(capital, monthly, timeline, currency_symbol, layout)
@@ -1,11 +1,17 @@
-import requests
-import os
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
-# Create assets/logos directory
-os.makedirs('assets/logos', exist_ok=True)
+LOGO_DIR = Path(__file__).parent / 'assets' / 'logos'
+MANIFEST_PATH = LOGO_DIR / 'download_manifest.json'
+DEFAULT_WORKERS = 8
 
 # Logo sources with high-fidelity fallbacks
-logos = {
+LOGO_SOURCES = {
     # Crypto (TrustWallet / DefiLlama / CryptoIcons)
     'btc.png': 'https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/btc.png',
     'eth.png': 'https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/eth.png',
@@ -97,17 +103,195 @@ logos = {
     'ngn.png': 'https://raw.githubusercontent.com/transferwise/currency-flags/master/src/flags/ngn.png'
 }
 
-for filename, url in logos.items():
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
     try:
-        print(f"Downloading {filename}...")
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            with open(f'assets/logos/{filename}', 'wb') as f:
-                f.write(response.content)
-            print(f"✓ Saved {filename}")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {'files': {}}
+
+
+class ManifestWriter:
+    """Thread-safe manifest that is rewritten atomically after every finished URL"""
+
+    def __init__(self, path, manifest):
+        self.path = Path(path)
+        self.manifest = manifest
+        self.manifest.setdefault('files', {})
+        self._lock = threading.Lock()
+
+    def update(self, filename, entry):
+        with self._lock:
+            self.manifest['files'][filename] = entry
+            self.manifest['updated_at'] = int(time.time())
+            tmp = self.path.with_suffix('.json.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, sort_keys=True)
+            tmp.replace(self.path)
+
+
+def _fetch_http(url, previous, session_factory):
+    """GET with If-None-Match / If-Modified-Since; returns (status, body, etag, last_modified)"""
+    headers = {'User-Agent': 'GoalWealth logo fetcher'}
+    if previous.get('etag'):
+        headers['If-None-Match'] = previous['etag']
+    if previous.get('last_modified'):
+        headers['If-Modified-Since'] = previous['last_modified']
+    response = session_factory().get(url, headers=headers, timeout=10)
+    if response.status_code == 304:
+        return 304, None, previous.get('etag'), previous.get('last_modified')
+    if response.status_code != 200:
+        return response.status_code, None, None, None
+    return 200, response.content, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+def _fetch_local(filenames, source_dir):
+    """Offline source: the first of the target filenames present in source_dir"""
+    for filename in filenames:
+        path = Path(source_dir) / filename
+        if path.exists():
+            return 200, path.read_bytes(), None, None
+    return 404, None, None, None
+
+
+def stored_path(manifest, logo_dir, filename):
+    """File holding the bytes for filename: duplicates point at their canonical copy"""
+    return Path(logo_dir) / manifest['files'].get(filename, {}).get('duplicate_of', filename)
+
+
+def _is_current(manifest, logo_dir, filename, url):
+    entry = manifest['files'].get(filename, {})
+    canonical = manifest['files'].get(entry.get('duplicate_of', filename), {})
+    path = stored_path(manifest, logo_dir, filename)
+    return (entry.get('url') == url and canonical.get('sha256') == entry.get('sha256')
+            and path.exists() and path.stat().st_size == entry.get('bytes'))
+
+
+def plan_downloads(sources, manifest, logo_dir, refresh=False, by_url=True):
+    """
+    Groups filenames by URL (one fetch per URL) and drops groups that are already
+    complete. Local copies are planned per file, since each has its own bytes.
+    """
+    groups = {}
+    for filename, url in sources.items():
+        groups.setdefault(url if by_url else filename, []).append(filename)
+
+    pending, complete = {}, []
+    for key, filenames in groups.items():
+        done = all(_is_current(manifest, logo_dir, f, sources[f]) for f in filenames)
+        if done and not refresh:
+            complete.extend(filenames)
         else:
-            print(f"✗ Failed {filename}: {response.status_code}")
-    except Exception as e:
-        print(f"✗ Error {filename}: {e}")
+            pending[key] = filenames
+    return pending, complete
+
+
+def download_logos(sources=None, logo_dir=LOGO_DIR, manifest_path=MANIFEST_PATH, source_dir=None,
+                   max_workers=DEFAULT_WORKERS, refresh=False):
+    """
+    Fetches logos on a bounded thread pool. Finished files are recorded in the
+    manifest immediately, so an interrupted run resumes with only the missing
+    ones; --refresh revalidates everything with conditional requests instead.
+    Identical content (same URL or same bytes) is fetched/written once; the
+    other filenames get a manifest entry with duplicate_of instead of a new
+    file (readers resolve it through asset_registry.load_logo_duplicates).
+    """
+    sources = sources or LOGO_SOURCES
+    logo_dir = Path(logo_dir)
+    logo_dir.mkdir(parents=True, exist_ok=True)
+    writer = ManifestWriter(manifest_path, load_manifest(manifest_path))
+    pending, complete = plan_downloads(sources, writer.manifest, logo_dir, refresh, by_url=not source_dir)
+    print(f"{len(complete)} logos up to date, {sum(len(f) for f in pending.values())} to fetch "
+          f"from {len(pending)} unique sources ({'local ' + str(source_dir) if source_dir else 'network'})")
+
+    local = threading.local()
+
+    def session_factory():
+        if not hasattr(local, 'session'):
+            import requests
+            local.session = requests.Session()
+        return local.session
+
+    canonical_by_hash = {e['sha256']: f for f, e in writer.manifest['files'].items()
+                         if e.get('sha256') and not e.get('duplicate_of') and f in complete}
+    hash_lock = threading.Lock()
+    stats = {'downloaded': 0, 'not_modified': 0, 'failed': 0, 'deduplicated': 0}
+
+    def fetch(url, filenames):
+        previous = writer.manifest['files'].get(filenames[0], {})
+        if source_dir:
+            return _fetch_local(filenames, source_dir)
+        if not all(stored_path(writer.manifest, logo_dir, f).exists() for f in filenames):
+            previous = {}  # Missing on disk: a 304 would leave nothing to keep
+        return _fetch_http(url, previous, session_factory)
+
+    def previous_entry(filenames):
+        return next((writer.manifest['files'][f] for f in filenames if f in writer.manifest['files']), {})
+
+    def store(url, filenames, status, data, etag, last_modified):
+        if status == 304:
+            for filename in filenames:
+                entry = writer.manifest['files'].get(filename) or dict(previous_entry(filenames), url=url)
+                writer.update(filename, dict(entry, checked_at=int(time.time())))
+            return 'not_modified'
+
+        digest = _sha256(data)
+        with hash_lock:
+            canonical = canonical_by_hash.setdefault(digest, filenames[0])
+        for filename in filenames:
+            path = logo_dir / filename
+            entry = {'url': url, 'sha256': digest, 'bytes': len(data), 'etag': etag,
+                     'last_modified': last_modified, 'fetched_at': int(time.time())}
+            if canonical != filename:
+                # Same bytes are already on disk under the canonical name; an existing copy is left alone
+                entry['duplicate_of'] = canonical
+            elif not (path.exists() and path.stat().st_size == len(data) and _sha256(path.read_bytes()) == digest):
+                tmp = path.with_suffix(path.suffix + '.part')
+                tmp.write_bytes(data)
+                tmp.replace(path)
+            writer.update(filename, entry)
+        return 'downloaded'
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for filenames in pending.values():
+            url = sources[filenames[0]]
+            futures[pool.submit(fetch, url, filenames)] = (url, filenames)
+        for future in as_completed(futures):
+            url, filenames = futures[future]
+            try:
+                status, data, etag, last_modified = future.result()
+                if status not in (200, 304) or (status == 200 and not data):
+                    raise RuntimeError("not in source directory" if source_dir else f"HTTP {status}")
+                outcome = store(url, filenames, status, data, etag, last_modified)
+                stats[outcome] += 1
+                print(f"✓ {', '.join(filenames)} ({'not modified' if outcome == 'not_modified' else 'saved'})")
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"✗ {', '.join(filenames)}: {e}")
+
+    stats['deduplicated'] = sum(1 for e in writer.manifest['files'].values() if e.get('duplicate_of'))
+    print(f"\nDone! Downloaded {stats['downloaded']}, not modified {stats['not_modified']}, "
+          f"failed {stats['failed']}, duplicates {stats['deduplicated']}. Manifest: {manifest_path}")
+    if stats['downloaded']:
+        print("Run build_logo_assets.py to refresh the resized variants.")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download asset logos into assets/logos")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--refresh', action='store_true',
+                        help="Revalidate every logo (conditional requests) instead of resuming")
+    parser.add_argument('--source', help="Copy from a local directory instead of the network")
+    parser.add_argument('--dest', default=str(LOGO_DIR))
+    args = parser.parse_args()
 
-print("\nDone! Logos saved to assets/logos/")
+    dest = Path(args.dest)
+    download_logos(logo_dir=dest, manifest_path=dest / 'download_manifest.json', source_dir=args.source,
+                   max_workers=args.workers, refresh=args.refresh)
@@ -0,0 +1,267 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from evaluation import TEST_PROFILES
+from plan_scorer import score_plan_text
+from llm_gateway import get_quota_manager
+from llm_cassette import Cassette, use_cassette
+
+try:
+    from opik import track
+except ImportError:
+    def track(*args, **kwargs):
+        return lambda f: f
+
+DEFAULT_CHECKPOINT = Path(__file__).parent / 'eval_results' / 'checkpoint.jsonl'
+DEFAULT_WORKERS = int(os.environ.get('GOALWEALTH_EVAL_WORKERS', 3))
+
+
+def _default_variants():
+    """Plan generators keyed by variant name (imported lazily, they pull in the SDKs)"""
+    from planner_agent import create_investment_plan
+    from experiments import create_investment_plan_v2, create_investment_plan_v3
+    return {
+        'baseline': create_investment_plan,
+        'enhanced': create_investment_plan_v2,
+        'validated': create_investment_plan_v3
+    }
+
+
+def build_jobs(profiles=None, variants=('baseline',), repetitions=1):
+    """Expands profile x variant x repetition into independent jobs"""
+    profiles = profiles if profiles is not None else TEST_PROFILES
+    jobs = []
+    for variant in variants:
+        for profile in profiles:
+            for rep in range(repetitions):
+                jobs.append({
+                    'job_id': f"{variant}|{profile['name']}|{rep}",
+                    'variant': variant,
+                    'profile': profile,
+                    'rep': rep
+                })
+    return jobs
+
+
+@track(project_name="goalwealth-eval", tags=["evaluation"])
+def score_plan(plan, profile):
+    """
+    Runs the five evaluation metrics on a plan (compiled single-scan scorer).
+    Traced as one Opik span whose output carries all five scores.
+    """
+    return score_plan_text(plan, profile)
+
+
+def _run_job(job, generator):
+    profile = job['profile']
+    start_time = time.time()
+    plan = generator(profile)
+    generation_time = time.time() - start_time
+
+    if not plan or plan.strip().startswith("Error"):
+        return {'job_id': job['job_id'], 'variant': job['variant'], 'profile': profile['name'],
+                'rep': job['rep'], 'error': plan or "Failed to generate plan",
+                'generation_time': generation_time}
+
+    result = {'job_id': job['job_id'], 'variant': job['variant'], 'profile': profile['name'], 'rep': job['rep']}
+    result.update(score_plan(plan, profile))
+    result['generation_time'] = generation_time
+    return result
+
+
+def load_checkpoint(checkpoint_path):
+    """Completed results keyed by job_id (failed jobs are retried on resume)"""
+    done = {}
+    path = Path(checkpoint_path)
+    if not path.exists():
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn final line from a crash
+            if 'error' not in record:
+                done[record['job_id']] = record
+    return done
+
+
+def run_jobs(jobs, variants=None, max_workers=DEFAULT_WORKERS, checkpoint_path=DEFAULT_CHECKPOINT,
+             resume=True, on_result=None):
+    """
+    Executes jobs on a bounded thread pool. LLM calls inside the generators go
+    through the shared llm_gateway quota, so workers above the quota just queue.
+    Every finished job is appended to the checkpoint before the next is reported.
+    """
+    variants = variants or _default_variants()
+    checkpoint_path = Path(checkpoint_path)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+
+    completed = load_checkpoint(checkpoint_path) if resume else {}
+    if not resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    pending = [job for job in jobs if job['job_id'] not in completed]
+    results = {job['job_id']: completed[job['job_id']] for job in jobs if job['job_id'] in completed}
+    if completed:
+        print(f"Resuming: {len(results)} of {len(jobs)} jobs already in {checkpoint_path}")
+
+    quota = get_quota_manager()
+    print(f"Running {len(pending)} jobs on {max_workers} workers "
+          f"(LLM quota: {quota.max_concurrent} concurrent, {quota.requests_per_minute} rpm)")
+
+    write_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_run_job, job, variants[job['variant']]): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'job_id': job['job_id'], 'variant': job['variant'],
+                          'profile': job['profile']['name'], 'rep': job['rep'], 'error': str(e)}
+
+            with write_lock:
+                with open(checkpoint_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(result) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            if 'error' not in result:
+                results[job['job_id']] = result
+            if on_result:
+                on_result(result)
+
+    # Original job order, independent of completion order
+    return [results[job['job_id']] for job in jobs if job['job_id'] in results]
+
+
+def print_result(result):
+    if 'error' in result:
+        print(f"\nERROR: {result['variant']} / {result['profile']}: {result['error']}")
+        return
+    print(f"\n\nEvaluated: {result['profile']} [{result['variant']} #{result['rep']}]")
+    print("-" * 70)
+    print("\nScores:")
+    print(f"  Specificity:      {result['specificity']}/10")
+    print(f"  Safety:           {result['safety']}/10")
+    print(f"  Personalization:  {result['personalization']}/10")
+    print(f"  Actionability:    {result['actionability']}/10")
+    print(f"  Completeness:     {result['completeness']}/10")
+    print(f"  OVERALL:          {result['overall']:.1f}/10")
+    print(f"  Generation Time:  {result['generation_time']:.2f}s")
+
+
+def print_summary(results, wall_time=None):
+    print("\n\n" + "="*70)
+    print("EVALUATION SUMMARY")
+    print("="*70)
+
+    if not results:
+        print("\nNo successful evaluations.")
+        return
+
+    avg_overall = sum(r['overall'] for r in results) / len(results)
+    avg_time = sum(r['generation_time'] for r in results) / len(results)
+
+    print(f"\nAverage Overall Score: {avg_overall:.1f}/10")
+    print(f"Average Generation Time: {avg_time:.2f}s")
+    if wall_time is not None:
+        print(f"Wall Time: {wall_time:.2f}s ({len(results)} plans)")
+
+    variants = sorted({r['variant'] for r in results})
+    if len(variants) > 1:
+        print("\n| Variant | Avg Score | Avg Time | Runs |")
+        print("|---------|-----------|----------|------|")
+        for variant in variants:
+            rows = [r for r in results if r['variant'] == variant]
+            score = sum(r['overall'] for r in rows) / len(rows)
+            gen_time = sum(r['generation_time'] for r in rows) / len(rows)
+            print(f"| {variant[:10]} | {score:.1f}/10    | {gen_time:.1f}s    | {len(rows)}    |")
+
+    print(f"\nAll {len(results)} evaluations tracked in Opik!")
+    print("View at: https://www.comet.com/opik")
+
+
+def run_parallel_evaluation(variants=('baseline',), profiles=None, repetitions=1,
+                            max_workers=DEFAULT_WORKERS, checkpoint_path=DEFAULT_CHECKPOINT, resume=True,
+                            title="GOALWEALTH PARALLEL EVALUATION"):
+    print("\n" + "="*70)
+    print(title)
+    print("="*70)
+
+    jobs = build_jobs(profiles, variants, repetitions)
+    start = time.time()
+    results = run_jobs(jobs, max_workers=max_workers, checkpoint_path=checkpoint_path,
+                       resume=resume, on_result=print_result)
+    print_summary(results, wall_time=time.time() - start)
+    return results
+
+
+def rescore_cassette(cassette_path):
+    """
+    Re-scores every plan stored in a cassette without generating anything, so a
+    metric change can be checked against hundreds of recorded plans in seconds.
+    """
+    from plan_model import PlanValidationError, parse_plan, render_plan_markdown
+
+    cassette = Cassette(cassette_path, mode='replay')
+    results = []
+    start = time.time()
+    for entry in cassette.entries():
+        scope = entry.get('scope') or ''
+        variant, _, profile_json = scope.partition(':')
+        if not profile_json:
+            continue
+        profile = json.loads(profile_json)
+        plan = entry['text']
+        if variant.startswith('planner'):
+            try:
+                plan = render_plan_markdown(parse_plan(plan, currency_symbol=profile.get('currency_symbol', '$')))
+            except PlanValidationError:
+                continue
+        result = {'job_id': entry['key'], 'variant': f"{variant}/{entry['model']}",
+                  'profile': profile.get('name', 'unnamed'), 'rep': 0, 'generation_time': 0.0}
+        result.update(score_plan(plan, profile))
+        results.append(result)
+
+    print_summary(results, wall_time=time.time() - start)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run plan evaluations on a bounded worker pool")
+    parser.add_argument('--variants', default='baseline', help="Comma separated: baseline,enhanced,validated")
+    parser.add_argument('--reps', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--checkpoint', default=str(DEFAULT_CHECKPOINT))
+    parser.add_argument('--fresh', action='store_true', help="Ignore and overwrite the existing checkpoint")
+    parser.add_argument('--cassette', help="Record/replay LLM responses to this .jsonl.gz file")
+    parser.add_argument('--cassette-mode', default='auto', choices=['record', 'replay', 'auto'])
+    parser.add_argument('--rescore', action='store_true', help="Only re-score the plans stored in --cassette")
+    args = parser.parse_args()
+
+    if args.rescore:
+        if not args.cassette:
+            parser.error("--rescore needs --cassette")
+        rescore_cassette(args.cassette)
+        raise SystemExit(0)
+    if args.cassette:
+        use_cassette(args.cassette, args.cassette_mode)
+
+    run_parallel_evaluation(
+        variants=[v.strip() for v in args.variants.split(',') if v.strip()],
+        repetitions=args.reps,
+        max_workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        resume=not args.fresh
+    )
@@ -1,7 +1,5 @@
-from planner_agent import create_investment_plan
 from advisor_agent import get_investment_advice
 from opik import track
-import time
 
 # Test cases for evaluation
 TEST_PROFILES = [
@@ -227,75 +225,19 @@ def evaluate_plan_completeness(plan_text):
     return min(score, 10)
 
 
-def run_comprehensive_evaluation():
+def run_comprehensive_evaluation(max_workers=3, checkpoint_path=None, resume=False):
     """
-    Run full evaluation on all test cases
+    Run full evaluation on all test cases (profiles run concurrently, see eval_runner)
     """
-    print("\n" + "="*70)
-    print("GOALWEALTH COMPREHENSIVE EVALUATION")
-    print("="*70)
-    
-    results = []
-    
-    for profile in TEST_PROFILES:
-        print(f"\n\nEvaluating: {profile['name']}")
-        print("-" * 70)
-        
-        # Generate plan
-        start_time = time.time()
-        plan = create_investment_plan(profile)
-        generation_time = time.time() - start_time
-        
-        if not plan:
-            print(f"ERROR: Failed to generate plan for {profile['name']}")
-            continue
-        
-        # Evaluate
-        specificity = evaluate_plan_specificity(plan)
-        safety = evaluate_plan_safety(plan, profile['risk_tolerance'])
-        personalization = evaluate_plan_personalization(plan, profile)
-        actionability = evaluate_plan_actionability(plan)
-        completeness = evaluate_plan_completeness(plan)
-        
-        overall_score = (specificity + safety + personalization + actionability + completeness) / 5
-        
-        result = {
-            'profile': profile['name'],
-            'specificity': specificity,
-            'safety': safety,
-            'personalization': personalization,
-            'actionability': actionability,
-            'completeness': completeness,
-            'overall': overall_score,
-            'generation_time': generation_time
-        }
-        
-        results.append(result)
-        
-        print(f"\nScores:")
-        print(f"  Specificity:      {specificity}/10")
-        print(f"  Safety:           {safety}/10")
-        print(f"  Personalization:  {personalization}/10")
-        print(f"  Actionability:    {actionability}/10")
-        print(f"  Completeness:     {completeness}/10")
-        print(f"  OVERALL:          {overall_score:.1f}/10")
-        print(f"  Generation Time:  {generation_time:.2f}s")
-    
-    # Summary
-    print("\n\n" + "="*70)
-    print("EVALUATION SUMMARY")
-    print("="*70)
-    
-    if results:
-        avg_overall = sum(r['overall'] for r in results) / len(results)
-        avg_time = sum(r['generation_time'] for r in results) / len(results)
-        
-        print(f"\nAverage Overall Score: {avg_overall:.1f}/10")
-        print(f"Average Generation Time: {avg_time:.2f}s")
-        print(f"\nAll {len(results)} evaluations tracked in Opik!")
-        print("View at: https://www.comet.com/opik")
-    
-    return results
+    from eval_runner import run_parallel_evaluation, DEFAULT_CHECKPOINT
+
+    return run_parallel_evaluation(
+        variants=('baseline',),
+        max_workers=max_workers,
+        checkpoint_path=checkpoint_path or DEFAULT_CHECKPOINT.with_name('comprehensive.jsonl'),
+        resume=resume,
+        title="GOALWEALTH COMPREHENSIVE EVALUATION"
+    )
 
 
 if __name__ == "__main__":
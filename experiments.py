@@ -1,6 +1,7 @@
 from opik import track
-import time
-from evaluation import TEST_PROFILES, evaluate_plan_specificity, evaluate_plan_safety, evaluate_plan_personalization, evaluate_plan_actionability, evaluate_plan_completeness
+import json
+from evaluation import TEST_PROFILES
+from llm_gateway import call_llm
 
 # EXPERIMENT 1: BASELINE (Already done - 8.8/10)
 
@@ -17,7 +18,6 @@ def create_investment_plan_v2(user_profile):
     load_dotenv()
     
     gemini_key = os.getenv("GEMINI_API_KEY")
-    client = genai.Client(api_key=gemini_key)
     
     prompt = f"""
 You are an expert financial advisor specializing in multi-channel investing with deep Solana DeFi knowledge.
@@ -85,21 +85,18 @@ Be EXTREMELY specific with numbers. Include at least 30+ dollar amounts.
 Mention user's age, timeline, and goal multiple times.
 """
     
-    try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt
-        )
-        return response.text
-    except:
+    scope = "experiment-v2:" + json.dumps(user_profile, sort_keys=True, default=str)
+    for model_name in ('gemini-2.5-flash', 'gemini-2.0-flash-exp'):
         try:
-            response = client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
+            response = call_llm(
+                model_name, prompt,
+                lambda: genai.Client(api_key=gemini_key).models.generate_content(model=model_name, contents=prompt),
+                scope=scope
             )
             return response.text
         except:
-            return None
+            continue
+    return None
 
 
 # EXPERIMENT 3: Add Post-Generation Validation
@@ -125,24 +122,26 @@ def create_investment_plan_v3(user_profile):
     return plan
 
 
-def run_all_experiments():
+def run_all_experiments(max_workers=3, checkpoint_path=None, resume=False):
     """
-    Run all experiments and compare results
+    Run all experiments and compare results (experiment x profile jobs run concurrently)
     """
+    from eval_runner import build_jobs, run_jobs, print_result, DEFAULT_CHECKPOINT
+
     experiments = [
         {
             'name': 'Experiment 1: Baseline',
-            'function': None,  # Already evaluated
+            'variant': None,  # Already evaluated
             'description': 'Original planner with standard prompt'
         },
         {
             'name': 'Experiment 2: Enhanced Prompt',
-            'function': create_investment_plan_v2,
+            'variant': 'enhanced',
             'description': 'Structured prompt with mandatory sections'
         },
         {
             'name': 'Experiment 3: With Validation',
-            'function': create_investment_plan_v3,
+            'variant': 'validated',
             'description': 'Enhanced prompt + post-generation validation'
         }
     ]
@@ -153,46 +152,18 @@ def run_all_experiments():
     print("RUNNING ALL EXPERIMENTS")
     print("="*70)
     
-    for exp in experiments[1:]:  # Skip baseline (already done)
-        print(f"\n\n{'='*70}")
-        print(f"{exp['name']}")
-        print(f"{exp['description']}")
-        print('='*70)
-        
-        exp_results = []
-        
-        for profile in TEST_PROFILES[:2]:  # Test on 2 profiles for speed
-            print(f"\n  Testing: {profile['name']}")
-            
-            start_time = time.time()
-            plan = exp['function'](profile)
-            gen_time = time.time() - start_time
-            
-            if not plan:
-                print("    ERROR: Failed to generate plan")
-                continue
-            
-            # Evaluate
-            spec = evaluate_plan_specificity(plan)
-            safe = evaluate_plan_safety(plan, profile['risk_tolerance'])
-            pers = evaluate_plan_personalization(plan, profile)
-            actn = evaluate_plan_actionability(plan)
-            comp = evaluate_plan_completeness(plan)
-            
-            overall = (spec + safe + pers + actn + comp) / 5
-            
-            exp_results.append({
-                'profile': profile['name'],
-                'specificity': spec,
-                'safety': safe,
-                'personalization': pers,
-                'actionability': actn,
-                'completeness': comp,
-                'overall': overall,
-                'time': gen_time
-            })
-            
-            print(f"    Overall Score: {overall:.1f}/10 ({gen_time:.1f}s)")
+    # Skip baseline (already done); test on 2 profiles for speed
+    jobs = build_jobs(TEST_PROFILES[:2], [exp['variant'] for exp in experiments[1:]])
+    results = run_jobs(
+        jobs,
+        max_workers=max_workers,
+        checkpoint_path=checkpoint_path or DEFAULT_CHECKPOINT.with_name('experiments.jsonl'),
+        resume=resume,
+        on_result=print_result
+    )
+    
+    for exp in experiments[1:]:
+        exp_results = [dict(r, time=r['generation_time']) for r in results if r['variant'] == exp['variant']]
         
         if exp_results:
             avg_score = sum(r['overall'] for r in exp_results) / len(exp_results)
@@ -0,0 +1,151 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+import streamlit as st
+
+from render_profiler import cached_fetch
+
+# Currencies offered in the sidebar; every table carries all of them
+SUPPORTED_CURRENCIES = ('USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'INR', 'NGN')
+BASE_CURRENCY = 'USD'
+FX_TTL = int(os.environ.get('GOALWEALTH_FX_TTL', 3600))
+# "http", "file", or a comma-separated chain of them tried in order
+FX_SOURCE = os.environ.get('GOALWEALTH_FX_SOURCE', 'http,file')
+FX_URL = os.environ.get('GOALWEALTH_FX_URL', "https://open.er-api.com/v6/latest/USD")
+FX_FILE = Path(os.environ.get('GOALWEALTH_FX_FILE', Path(__file__).parent / 'data' / 'fx_rates.json'))
+
+# Last-resort rates (units per USD) so the app always has a full table
+FALLBACK_RATES = {
+    'USD': 1.0,
+    'EUR': 0.92,
+    'GBP': 0.79,
+    'JPY': 148.5,
+    'CAD': 1.35,
+    'AUD': 1.52,
+    'INR': 83.1,
+    'NGN': 1450.0
+}
+
+
+def _rebase(rates, base):
+    """Quotes against any base -> units per USD"""
+    if base == BASE_CURRENCY:
+        return rates
+    usd = rates.get(BASE_CURRENCY)
+    if not usd:
+        raise ValueError(f"cannot rebase {base} quotes without a USD rate")
+    return {code: value / usd for code, value in rates.items()}
+
+
+class HTTPRateSource:
+    """JSON API returning {"rates": {...}, "base"/"base_code": ...} (open.er-api.com by default)"""
+
+    name = 'http'
+
+    def __init__(self, url=FX_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        resp = requests.get(self.url, timeout=self.timeout)
+        resp.raise_for_status()
+        payload = resp.json()
+        base = payload.get('base_code') or payload.get('base') or BASE_CURRENCY
+        as_of = payload.get('time_last_update_unix') or time.time()
+        return _rebase(payload['rates'], base), as_of
+
+
+class FileRateSource:
+    """Local stand-in: data/fx_rates.json, {"base": "USD", "as_of": unix, "rates": {...}}"""
+
+    name = 'file'
+
+    def __init__(self, path=FX_FILE):
+        self.path = Path(path)
+
+    def fetch(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        return _rebase(payload['rates'], payload.get('base', BASE_CURRENCY)), payload.get('as_of') or self.path.stat().st_mtime
+
+
+class StaticRateSource:
+    name = 'static'
+
+    def fetch(self):
+        return dict(FALLBACK_RATES), None
+
+
+SOURCES = {'http': HTTPRateSource, 'file': FileRateSource, 'static': StaticRateSource}
+
+
+def configured_sources(spec=FX_SOURCE):
+    """Source chain from GOALWEALTH_FX_SOURCE, always ending with the static fallback"""
+    sources = [SOURCES[name.strip()]() for name in spec.split(',') if name.strip() in SOURCES]
+    return sources + [StaticRateSource()]
+
+
+class RateTable:
+    """
+    Rates for SUPPORTED_CURRENCIES plus the precomputed cross matrix:
+    matrix[i, j] is units of currency j per unit of currency i.
+    """
+
+    def __init__(self, usd_rates, source='static', as_of=None, currencies=SUPPORTED_CURRENCIES):
+        self.currencies = tuple(currencies)
+        self.index = {code: i for i, code in enumerate(self.currencies)}
+        self.per_usd = np.array([float(usd_rates[c]) for c in self.currencies])
+        self.matrix = self.per_usd[np.newaxis, :] / self.per_usd[:, np.newaxis]
+        self.matrix.setflags(write=False)
+        self.source = source
+        self.as_of = as_of
+        self.fetched_at = time.time()
+
+    def rate(self, from_code, to_code=BASE_CURRENCY):
+        """Units of to_code per unit of from_code; 1.0 for unknown codes"""
+        i, j = self.index.get(from_code), self.index.get(to_code)
+        if i is None or j is None:
+            return 1.0
+        return float(self.matrix[i, j])
+
+    def convert(self, amounts, from_code=BASE_CURRENCY, to_code=BASE_CURRENCY):
+        """Vectorized conversion of a scalar, list or array of amounts"""
+        return np.asarray(amounts, dtype=float) * self.rate(from_code, to_code)
+
+    def convert_many(self, amounts, from_codes, to_code=BASE_CURRENCY):
+        """Amounts each in their own currency (parallel arrays) -> to_code, in one gather"""
+        j = self.index[to_code]
+        rows = np.array([self.index.get(c, self.index[BASE_CURRENCY]) for c in from_codes], dtype=int)
+        return np.asarray(amounts, dtype=float) * self.matrix[rows, j]
+
+    def usd_rates(self):
+        """{code: units per USD}, the shape live_data.get_global_exchange_rates() has always returned"""
+        return {code: float(v) for code, v in zip(self.currencies, self.per_usd)}
+
+
+def load_rate_table(sources=None):
+    """First source that yields a usable table; gaps are filled from FALLBACK_RATES"""
+    for source in sources or configured_sources():
+        try:
+            rates, as_of = source.fetch()
+        except Exception as e:
+            print(f"FX source {source.name} failed: {e}")
+            continue
+        usable = {c: rates[c] for c in SUPPORTED_CURRENCIES if rates.get(c) and rates[c] > 0}
+        if not usable:
+            continue
+        missing = [c for c in SUPPORTED_CURRENCIES if c not in usable]
+        if missing:
+            print(f"FX source {source.name} missing {missing}; using fallback rates for them")
+        return RateTable({**FALLBACK_RATES, **usable}, source.name, as_of)
+    return RateTable(FALLBACK_RATES)
+
+
+@cached_fetch("fx_rates", st.cache_resource(ttl=FX_TTL, show_spinner=False))
+def get_rate_table():
+    """Shared rate table for every session, refreshed every FX_TTL seconds"""
+    return load_rate_table()
@@ -7,21 +7,26 @@ import requests
 import os
 from alpha_vantage.timeseries import TimeSeries
 from dotenv import load_dotenv
+from render_profiler import cached_fetch, timed
+from asset_registry import get_registry
+from solana_service import running_solana_service
+from fx_rates import get_rate_table
 
 load_dotenv()
 
 
-@st.cache_data(ttl=300)
+@cached_fetch("alpha_vantage", st.cache_data(ttl=300))
 def get_alpha_vantage_data(symbol):
     """Fetch data from Alpha Vantage with better error handling and rate limit awareness"""
     api_key = os.getenv("ALPHAVANTAGE_API_KEY")
-    if not api_key:
+    av_symbol = get_registry().alpha_vantage_id(symbol)
+    if not api_key or not av_symbol:
         return None
         
     try:
         ts = TimeSeries(key=api_key, output_format='pandas')
         # Use 'compact' to save on bandwidth/rate limits
-        data, meta_data = ts.get_quote(symbol=symbol)
+        data, meta_data = ts.get_quote(symbol=av_symbol)
         
         if data is None or data.empty:
             return None
@@ -43,42 +48,16 @@ def get_alpha_vantage_data(symbol):
             print(f"Alpha Vantage Error for {symbol}: {e}")
         return None
 
-@st.cache_data(ttl=300)
+@cached_fetch("market_data", st.cache_data(ttl=300))
 def get_live_market_data():
     """Get live market data using yfinance with caching"""
-    tickers = {
-        # Crypto
-        'BTC': 'BTC-USD', 'ETH': 'ETH-USD', 'SOL': 'SOL-USD',
-        'BNB': 'BNB-USD', 'XRP': 'XRP-USD', 'ADA': 'ADA-USD',
-        'AVAX': 'AVAX-USD', 'LINK': 'LINK-USD', 'DOT': 'DOT-USD',
-        'JUP': 'JUP-USD', 'PYTH': 'PYTH-USD', 'RAY': 'RAY-USD',
-        'BONK': 'BONK-USD', 'AR': 'AR-USD', 'RENDER': 'RENDER-USD',
-        
-        # US Equity
-        'VTI': 'VTI', 'SPY': 'SPY', 'QQQ': 'QQQ', 'DIA': 'DIA',
-        'AAPL': 'AAPL', 'MSFT': 'MSFT', 'NVDA': 'NVDA', 'AMZN': 'AMZN',
-        'GOOGL': 'GOOGL', 'META': 'META', 'TSLA': 'TSLA', 'BRK-B': 'BRK-B',
-        'JPM': 'JPM', 'UNH': 'UNH', 'V': 'V', 'MA': 'MA', 'COST': 'COST',
-        'PG': 'PG', 'HD': 'HD', 'LLY': 'LLY', 'AVGO': 'AVGO',
-        
-        # Global Equity & ETFs
-        'VT': 'VT', 'VXUS': 'VXUS', 'VEA': 'VEA', 'VWO': 'VWO',
-        'ASML': 'ASML', 'SAP': 'SAP', 'SAMSUNG': '005930.KS',
-        'TOYOTA': 'TM', 'SONY': 'SONY', 'LVMH': 'MC.PA',
-        'BP': 'BP', 'HSBA': 'HSBA.L', 'NESN': 'NESN.SW',
-        
-        # Commodities & Real Estate
-        'GOLD': 'GC=F', 'SILVER': 'SI=F', 'OIL': 'CL=F',
-        'VNQ': 'VNQ', 'REM': 'REM', 'GSG': 'GSG',
-        
-        # Fixed Income
-        'BND': 'BND', 'TLT': 'TLT', 'AGG': 'AGG', 'JNK': 'JNK'
-    }
+    # symbol -> yfinance id for every live instrument, derived once from the master
+    tickers = get_registry().yf_tickers
     
     data = {}
     
     try:
-        tickers_list = list(tickers.values())
+        tickers_list = list(get_registry().yf_batch)
         history = yf.download(tickers_list, period="1mo", interval="1d", progress=False)
         
         if history is None or history.empty:
@@ -124,22 +103,8 @@ def get_live_market_data():
 
 def _get_mock_data(symbol):
     """Fallback mock data with realistic simulation"""
-    base_prices = {
-        'BTC': 102000, 'ETH': 2800, 'SOL': 180, 
-        'BNB': 650, 'XRP': 2.8, 'ADA': 1.1,
-        'AVAX': 45, 'LINK': 22, 'DOT': 9,
-        'VTI': 305, 'GOLD': 2850, 'BONDS': 95,
-        'AAPL': 240, 'NVDA': 148, 'TSLA': 365,
-        'MSFT': 420, 'AMZN': 210, 'GOOGL': 195,
-        'META': 560, 'NFLX': 680, 'AMD': 165,
-        'INTC': 25, 'JPM': 230, 'GS': 520,
-        'XOM': 115, 'CVX': 155, 'BRK-B': 465,
-        'SPY': 600, 'QQQ': 510, 'DIA': 435, 'VNQ': 85, 'USO': 75, 'GDX': 35, 'VT': 110,
-        'BND': 72, 'TLT': 95, 'VXUS': 65, 'VEA': 52, 'VWO': 45
-    }
-    
     history = []
-    base_price = base_prices.get(symbol, 100)
+    base_price = get_registry().base_price(symbol)
     current_price = base_price * 0.95
     
     now = datetime.now()
@@ -204,12 +169,43 @@ def get_market_narrative():
     except Exception as e:
         return "Market is currently in an equilibrium state. Focus on long-term structural trends."
 
+def get_staking_yields():
+    """
+    Jito Staking / Marinade Native rows computed from on-chain stake-pool exchange
+    rates, read from the Solana service's background refresher (never blocks a
+    render). Empty until the refresher has two epochs of rates; callers keep the
+    DefiLlama numbers until then. Headless callers (eval runs, the alert worker)
+    have no running service and also keep the DefiLlama numbers.
+    """
+    service = running_solana_service()
+    if service is None:
+        return {}
+    try:
+        yields = service.get_lst_yields()
+    except Exception as e:
+        print(f"On-chain staking yield error: {e}")
+        return {}
+    sol_price = None
+    rows = {}
+    for name, info in yields.items():
+        tvl = 'N/A'
+        if info.get('tvl_sol'):
+            if sol_price is None:
+                sol_price = (get_live_market_data().get('SOL') or {}).get('price') or 0
+            tvl = f"${info['tvl_sol'] * sol_price / 1e9:.1f}B" if sol_price else f"{info['tvl_sol'] / 1e6:.1f}M SOL"
+        rows[name] = {'apy': info['apy'], 'tvl': tvl}
+    return rows
+
+
 def get_defi_yields():
-    """Get current DeFi yields from DefiLlama API"""
+    """Get current DeFi yields from DefiLlama API; Jito/Marinade come from on-chain rates when available"""
+    staking = get_staking_yields()
     try:
-        response = requests.get("https://yields.llama.fi/pools", timeout=10)
-        response.raise_for_status()
-        pools = response.json()['data']
+        # Uncached: every call downloads the full pool list
+        with timed("defi_llama_pools", cache='miss'):
+            response = requests.get("https://yields.llama.fi/pools", timeout=10)
+            response.raise_for_status()
+            pools = response.json()['data']
         
         results = {
             'Jito Staking': {'apy': 7.8, 'tvl': '1.8B'},
@@ -269,7 +265,8 @@ def get_defi_yields():
                 'apy': round(float(m_pool['apy']), 2),
                 'tvl': f"${m_pool['tvlUsd']/1e6:.1f}M"
             }
-            
+
+        results.update(staking)
         return results
         
     except Exception as e:
@@ -284,7 +281,9 @@ def get_defi_yields():
             'Solend Lending': 12.4 + random.uniform(-0.5, 0.5),
             'Marginfi Yield': 14.2 + random.uniform(-0.5, 0.5)
         }
-        return {k: {'apy': round(v, 2), 'tvl': 'N/A'} for k, v in base_yields.items()}
+        results = {k: {'apy': round(v, 2), 'tvl': 'N/A'} for k, v in base_yields.items()}
+        results.update(staking)
+        return results
 
 def get_portfolio_growth_projection(initial_capital, monthly_investment, years, annual_return):
     """Calculate portfolio growth over time"""
@@ -307,19 +306,9 @@ def get_portfolio_growth_projection(initial_capital, monthly_investment, years,
     
     return portfolio_values
 
-@st.cache_data(ttl=3600)
 def get_global_exchange_rates():
-    """Get live currency exchange rates (USD based)"""
-    return {
-        'USD': 1.0,
-        'EUR': 0.92,
-        'GBP': 0.79,
-        'JPY': 148.5,
-        'CAD': 1.35,
-        'AUD': 1.52,
-        'INR': 83.1,
-        'NGN': 1450.0
-    }
+    """Get live currency exchange rates (USD based); see fx_rates for sources and caching"""
+    return get_rate_table().usd_rates()
 
 def get_strategy_vaults():
     """Managed investment buckets inspired by Strum Capital"""
@@ -353,68 +342,6 @@ def get_strategy_vaults():
         }
     ]
 
-@st.cache_data(ttl=3600)
 def get_asset_registry():
-    """Returns a curated list of global assets with metadata for searchability"""
-    return [
-        # Crypto
-        {'symbol': 'BTC', 'name': 'Bitcoin', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'ETH', 'name': 'Ethereum', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'SOL', 'name': 'Solana', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'BNB', 'name': 'Binance Coin', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'XRP', 'name': 'Ripple', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'ADA', 'name': 'Cardano', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'AVAX', 'name': 'Avalanche', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'LINK', 'name': 'Chainlink', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'DOT', 'name': 'Polkadot', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'JUP', 'name': 'Jupiter', 'category': 'Crypto', 'region': 'Solana'},
-        {'symbol': 'PYTH', 'name': 'Pyth Network', 'category': 'Crypto', 'region': 'Solana'},
-        {'symbol': 'RAY', 'name': 'Raydium', 'category': 'Crypto', 'region': 'Solana'},
-        {'symbol': 'BONK', 'name': 'Bonk', 'category': 'Crypto', 'region': 'Solana'},
-        {'symbol': 'AR', 'name': 'Arweave', 'category': 'Crypto', 'region': 'Global'},
-        {'symbol': 'RENDER', 'name': 'Render Token', 'category': 'Crypto', 'region': 'Global'},
-        
-        # US Equity
-        {'symbol': 'AAPL', 'name': 'Apple Inc.', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'MSFT', 'name': 'Microsoft Corp', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'NVDA', 'name': 'NVIDIA Corp', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'AMZN', 'name': 'Amazon.com', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'GOOGL', 'name': 'Alphabet Inc.', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'META', 'name': 'Meta Platforms', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'TSLA', 'name': 'Tesla, Inc.', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'BRK-B', 'name': 'Berkshire Hathaway', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'JPM', 'name': 'JPMorgan Chase', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'UNH', 'name': 'UnitedHealth Group', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'V', 'name': 'Visa Inc.', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'MA', 'name': 'Mastercard Inc.', 'category': 'Equity', 'region': 'US'},
-        {'symbol': 'COST', 'name': 'Costco Wholesale', 'category': 'Equity', 'region': 'US'},
-        
-        # Global Equity
-        {'symbol': 'ASML', 'name': 'ASML Holding', 'category': 'Equity', 'region': 'Europe'},
-        {'symbol': 'SAP', 'name': 'SAP SE', 'category': 'Equity', 'region': 'Europe'},
-        {'symbol': 'SAMSUNG', 'name': 'Samsung Electronics', 'category': 'Equity', 'region': 'Asia'},
-        {'symbol': 'TOYOTA', 'name': 'Toyota Motor', 'category': 'Equity', 'region': 'Asia'},
-        {'symbol': 'SONY', 'name': 'Sony Group', 'category': 'Equity', 'region': 'Asia'},
-        {'symbol': 'LVMH', 'name': 'LVMH Moet Hennessy', 'category': 'Equity', 'region': 'Europe'},
-        {'symbol': 'BP', 'name': 'BP plc', 'category': 'Equity', 'region': 'Europe'},
-        {'symbol': 'HSBA', 'name': 'HSBC Holdings', 'category': 'Equity', 'region': 'Europe'},
-        {'symbol': 'NESN', 'name': 'Nestle S.A.', 'category': 'Equity', 'region': 'Europe'},
-        
-        # ETFs
-        {'symbol': 'VTI', 'name': 'Vanguard Total Stock', 'category': 'ETF', 'region': 'US'},
-        {'symbol': 'SPY', 'name': 'SPDR S&P 500', 'category': 'ETF', 'region': 'US'},
-        {'symbol': 'QQQ', 'name': 'Invesco QQQ Trust', 'category': 'ETF', 'region': 'US'},
-        {'symbol': 'VT', 'name': 'Vanguard Total World', 'category': 'ETF', 'region': 'Global'},
-        {'symbol': 'VXUS', 'name': 'Vanguard Total Intl', 'category': 'ETF', 'region': 'Global'},
-        {'symbol': 'VWO', 'name': 'Vanguard EM ETF', 'category': 'ETF', 'region': 'Emerging'},
-        {'symbol': 'VNQ', 'name': 'Vanguard Real Estate', 'category': 'ETF', 'region': 'US'},
-        
-        # Commodities
-        {'symbol': 'GOLD', 'name': 'Gold (Comex)', 'category': 'Commodity', 'region': 'Global'},
-        {'symbol': 'SILVER', 'name': 'Silver (Comex)', 'category': 'Commodity', 'region': 'Global'},
-        {'symbol': 'OIL', 'name': 'Crude Oil', 'category': 'Commodity', 'region': 'Global'},
-        
-        # Fixed Income
-        {'symbol': 'BND', 'name': 'Vanguard Total Bond', 'category': 'Fixed Income', 'region': 'US'},
-        {'symbol': 'TLT', 'name': '20+ Year Treasury', 'category': 'Fixed Income', 'region': 'US'}
-    ]
\ No newline at end of file
+    """Returns a curated list of global assets with metadata for searchability (see asset_registry.py)"""
+    return get_registry().assets
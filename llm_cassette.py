@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+MODES = ('off', 'record', 'replay', 'auto')
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recording matches the request"""
+
+
+class CassetteResponse:
+    """Stands in for an SDK response; callers only read .text"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _normalize(obj):
+    """Makes prompts (str, lists, dicts with raw audio bytes) JSON serializable"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {'sha256': hashlib.sha256(bytes(obj)).hexdigest()}
+    if isinstance(obj, dict):
+        return {str(k): _normalize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_normalize(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    return repr(obj)
+
+
+def request_key(model_name, prompt, generation_config=None):
+    payload = json.dumps(
+        {'model': model_name, 'prompt': _normalize(prompt), 'config': _normalize(generation_config)},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """
+    Gzip JSONL store of prompt -> response pairs. Each record is appended as its
+    own gzip member so a crash never corrupts earlier recordings.
+
+    Lookup is by exact request hash. When a `scope` is given (e.g. the profile a
+    plan was generated for) replay mode falls back to the latest recording for the
+    same model and scope, so prompts that embed live prices still replay offline.
+    Auto mode only replays exact matches and records anything else.
+    """
+
+    def __init__(self, path, mode='auto'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_scope = {}
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @property
+    def replays(self):
+        return self.mode in ('replay', 'auto')
+
+    @property
+    def records(self):
+        return self.mode in ('record', 'auto')
+
+    def _index(self, entry):
+        self._by_key[entry['key']] = entry
+        if entry.get('scope'):
+            self._by_scope[(entry['model'], entry['scope'])] = entry
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._index(json.loads(line))
+        except (OSError, EOFError, json.JSONDecodeError) as e:
+            # Torn last member after a crash: keep everything read so far
+            print(f"Cassette {self.path}: stopped reading at damaged record ({e})")
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def entries(self):
+        return list(self._by_key.values())
+
+    def lookup(self, model_name, prompt, generation_config=None, scope=None):
+        key = request_key(model_name, prompt, generation_config)
+        with self._lock:
+            entry = self._by_key.get(key)
+            # Scope matches only in replay mode; in auto mode a changed prompt is recorded afresh
+            if entry is None and scope and self.mode == 'replay':
+                entry = self._by_scope.get((model_name, scope))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return CassetteResponse(entry['text'])
+
+    def record(self, model_name, prompt, text, generation_config=None, scope=None):
+        entry = {
+            'key': request_key(model_name, prompt, generation_config),
+            'model': model_name,
+            'scope': scope,
+            'prompt': prompt if isinstance(prompt, str) else None,
+            'text': text,
+            'recorded_at': time.time()
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(gzip.compress(line))
+            self._index(entry)
+
+
+_active = None
+_active_lock = threading.Lock()
+
+
+def use_cassette(path, mode='auto'):
+    """Activates a cassette for every LLM call in this process (mode='off' disables)"""
+    global _active
+    with _active_lock:
+        _active = None if mode == 'off' else Cassette(path, mode)
+    return _active
+
+
+def get_cassette():
+    """Active cassette, configured via GOALWEALTH_LLM_CASSETTE(_MODE) on first use"""
+    if _active is None:
+        path = os.environ.get('GOALWEALTH_LLM_CASSETTE')
+        if path:
+            use_cassette(path, os.environ.get('GOALWEALTH_LLM_CASSETTE_MODE', 'auto'))
+    return _active
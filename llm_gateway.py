@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import google.generativeai as genai
+
+from llm_cassette import CassetteMiss, get_cassette
+from render_profiler import count, timed
+
+# Free-tier Gemini limits are per key, so every caller in the process shares one quota.
+DEFAULT_MAX_CONCURRENT = int(os.environ.get('GOALWEALTH_LLM_MAX_CONCURRENT', 2))
+DEFAULT_RPM = int(os.environ.get('GOALWEALTH_LLM_RPM', 15))
+
+
+class LLMQuotaManager:
+    """Caps concurrent LLM calls and requests per minute across threads"""
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, requests_per_minute=DEFAULT_RPM):
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_minute = max(1, requests_per_minute)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._recent = deque()
+
+    def _wait_for_rate(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 60:
+                    self._recent.popleft()
+                if len(self._recent) < self.requests_per_minute:
+                    self._recent.append(now)
+                    return
+                wait = 60 - (now - self._recent[0])
+            time.sleep(max(wait, 0.05))
+
+    @contextmanager
+    def slot(self):
+        """Blocks until a call is allowed, then holds a concurrency slot"""
+        self._slots.acquire()
+        try:
+            self._wait_for_rate()
+            yield
+        finally:
+            self._slots.release()
+
+
+_quota = LLMQuotaManager()
+
+
+def get_quota_manager():
+    return _quota
+
+
+def configure_quota(max_concurrent=None, requests_per_minute=None):
+    """Replaces the shared quota (e.g. for a paid tier or a parallel eval run)"""
+    global _quota
+    _quota = LLMQuotaManager(
+        max_concurrent or _quota.max_concurrent,
+        requests_per_minute or _quota.requests_per_minute
+    )
+    return _quota
+
+
+def call_llm(model_name, prompt, call, generation_config=None, scope=None):
+    """
+    Runs `call()` (the actual SDK request) through the cassette and the shared quota.
+    Replayed responses never touch the network or the quota; live responses are
+    recorded when the active cassette is in record/auto mode.
+    """
+    cassette = get_cassette()
+    if cassette is not None and cassette.replays:
+        response = cassette.lookup(model_name, prompt, generation_config, scope)
+        if response is not None:
+            count(f"llm:{model_name}", True)
+            return response
+        if cassette.mode == 'replay':
+            raise CassetteMiss(f"No recording for {model_name} (scope={scope}) in {cassette.path}")
+
+    with timed(f"llm:{model_name}", kind='llm', cache='miss'), _quota.slot():
+        response = call()
+
+    if cassette is not None and cassette.records:
+        text = getattr(response, 'text', None)
+        if text:
+            cassette.record(model_name, prompt, text, generation_config, scope)
+    return response
+
+
+def generate_content(api_key, model_name, prompt, generation_config=None, scope=None):
+    """Single Gemini call routed through the cassette and the shared quota"""
+    def call():
+        genai.configure(api_key=api_key)
+        model = genai.GenerativeModel(model_name, generation_config=generation_config)
+        return model.generate_content(prompt)
+
+    return call_llm(model_name, prompt, call, generation_config, scope)
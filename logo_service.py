@@ -0,0 +1,205 @@
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import streamlit as st
+
+from asset_registry import get_registry, load_logo_duplicates
+from render_profiler import count, timed
+
+LOGO_DIR = Path(__file__).parent / 'assets' / 'logos'
+MAX_CACHED_LOGOS = int(os.environ.get('GOALWEALTH_LOGO_CACHE_SIZE', 256))
+USE_SPRITES = os.environ.get('GOALWEALTH_LOGO_SPRITES', '1') != '0'
+# Resized variant to embed (see build_logo_assets.py); 64px covers every UI size at 2x
+LOGO_VARIANT = os.environ.get('GOALWEALTH_LOGO_VARIANT', '64')
+MIME_TYPES = {'.png': 'image/png', '.webp': 'image/webp'}
+
+# Instrument logos come from the instrument master (data/instruments.csv);
+# these are the non-instrument symbols that still need an icon
+CURRENCY_LOGOS = {
+    'USD': 'usdc.png', 'EUR': 'eur.png', 'GBP': 'gbp.png',
+    'JPY': 'jpy.png', 'NGN': 'ngn.png'
+}
+
+# Fallback to emoji for assets without downloaded logos
+ASSET_EMOJI = {
+    'BTC': '₿', 'ETH': 'Ξ', 'SOL': '◎', 'BNB': '🔶',
+    'VTI': '📊', 'BND': '📜', 'GOLD': '🟡', 'BONDS': '📜',
+    'AAPL': '🍎', 'TSLA': '⚡', 'NVDA': '🟩'
+}
+
+PROTOCOL_LOGOS = {
+    'Jito Staking': 'jito.png',
+    'Jitovaults': 'jito.png',
+    'Raydium Pools': 'ray.png',
+    'Raydium': 'ray.png',
+    'Kamino Vaults': 'kamino.png',
+    'Kamino': 'kamino.png',
+    'Orca Whirlpools': 'orca.png',
+    'Orca': 'orca.png',
+    'Marinade Native': 'marinade.png',
+    'Marinade': 'marinade.png',
+    'Solend Lending': 'solend.png',
+    'Solend': 'solend.png',
+    'Marginfi Yield': 'marginfi.png',
+    'Marginfi': 'marginfi.png'
+}
+
+PROTOCOL_EMOJI = {
+    'Jito Staking': '🥩', 'Raydium Pools': '🔆',
+    'Kamino Vaults': '⚡', 'Marinade Native': '💧',
+    'Orca Whirlpools': '🐋', 'Solend Lending': '🏦'
+}
+
+
+def css_class_for(filename):
+    """Sprite class name for a logo file, e.g. brk-b.png -> lg-brk-b"""
+    return "lg-" + Path(filename).stem.lower().replace('.', '-').replace('_', '-')
+
+
+class LogoService:
+    """
+    Reads and base64-encodes each logo file once, keeping the data URIs in an
+    LRU-bounded map. Missing files are remembered too, so a bad mapping costs
+    one stat() per process instead of one per render. Resized variants from
+    build_logo_assets.py are used when their manifest is present, and logos
+    download_logos.py deduplicated are read from their canonical file.
+    """
+
+    def __init__(self, logo_dir=LOGO_DIR, max_entries=MAX_CACHED_LOGOS, variant=LOGO_VARIANT, asset_logos=None):
+        self.logo_dir = Path(logo_dir)
+        self.asset_logos = asset_logos if asset_logos is not None else dict(CURRENCY_LOGOS)
+        self.max_entries = max(1, max_entries)
+        self.variant = str(variant)
+        self._optimized = self._load_manifest()
+        self._duplicates = load_logo_duplicates(self.logo_dir)
+        self._uris = OrderedDict()
+        self._missing = set()
+        self._filename_by_uri = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def data_uri(self, filename):
+        with self._lock:
+            uri = self._uris.get(filename)
+            if uri is not None:
+                self._uris.move_to_end(filename)
+                self.hits += 1
+                count('logo_uri', True)
+                return uri
+            if filename in self._missing:
+                return None
+            self.misses += 1
+
+        count('logo_uri', False)
+        with timed(f"logo:{filename}", kind='logo'):
+            uri = self._load(filename)
+        with self._lock:
+            if uri is None:
+                self._missing.add(filename)
+                return None
+            self._uris[filename] = uri
+            self._filename_by_uri[uri] = filename
+            while len(self._uris) > self.max_entries:
+                _, evicted = self._uris.popitem(last=False)
+                self._filename_by_uri.pop(evicted, None)
+        return uri
+
+    def _load_manifest(self):
+        """Optimized variants from build_logo_assets.py, keyed by source filename"""
+        path = self.logo_dir / 'optimized' / 'manifest.json'
+        try:
+            if path.exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('logos', {})
+        except Exception as e:
+            print(f"Logo manifest error: {e}")
+        return {}
+
+    def _resolve(self, filename):
+        """Prefers the resized variant unless the source changed since the build"""
+        filename = self._duplicates.get(filename, filename)
+        path = self.logo_dir / filename
+        entry = self._optimized.get(filename)
+        if entry and self.variant in entry.get('variants', {}):
+            optimized = self.logo_dir / 'optimized' / entry['variants'][self.variant]['file']
+            try:
+                if optimized.exists() and path.stat().st_size == entry.get('source_bytes'):
+                    return optimized
+            except OSError:
+                pass
+        return path
+
+    def _load(self, filename):
+        try:
+            path = self._resolve(filename)
+            if path.exists():
+                mime = MIME_TYPES.get(path.suffix.lower(), 'image/png')
+                with open(path, 'rb') as f:
+                    return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+        except Exception as e:
+            print(f"Logo load error ({filename}): {e}")
+        return None
+
+    def preload(self, filenames=None):
+        """Encodes every mapped logo up front (one pass at startup)"""
+        if filenames is None:
+            filenames = sorted(set(self.asset_logos.values()) | set(PROTOCOL_LOGOS.values()))
+        for filename in filenames:
+            self.data_uri(filename)
+        return len(self._uris)
+
+    def asset_logo(self, symbol):
+        """Data URI for a ticker symbol, or an emoji fallback"""
+        symbol = symbol.upper()
+        filename = self.asset_logos.get(symbol)
+        if filename:
+            uri = self.data_uri(filename)
+            if uri:
+                return uri
+        return ASSET_EMOJI.get(symbol, '💰')
+
+    def protocol_logo(self, name):
+        """Data URI for a DeFi protocol, or an emoji fallback"""
+        filename = PROTOCOL_LOGOS.get(name)
+        if filename:
+            uri = self.data_uri(filename)
+            if uri:
+                return uri
+        return PROTOCOL_EMOJI.get(name, '💰')
+
+    def sprite_css(self, filenames=None):
+        """One stylesheet defining each logo once as a background class (all cached logos by default)"""
+        with self._lock:
+            items = [(f, uri) for f, uri in self._uris.items() if filenames is None or f in filenames]
+        rules = [".logo-sprite{display:inline-block;flex-shrink:0;background-size:contain;"
+                 "background-repeat:no-repeat;background-position:center;background-origin:content-box;}"]
+        rules.extend(f".{css_class_for(filename)}{{background-image:url({uri});}}" for filename, uri in items)
+        return "<style>" + "".join(rules) + "</style>"
+
+    def icon_html(self, icon_val, class_name="ticker-logo", style="", used=None):
+        """
+        Logo markup: a sprite class reference when possible, else <img> or emoji.
+        Pass a set as `used` to collect the files whose classes must be in sprite_css.
+        """
+        if isinstance(icon_val, str) and icon_val.startswith('data:image'):
+            filename = self._filename_by_uri.get(icon_val) if used is not None else None
+            if filename:
+                used.add(filename)
+                sprite = css_class_for(filename)
+                return f'<span class="{class_name} logo-sprite {sprite}" style="{style}"></span>'
+            return f'<img src="{icon_val}" class="{class_name}" style="{style}">'
+        # It's an emoji
+        return f'<div class="ticker-icon" style="display:inline-block; {style}">{icon_val}</div>'
+
+
+@st.cache_resource
+def get_logo_service():
+    """Process-wide logo service, preloaded once per server"""
+    service = LogoService(asset_logos={**CURRENCY_LOGOS, **get_registry().logo_by_symbol})
+    service.preload()
+    return service
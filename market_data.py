@@ -2,6 +2,9 @@ import yfinance as yf
 import requests
 from datetime import datetime
 
+from asset_registry import get_registry
+from portfolio_valuation import value_holdings, category_aggregates
+
 def get_stock_prices(tickers):
     """
     Fetch real-time stock/ETF prices
@@ -52,13 +55,8 @@ def get_crypto_prices(symbols):
         response = requests.get(url)
         data = response.json()
         
-        name_map = {
-            'bitcoin': 'Bitcoin',
-            'ethereum': 'Ethereum',
-            'solana': 'Solana',
-            'raydium': 'Raydium',
-            'jupiter-exchange-solana': 'Jupiter'
-        }
+        # Display names come from the instrument master's CoinGecko index
+        name_map = get_registry().name_by_coingecko
         
         for symbol in symbols:
             if symbol in data:
@@ -92,50 +90,39 @@ def calculate_portfolio_value(holdings, stock_prices, crypto_prices):
     }
     """
     
-    total_value = 0
+    # One vectorized valuation over both books; the asset type is the category
+    rows, quotes, types, names = [], {}, {}, {}
+    for ticker, shares in holdings.get('stocks', {}).items():
+        if ticker in stock_prices:
+            rows.append({'symbol': ticker, 'qty': shares, 'cost': 0.0})
+            quotes[ticker] = {'price': stock_prices[ticker]['price'], 'change_24h': stock_prices[ticker]['change_pct']}
+            types[ticker], names[ticker] = 'stock', stock_prices[ticker]['name']
+    for symbol, amount in holdings.get('crypto', {}).items():
+        if symbol in crypto_prices:
+            rows.append({'symbol': symbol, 'qty': amount, 'cost': 0.0})
+            quotes[symbol] = {'price': crypto_prices[symbol]['price'], 'change_24h': crypto_prices[symbol]['change_24h']}
+            types[symbol], names[symbol] = 'crypto', crypto_prices[symbol]['name']
+
+    valued = value_holdings(rows, quotes, categories=types)
+    by_type = category_aggregates(valued)['market_value'] if rows else {}
+
     breakdown = {
-        'traditional': 0,
-        'crypto': 0,
-        'details': []
+        'traditional': float(by_type.get('stock', 0)),
+        'crypto': float(by_type.get('crypto', 0)),
+        'details': [
+            {
+                'asset': names[row.symbol],
+                'ticker': row.symbol if row.category == 'stock' else row.symbol.upper(),
+                'amount': row.qty,
+                'price': row.price,
+                'value': row.market_value,
+                'change': row.change_24h,
+                'type': row.category
+            }
+            for row in valued.itertuples(index=False)
+        ]
     }
-    
-    # Calculate stocks
-    if 'stocks' in holdings:
-        for ticker, shares in holdings['stocks'].items():
-            if ticker in stock_prices:
-                value = shares * stock_prices[ticker]['price']
-                total_value += value
-                breakdown['traditional'] += value
-                
-                breakdown['details'].append({
-                    'asset': stock_prices[ticker]['name'],
-                    'ticker': ticker,
-                    'amount': shares,
-                    'price': stock_prices[ticker]['price'],
-                    'value': value,
-                    'change': stock_prices[ticker]['change_pct'],
-                    'type': 'stock'
-                })
-    
-    # Calculate crypto
-    if 'crypto' in holdings:
-        for symbol, amount in holdings['crypto'].items():
-            if symbol in crypto_prices:
-                value = amount * crypto_prices[symbol]['price']
-                total_value += value
-                breakdown['crypto'] += value
-                
-                breakdown['details'].append({
-                    'asset': crypto_prices[symbol]['name'],
-                    'ticker': symbol.upper(),
-                    'amount': amount,
-                    'price': crypto_prices[symbol]['price'],
-                    'value': value,
-                    'change': crypto_prices[symbol]['change_24h'],
-                    'type': 'crypto'
-                })
-    
-    breakdown['total'] = total_value
+    breakdown['total'] = breakdown['traditional'] + breakdown['crypto']
     
     return breakdown
 
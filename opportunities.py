@@ -1,3 +1,11 @@
+import hashlib
+import operator
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
 try:
     from opik import track
 except ImportError:
@@ -5,113 +13,302 @@ except ImportError:
         return lambda f: f
 
 
+# --- Rules (data) ---
+#
+# assets:  None (profile-only rule), '*' (every ticker in the snapshot),
+#          'category:<name>' (registry category) or a tuple of symbols
+# signal:  one of SIGNALS, compared to threshold with op
+# profile: (field, op, value) filters on the user profile (missing fields use PROFILE_DEFAULTS)
+# asset/reason/action: str.format templates over symbol, name, value, abs_value, price and the profile
+RULES = [
+    {
+        'type': 'BUY_DIP',
+        'assets': ('SOL',), 'signal': 'change_24h', 'op': '<', 'threshold': -5,
+        'asset': '{name} ({symbol})',
+        'reason': '{symbol} is down {abs_value:.1f}% in 24h - potential buy opportunity',
+        'action': 'Consider buying at ${price:.2f} and dollar-cost averaging',
+        'risk': 'Medium'
+    },
+    {
+        'type': 'YIELD_FARMING',
+        'assets': ('SOL',), 'signal': 'move_24h', 'op': '>', 'threshold': 3,
+        'asset': 'Jito Staking',
+        'reason': 'Market volatility ({abs_value:.1f}%) - lock in stable 8-9% APY',
+        'action': 'Stake SOL on Jito (jito.network) for MEV rewards',
+        'risk': 'Low'
+    },
+    {
+        'type': 'DEFI_POOLS',
+        'profile': (('risk_tolerance', 'in', ('High',)),),
+        'asset': 'Raydium Liquidity Pools',
+        'reason': 'High risk tolerance - eligible for 20-25% APY liquidity pools',
+        'action': 'Provide SOL-USDC liquidity on Raydium (raydium.io)',
+        'risk': 'High (Impermanent Loss)'
+    },
+    {
+        'type': 'AUTOMATED_VAULTS',
+        'profile': (('capital', '>', 5000), ('risk_tolerance', 'in', ('Medium', 'High'))),
+        'asset': 'Kamino Finance Vaults',
+        'reason': 'Capital of ${capital:,} can benefit from automated strategies',
+        'action': 'Explore Kamino vaults (kamino.finance) for 25-35% APY',
+        'risk': 'High (Leverage Risk)'
+    },
+    {
+        'type': 'BTC_DCA',
+        'assets': ('BTC',), 'signal': 'change_24h', 'op': '<', 'threshold': -3,
+        'profile': (('risk_tolerance', 'in', ('Low', 'Medium')),),
+        'asset': '{name} ({symbol})',
+        'reason': '{symbol} down {abs_value:.1f}% - good time to dollar-cost average',
+        'action': 'Add to Bitcoin holdings as digital gold hedge',
+        'risk': 'Medium'
+    },
+    {
+        'type': 'REBALANCE',
+        'profile': (('age', '<', 35), ('risk_tolerance', 'not in', ('High',))),
+        'asset': 'Portfolio Rebalance',
+        'reason': 'Young age + long timeline - consider increasing growth allocation',
+        'action': 'Review portfolio: Target 70% stocks, 20% crypto, 10% bonds',
+        'risk': 'Low'
+    }
+]
+
+FALLBACK_OPPORTUNITIES = [
+    {
+        'type': 'JITO_STAKING',
+        'asset': 'Jito Liquid Staking',
+        'reason': 'Earn stable 8-9% APY with low risk',
+        'action': 'Visit jito.network to stake SOL',
+        'risk': 'Low'
+    },
+    {
+        'type': 'EDUCATION',
+        'asset': 'Learning Resources',
+        'reason': 'Build your knowledge before investing',
+        'action': 'Check the Resources tab for guides',
+        'risk': 'None'
+    }
+]
+
+PROFILE_DEFAULTS = {'age': 30, 'capital': 0, 'risk_tolerance': None}
+OPS = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge, '==': operator.eq,
+    'in': lambda a, b: a in b, 'not in': lambda a, b: a not in b
+}
+MEMO_SIZE = 128
+
+
+# --- Signals (vectorized over every ticker) ---
+
+def _price_matrix(market_data, symbols, window):
+    """Last `window` closes per symbol, left-padded with NaN so column -1 is the latest"""
+    matrix = np.full((len(symbols), window), np.nan)
+    for i, symbol in enumerate(symbols):
+        closes = [p['price'] for p in market_data[symbol].get('history', ())[-window:]]
+        if closes:
+            matrix[i, window - len(closes):] = closes
+    return matrix
+
+
+def _drawdown(snap):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (snap['price'] / np.nanmax(snap['closes'], axis=1) - 1) * 100
+
+
+def _momentum_7d(snap):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (snap['price'] / snap['closes'][:, -8] - 1) * 100
+
+
+def _volatility(snap):
+    """Std of daily returns over the window, in %"""
+    closes = snap['closes']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = closes[:, 1:] / closes[:, :-1] - 1
+    counts = np.sum(~np.isnan(returns), axis=1)
+    out = np.full(len(closes), np.nan)
+    ok = counts >= 2
+    out[ok] = np.nanstd(returns[ok], axis=1) * 100
+    return out
+
+
+SIGNALS = {
+    'change_24h': lambda snap: snap['change_24h'],
+    'move_24h': lambda snap: np.abs(snap['change_24h']),
+    'drawdown': _drawdown,
+    'momentum_7d': _momentum_7d,
+    'volatility': _volatility
+}
+HISTORY_SIGNALS = {'drawdown', 'momentum_7d', 'volatility'}
+HISTORY_WINDOW = 30
+
+
+def snapshot_version(market_data):
+    """
+    Content digest of a market snapshot (st.cache_data hands out copies, so not
+    id()). Stable across processes, unlike hash() on strings, so it can be persisted.
+    """
+    rows = "\n".join(f"{s}|{market_data[s].get('price')!r}|{market_data[s].get('change_24h')!r}"
+                     for s in sorted(market_data))
+    return hashlib.blake2b(rows.encode(), digest_size=8).hexdigest()
+
+
+class RuleSet:
+    """
+    Compiled rules. Signals are computed once per snapshot for all tickers as
+    numpy arrays; each rule is one masked comparison over its asset index.
+    Matches are memoized by (snapshot version, profile bucket), where the bucket
+    is the truth value of every distinct profile filter, so only the text is
+    re-rendered for a new profile.
+    """
+
+    def __init__(self, rules=RULES, registry=None):
+        self.rules = list(rules)
+        self.registry = registry
+        filters = []
+        for rule in self.rules:
+            if rule.get('signal') and rule['signal'] not in SIGNALS:
+                raise ValueError(f"Unknown signal {rule['signal']!r} in rule {rule['type']}")
+            if rule.get('op', '<') not in OPS:
+                raise ValueError(f"Unknown op {rule['op']!r} in rule {rule['type']}")
+            for f in rule.get('profile', ()):
+                if f[1] not in OPS:
+                    raise ValueError(f"Unknown profile op {f[1]!r} in rule {rule['type']}")
+                if f not in filters:
+                    filters.append(f)
+        self.filters = filters
+        self._rule_filters = [[filters.index(f) for f in rule.get('profile', ())] for rule in self.rules]
+        self.signals = {r['signal'] for r in self.rules if r.get('signal')}
+        self._memo = OrderedDict()
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def profile_bucket(self, profile):
+        values = {**PROFILE_DEFAULTS, **{k: v for k, v in profile.items() if v is not None}}
+        return tuple(OPS[op](values.get(field), value) for field, op, value in self.filters)
+
+    def _snapshot(self, market_data, version):
+        """Symbols, prices and the signals these rules use, computed once per snapshot version"""
+        with self._lock:
+            snap = self._snapshots.get(version)
+        if snap is not None:
+            return snap
+        symbols = list(market_data)
+        snap = {
+            'symbols': symbols,
+            'index': {s: i for i, s in enumerate(symbols)},
+            'price': np.array([market_data[s].get('price') or np.nan for s in symbols], dtype=float),
+            'change_24h': np.array([market_data[s].get('change_24h', 0.0) for s in symbols], dtype=float)
+        }
+        if self.signals & HISTORY_SIGNALS:
+            snap['closes'] = _price_matrix(market_data, symbols, HISTORY_WINDOW)
+        snap['values'] = {name: SIGNALS[name](snap) for name in self.signals}
+        with self._lock:
+            self._snapshots[version] = snap
+            while len(self._snapshots) > 4:
+                self._snapshots.popitem(last=False)
+        return snap
+
+    def _asset_index(self, rule, snap):
+        assets = rule.get('assets')
+        if assets == '*':
+            return np.arange(len(snap['symbols']))
+        if isinstance(assets, str) and assets.startswith('category:'):
+            members = self.registry.in_category(assets.split(':', 1)[1]) if self.registry else []
+            symbols = [a['symbol'] for a in members]
+        else:
+            symbols = assets
+        return np.array([snap['index'][s] for s in symbols if s in snap['index']], dtype=int)
+
+    def evaluate(self, market_data, profile):
+        """[(rule index, symbol or None, signal value, price)] in rule order, memoized"""
+        version = snapshot_version(market_data)
+        bucket = self.profile_bucket(profile)
+        key = (version, bucket)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        snap = self._snapshot(market_data, version)
+        matches = []
+        for r, rule in enumerate(self.rules):
+            if not all(bucket[f] for f in self._rule_filters[r]):
+                continue
+            if not rule.get('assets'):
+                matches.append((r, None, None, None))
+                continue
+            idx = self._asset_index(rule, snap)
+            if not len(idx):
+                continue
+            values = snap['values'][rule['signal']][idx]
+            with np.errstate(invalid='ignore'):
+                hit = OPS[rule.get('op', '<')](values, rule['threshold'])
+            symbols, prices = snap['symbols'], snap['price']
+            hit_idx = idx[hit]
+            matches.extend(zip([r] * len(hit_idx), [symbols[i] for i in hit_idx.tolist()],
+                               values[hit].tolist(), prices[hit_idx].tolist()))
+
+        with self._lock:
+            self._memo[key] = matches
+            while len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return matches
+
+    def render(self, match, profile):
+        """One evaluate() match as an opportunity dict (type, asset, reason, action, risk)"""
+        r, symbol, value, price = match
+        rule = self.rules[r]
+        fields = {**PROFILE_DEFAULTS, **profile, 'symbol': symbol, 'value': value, 'price': price,
+                  'abs_value': abs(value) if value is not None else None, 'name': self._name(symbol)}
+        return {
+            'type': rule['type'],
+            'asset': rule['asset'].format(**fields),
+            'reason': rule['reason'].format(**fields),
+            'action': rule['action'].format(**fields),
+            'risk': rule['risk']
+        }
+
+    def alert_key(self, match):
+        """Stable identity of a match across snapshots: rule type + symbol"""
+        return f"{self.rules[match[0]]['type']}:{match[1] or ''}"
+
+    def scan(self, market_data, profile):
+        """Opportunity dicts for this snapshot and profile"""
+        return [self.render(match, profile) for match in self.evaluate(market_data, profile)]
+
+    def _name(self, symbol):
+        if symbol is None or self.registry is None:
+            return symbol
+        asset = self.registry.instrument(symbol)
+        return asset['name'] if asset else symbol
+
+
+@st.cache_resource
+def get_ruleset():
+    """Compiled default rules (and their memo) shared by every session"""
+    from asset_registry import get_registry
+    return RuleSet(RULES, get_registry())
+
+
 @track(project_name="goalwealth", tags=["opportunities"])
 def check_opportunities(user_profile):
     """
     Check for investment opportunities based on market conditions and user profile
-    
+
     Args:
         user_profile: Dict with 'age', 'risk_tolerance', 'capital'
-    
+
     Returns:
         List of opportunity dicts with type, asset, reason, action, risk
     """
-    
-    opportunities = []
-    
     try:
         # Try to get live market data from live_data.py for consistency
         from live_data import get_live_market_data
-        
-        market_data = get_live_market_data()
-        
-        sol_data = market_data.get('SOL', {})
-        btc_data = market_data.get('BTC', {})
-        
-        sol_price = sol_data.get('price', 0)
-        sol_change = sol_data.get('change_24h', 0)
-        btc_change = btc_data.get('change_24h', 0)
-        
-        # Opportunity 1: Solana Dip Buy
-        if sol_change < -5:
-            opportunities.append({
-                'type': 'BUY_DIP',
-                'asset': 'Solana (SOL)',
-                'reason': f'SOL is down {abs(sol_change):.1f}% in 24h - potential buy opportunity',
-                'action': f'Consider buying at ${sol_price:.2f} and dollar-cost averaging',
-                'risk': 'Medium'
-            })
-        
-        # Opportunity 2: Market Volatility = Staking Time
-        if abs(sol_change) > 3:
-            opportunities.append({
-                'type': 'YIELD_FARMING',
-                'asset': 'Jito Staking',
-                'reason': f'Market volatility ({abs(sol_change):.1f}%) - lock in stable 8-9% APY',
-                'action': 'Stake SOL on Jito (jito.network) for MEV rewards',
-                'risk': 'Low'
-            })
-        
-        # Opportunity 3: High Risk Tolerance = DeFi
-        if user_profile.get('risk_tolerance') == 'High':
-            opportunities.append({
-                'type': 'DEFI_POOLS',
-                'asset': 'Raydium Liquidity Pools',
-                'reason': 'High risk tolerance - eligible for 20-25% APY liquidity pools',
-                'action': 'Provide SOL-USDC liquidity on Raydium (raydium.io)',
-                'risk': 'High (Impermanent Loss)'
-            })
-        
-        # Opportunity 4: Large Capital = Kamino Vaults
-        if user_profile.get('capital', 0) > 5000 and user_profile.get('risk_tolerance') in ['Medium', 'High']:
-            opportunities.append({
-                'type': 'AUTOMATED_VAULTS',
-                'asset': 'Kamino Finance Vaults',
-                'reason': f'Capital of ${user_profile["capital"]:,} can benefit from automated strategies',
-                'action': 'Explore Kamino vaults (kamino.finance) for 25-35% APY',
-                'risk': 'High (Leverage Risk)'
-            })
-        
-        # Opportunity 5: Bitcoin Dip (for conservative investors)
-        if btc_change < -3 and user_profile.get('risk_tolerance') in ['Low', 'Medium']:
-            opportunities.append({
-                'type': 'BTC_DCA',
-                'asset': 'Bitcoin (BTC)',
-                'reason': f'BTC down {abs(btc_change):.1f}% - good time to dollar-cost average',
-                'action': 'Add to Bitcoin holdings as digital gold hedge',
-                'risk': 'Medium'
-            })
-        
-        # Opportunity 6: Rebalancing Alert
-        if user_profile.get('age', 30) < 35 and user_profile.get('risk_tolerance') != 'High':
-            opportunities.append({
-                'type': 'REBALANCE',
-                'asset': 'Portfolio Rebalance',
-                'reason': 'Young age + long timeline - consider increasing growth allocation',
-                'action': 'Review portfolio: Target 70% stocks, 20% crypto, 10% bonds',
-                'risk': 'Low'
-            })
-        
+
+        return get_ruleset().scan(get_live_market_data(), user_profile)
     except Exception as e:
         # Fallback opportunities if market data fails
-        opportunities = [
-            {
-                'type': 'JITO_STAKING',
-                'asset': 'Jito Liquid Staking',
-                'reason': 'Earn stable 8-9% APY with low risk',
-                'action': 'Visit jito.network to stake SOL',
-                'risk': 'Low'
-            },
-            {
-                'type': 'EDUCATION',
-                'asset': 'Learning Resources',
-                'reason': 'Build your knowledge before investing',
-                'action': 'Check the Resources tab for guides',
-                'risk': 'None'
-            }
-        ]
-    
-    return opportunities
+        return [dict(o) for o in FALLBACK_OPPORTUNITIES]
 
 
 # For testing
@@ -121,12 +318,12 @@ if __name__ == "__main__":
         'risk_tolerance': 'High',
         'capital': 15000
     }
-    
+
     opps = check_opportunities(test_profile)
-    
+
     print(f"\nFound {len(opps)} opportunities:\n")
     for i, opp in enumerate(opps, 1):
         print(f"{i}. {opp['type']}: {opp['asset']}")
         print(f"   Reason: {opp['reason']}")
         print(f"   Action: {opp['action']}")
-        print(f"   Risk: {opp['risk']}\n")
\ No newline at end of file
+        print(f"   Risk: {opp['risk']}\n")
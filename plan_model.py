@@ -0,0 +1,268 @@
+import json
+from dataclasses import dataclass, field, asdict
+
+# JSON layout the planner asks Gemini to return. Kept as plain JSON (not an SDK
+# schema object) so it can be embedded in the prompt and works across SDK versions.
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["title", "thesis", "allocations", "steps", "risks"],
+    "properties": {
+        "title": {"type": "string"},
+        "reasoning": {"type": "string", "description": "CIO reasoning trace: synthesis, drafts, SWOT audit"},
+        "thesis": {"type": "string", "description": "Macro logic behind the selected strategy"},
+        "allocations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["asset_class", "target_pct", "ticker", "platform", "timing"],
+                "properties": {
+                    "asset_class": {"type": "string"},
+                    "target_pct": {"type": "number", "description": "0-100, rows must sum to 100"},
+                    "ticker": {"type": "string", "description": "Exact ticker or protocol"},
+                    "platform": {"type": "string"},
+                    "timing": {"type": "string"},
+                    "monthly_amount": {"type": "number", "description": "Share of the monthly contribution"}
+                }
+            }
+        },
+        "projections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["year", "conservative", "moderate", "aggressive"],
+                "properties": {
+                    "year": {"type": "integer"},
+                    "conservative": {"type": "number"},
+                    "moderate": {"type": "number"},
+                    "aggressive": {"type": "number"}
+                }
+            }
+        },
+        "steps": {"type": "array", "items": {"type": "string"}},
+        "risks": {"type": "array", "items": {"type": "string"}}
+    }
+}
+
+
+SOURCE_FOOTERS = {
+    "fallback": "*Generated by GoalWealth Quantitative Core (Fallback Mode).*",
+    "engine": "*Generated instantly by GoalWealth Quantitative Core (Rule-Based Engine).*",
+}
+
+
+class PlanValidationError(ValueError):
+    """Raised when a model response cannot be turned into a Plan"""
+
+
+@dataclass
+class AllocationRow:
+    asset_class: str
+    target_pct: float
+    ticker: str
+    platform: str
+    timing: str
+    monthly_amount: float = 0.0
+
+
+@dataclass
+class Projection:
+    year: int
+    conservative: float
+    moderate: float
+    aggressive: float
+
+
+@dataclass
+class Plan:
+    title: str
+    thesis: str
+    allocations: list
+    projections: list = field(default_factory=list)
+    steps: list = field(default_factory=list)
+    risks: list = field(default_factory=list)
+    reasoning: str = ""
+    currency_symbol: str = "$"
+    source: str = "llm"
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    @classmethod
+    def from_dict(cls, data, currency_symbol="$", source="llm"):
+        """Validate a decoded JSON object and build a Plan from it"""
+        if not isinstance(data, dict):
+            raise PlanValidationError("Plan must be a JSON object")
+
+        for key in PLAN_SCHEMA["required"]:
+            if key not in data:
+                raise PlanValidationError(f"Missing required field: {key}")
+
+        allocations = [_parse_allocation(row) for row in _as_list(data["allocations"], "allocations")]
+        if not allocations:
+            raise PlanValidationError("Plan has no allocation rows")
+
+        total_pct = sum(row.target_pct for row in allocations)
+        if not 95 <= total_pct <= 105:
+            raise PlanValidationError(f"Allocations sum to {total_pct:.1f}%, expected 100%")
+
+        projections = [_parse_projection(p) for p in _as_list(data.get("projections", []), "projections")]
+        projections.sort(key=lambda p: p.year)
+
+        return cls(
+            title=str(data["title"]).strip() or "Your Personalized Strategic Roadmap",
+            thesis=str(data["thesis"]).strip(),
+            allocations=allocations,
+            projections=projections,
+            steps=[str(s).strip() for s in _as_list(data["steps"], "steps") if str(s).strip()],
+            risks=[str(r).strip() for r in _as_list(data["risks"], "risks") if str(r).strip()],
+            reasoning=str(data.get("reasoning", "")).strip(),
+            # Provenance and currency come from the caller, never from the model's JSON
+            currency_symbol=currency_symbol,
+            source=source
+        )
+
+
+def _as_list(value, name):
+    if not isinstance(value, list):
+        raise PlanValidationError(f"Field '{name}' must be a list")
+    return value
+
+
+def _to_number(value, name):
+    """Accepts 50, 50.0, "50", "50%" or "$1,200" and returns a float"""
+    if isinstance(value, bool):
+        raise PlanValidationError(f"Field '{name}' must be numeric")
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace('%', '').replace(',', '').replace('$', '').strip())
+    except ValueError:
+        raise PlanValidationError(f"Field '{name}' must be numeric, got {value!r}")
+
+
+def _parse_allocation(row):
+    if not isinstance(row, dict):
+        raise PlanValidationError("Allocation rows must be objects")
+    for key in ("asset_class", "target_pct", "ticker", "platform", "timing"):
+        if key not in row:
+            raise PlanValidationError(f"Allocation row missing '{key}'")
+
+    target_pct = _to_number(row["target_pct"], "target_pct")
+    if not 0 <= target_pct <= 100:
+        raise PlanValidationError(f"target_pct out of range: {target_pct}")
+
+    return AllocationRow(
+        asset_class=str(row["asset_class"]).strip(),
+        target_pct=target_pct,
+        ticker=str(row["ticker"]).strip(),
+        platform=str(row["platform"]).strip(),
+        timing=str(row["timing"]).strip(),
+        monthly_amount=_to_number(row.get("monthly_amount", 0) or 0, "monthly_amount")
+    )
+
+
+def _parse_projection(item):
+    if not isinstance(item, dict):
+        raise PlanValidationError("Projections must be objects")
+    try:
+        year = int(_to_number(item["year"], "year"))
+        return Projection(
+            year=year,
+            conservative=_to_number(item["conservative"], "conservative"),
+            moderate=_to_number(item["moderate"], "moderate"),
+            aggressive=_to_number(item["aggressive"], "aggressive")
+        )
+    except KeyError as e:
+        raise PlanValidationError(f"Projection missing {e}")
+
+
+def parse_plan(response_text, currency_symbol="$", source="llm"):
+    """Parse a raw model response (optionally wrapped in Markdown fences) into a Plan"""
+    if not response_text or not response_text.strip():
+        raise PlanValidationError("Empty response")
+
+    clean_json = response_text.strip()
+    if '```json' in clean_json:
+        clean_json = clean_json.split('```json')[1].split('```')[0].strip()
+    elif '```' in clean_json:
+        clean_json = clean_json.split('```')[1].split('```')[0].strip()
+
+    try:
+        data = json.loads(clean_json)
+    except json.JSONDecodeError as e:
+        raise PlanValidationError(f"Response is not valid JSON: {e}")
+
+    return Plan.from_dict(data, currency_symbol=currency_symbol, source=source)
+
+
+def _fmt_pct(value):
+    return f"{value:g}%"
+
+
+def render_plan_markdown(plan):
+    """Deterministic Markdown rendering of a Plan (same input, same bytes)"""
+    symbol = plan.currency_symbol
+    lines = []
+
+    if plan.reasoning:
+        lines.append("<details><summary><b>🧠 REASONING TRACE (CIO Thinking Process)</b></summary>")
+        lines.append("")
+        lines.append(plan.reasoning)
+        lines.append("")
+        lines.append("</details>")
+        lines.append("")
+
+    lines.append(f"# 📋 {plan.title}")
+    lines.append("")
+
+    lines.append("### 1. Capital Deployment")
+    show_monthly = any(row.monthly_amount for row in plan.allocations)
+    header = "| Asset class | Target % | Exact Ticker/Protocol | Platform | Timing/Strategy |"
+    divider = "|---|---|---|---|---|"
+    if show_monthly:
+        header += " Monthly |"
+        divider += "---|"
+    lines.append(header)
+    lines.append(divider)
+    for row in plan.allocations:
+        line = f"| **{row.asset_class}** | {_fmt_pct(row.target_pct)} | `{row.ticker}` | {row.platform} | {row.timing} |"
+        if show_monthly:
+            line += f" {symbol}{row.monthly_amount:,.0f} |"
+        lines.append(line)
+    lines.append("")
+
+    lines.append("### 2. The Logic Pillars")
+    lines.append(plan.thesis)
+    lines.append("")
+
+    section = 3
+    if plan.projections:
+        lines.append(f"### {section}. Wealth Projections")
+        lines.append("| Year | Conservative | Moderate | Aggressive |")
+        lines.append("|---|---|---|---|")
+        for p in plan.projections:
+            lines.append(f"| {p.year} | {symbol}{p.conservative:,.0f} | {symbol}{p.moderate:,.0f} | {symbol}{p.aggressive:,.0f} |")
+        lines.append("")
+        section += 1
+
+    if plan.steps:
+        lines.append(f"### {section}. Execution Protocol")
+        lines.extend(f"{i}. {step}" for i, step in enumerate(plan.steps, 1))
+        lines.append("")
+        section += 1
+
+    if plan.risks:
+        lines.append(f"### {section}. Risk Perimeter")
+        lines.extend(f"- {risk}" for risk in plan.risks)
+        lines.append("")
+
+    footer = SOURCE_FOOTERS.get(plan.source)
+    if footer:
+        lines.append("---")
+        lines.append(footer)
+        lines.append("")
+
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+# Keyword tables mirror the evaluate_plan_* functions in evaluation.py
+# (benchmark_scorer.py checks that both produce identical scores).
+TICKERS = ('VTI', 'BND', 'VXUS', 'BTC', 'ETH', 'SOL', 'VNQ', 'GLD')
+PROTOCOLS = ('Jito', 'Raydium', 'Kamino', 'Jupiter')
+RISK_KEYWORDS = ('risk', 'volatile', 'volatility', 'caution', 'careful', 'warning')
+DEFI_RISKS = ('smart contract', 'impermanent loss', 'liquidation', 'hack')
+ARCIUM_TOOL_WORDS = ('tool', 'SDK', 'privacy')
+ARCIUM_INVEST_PHRASES = ('Arcium allocation', 'invest in Arcium')
+HIGH_RISK_WORDS = ('leverage', 'aggressive')
+EXECUTION_KEYWORDS = ('step', 'week', 'action', 'first', 'next', 'open', 'visit', 'set up')
+PLATFORMS = ('jito.network', 'raydium.io', 'kamino.finance', 'Phantom', 'Coinbase')
+REQUIRED_ELEMENTS = {
+    'Risk Assessment': ('risk', 'score', 'assessment'),
+    'Asset Allocation': ('allocation', 'stocks', 'bonds', 'crypto'),
+    'Solana DeFi': ('Jito', 'Raydium', 'Kamino', 'Jupiter'),
+    'Projections': ('year', 'projection', 'value', 'growth'),
+    'Passive Income': ('passive', 'income', 'yield', 'APY', 'staking'),
+    'Monthly Breakdown': ('monthly', 'contribution', 'per month'),
+    'Execution Steps': ('step', 'week', 'action'),
+    'Alternatives': ('REIT', 'Gold', 'VNQ', 'GLD')
+}
+
+
+def _exact(words):
+    return tuple((word, False) for word in words)
+
+
+def _lowered(words):
+    return tuple((word.lower(), True) for word in words)
+
+
+class CompiledScorer:
+    """
+    All five plan metrics compiled for one profile. Keywords are stored as probes
+    (keyword, match against lowercased text) shared by every metric. Scoring
+    lowercases the plan once and evaluates each distinct probe at most once,
+    keeping the reference's short-circuits for "any keyword" checks.
+    """
+
+    def __init__(self, risk_tolerance, age, timeline, capital, goal):
+        self.risk_tolerance = risk_tolerance
+        self.tickers = _exact(TICKERS)
+        self.protocols = _exact(PROTOCOLS)
+        self.risk_keywords = _lowered(RISK_KEYWORDS)
+        self.defi_risks = _lowered(DEFI_RISKS)
+        self.arcium_tool = _exact(ARCIUM_TOOL_WORDS)
+        self.arcium_invest = _exact(ARCIUM_INVEST_PHRASES)
+        self.high_risk = _lowered(HIGH_RISK_WORDS)
+        self.personal = (
+            _exact((str(age),)),
+            _exact((str(timeline), 'years')),
+            tuple((word, True) for word in goal.lower().split()[:3]),
+            _exact((risk_tolerance,)),
+            _exact((str(capital),))
+        )
+        self.execution = _lowered(EXECUTION_KEYWORDS)
+        self.platforms = _exact(PLATFORMS)
+        self.numbered = _exact(('1.', '2.'))
+        self.weeks = _exact(('Week 1', 'Week 2'))
+        self.elements = tuple(_exact(words) for words in REQUIRED_ELEMENTS.values())
+
+    def score(self, plan_text):
+        lowered = plan_text.lower()
+        memo = {}
+
+        def has(probe):
+            found = memo.get(probe)
+            if found is None:
+                found = memo[probe] = probe[0] in (lowered if probe[1] else plan_text)
+            return found
+
+        def count(group):
+            return sum(1 for probe in group if has(probe))
+
+        def any_of(group):
+            return any(has(probe) for probe in group)
+
+        # Specificity
+        specificity = 0
+        dollar_signs = plan_text.count('$')
+        if dollar_signs > 20:
+            specificity += 3
+        elif dollar_signs > 10:
+            specificity += 2
+        elif dollar_signs > 5:
+            specificity += 1
+        specificity += min(count(self.tickers), 3)
+        specificity += min(count(self.protocols), 2)
+        percent_count = plan_text.count('%')
+        if percent_count > 15:
+            specificity += 2
+        elif percent_count > 8:
+            specificity += 1
+        specificity = min(specificity, 10)
+
+        # Safety
+        safety = 0
+        risk_mentions = count(self.risk_keywords)
+        if risk_mentions >= 5:
+            safety += 3
+        elif risk_mentions >= 3:
+            safety += 2
+        elif risk_mentions >= 1:
+            safety += 1
+        safety += min(count(self.defi_risks), 3)
+        if has(('Arcium', False)):
+            if any_of(self.arcium_tool):
+                safety += 2
+            if has(('allocation', False)) and any_of(self.arcium_invest):
+                safety -= 2
+        if self.risk_tolerance == 'High' and any_of(self.high_risk):
+            safety += 2
+        safety = max(0, min(safety, 10))
+
+        # Personalization
+        personalization = min(sum(2 for group in self.personal if any_of(group)), 10)
+
+        # Actionability
+        actionability = min(count(self.execution) // 3, 4)
+        actionability += min(count(self.platforms), 3)
+        if any_of(self.numbered):
+            actionability += 2
+        if any_of(self.weeks):
+            actionability += 1
+        actionability = min(actionability, 10)
+
+        # Completeness
+        completeness = 0
+        for group in self.elements:
+            if any_of(group):
+                completeness += 1.25
+        completeness = min(completeness, 10)
+
+        return {
+            'specificity': specificity,
+            'safety': safety,
+            'personalization': personalization,
+            'actionability': actionability,
+            'completeness': completeness,
+            'overall': (specificity + safety + personalization + actionability + completeness) / 5
+        }
+
+
+@lru_cache(maxsize=256)
+def _compile(risk_tolerance, age, timeline, capital, goal):
+    return CompiledScorer(risk_tolerance, age, timeline, capital, goal)
+
+
+def compile_scorer(user_profile):
+    """Cached CompiledScorer for the profile fields the metrics depend on"""
+    return _compile(
+        user_profile['risk_tolerance'],
+        str(user_profile['age']),
+        str(user_profile['timeline']),
+        str(user_profile['capital']),
+        user_profile['goal']
+    )
+
+
+def score_plan_text(plan_text, user_profile):
+    """All five metrics plus the overall average, identical to evaluation.py"""
+    return compile_scorer(user_profile).score(plan_text)
@@ -0,0 +1,149 @@
+import pandas as pd
+import streamlit as st
+
+HOLDING_COLUMNS = ['symbol', 'qty', 'cost']
+# Rows per grid page; the grid itself only draws the visible rows
+PAGE_SIZE = 200
+
+
+def holdings_frame(holdings):
+    """Session-state holdings (list of {symbol, qty, cost[, cost_ccy]}) as a DataFrame"""
+    df = pd.DataFrame(holdings, columns=HOLDING_COLUMNS + ['cost_ccy'])
+    df['qty'] = pd.to_numeric(df['qty'], errors='coerce').fillna(0.0)
+    df['cost'] = pd.to_numeric(df['cost'], errors='coerce').fillna(0.0)
+    return df
+
+
+def market_frame(market_data):
+    """Market snapshot {symbol: {price, change_24h, ...}} indexed by symbol"""
+    symbols = list(market_data)
+    return pd.DataFrame({
+        'price': [market_data[s].get('price') for s in symbols],
+        'change_24h': [market_data[s].get('change_24h', 0.0) for s in symbols]
+    }, index=pd.Index(symbols, name='symbol'), dtype=float)
+
+
+def category_map(registry):
+    """symbol -> category from an AssetRegistry (prebuilt index) or a list of asset dicts"""
+    if hasattr(registry, 'category_by_symbol'):
+        return registry.category_by_symbol
+    return {a['symbol']: a['category'] for a in registry}
+
+
+def value_holdings(holdings, market_data, rate=1.0, categories=None, fx=None, currency=None):
+    """
+    Joins holdings against the market snapshot and computes value/PnL in one pass.
+    Market prices are USD and are converted with `rate`. Costs are in the display
+    currency, unless `fx` (a fx_rates.RateTable) and `currency` are given: then each
+    cost is converted from its cost_ccy (default `currency`) through the cross matrix.
+    Unpriced symbols fall back to their cost basis, as before.
+    `categories` (symbol -> category) adds a category column, 'Other' when unknown.
+    """
+    df = holdings_frame(holdings).join(market_frame(market_data), on='symbol')
+    if fx is not None and currency:
+        df['cost'] = fx.convert_many(df['cost'].to_numpy(), df['cost_ccy'].fillna(currency), currency)
+    if categories is not None:
+        df['category'] = df['symbol'].map(categories).fillna('Other')
+    fallback = df['cost'] / rate if rate > 0 else df['cost']
+    df['priced'] = df['price'].notna()
+    df['price'] = df['price'].fillna(fallback)
+    df['change_24h'] = df['change_24h'].fillna(0.0)
+
+    df['price_local'] = df['price'] * rate
+    df['market_value'] = df['qty'] * df['price_local']
+    df['cost_basis'] = df['qty'] * df['cost']
+    df['pnl'] = df['market_value'] - df['cost_basis']
+    df['pnl_pct'] = (df['pnl'] / df['cost_basis'].where(df['cost_basis'] > 0) * 100).fillna(0.0)
+    return df
+
+
+def portfolio_totals(valued):
+    market_value = float(valued['market_value'].sum())
+    cost_basis = float(valued['cost_basis'].sum())
+    pnl = market_value - cost_basis
+    return {
+        'market_value': market_value,
+        'cost_basis': cost_basis,
+        'pnl': pnl,
+        'pnl_pct': (pnl / cost_basis * 100) if cost_basis > 0 else 0
+    }
+
+
+def category_aggregates(valued, by='category'):
+    """Per-category value, cost basis, PnL, position count and portfolio weight (%)"""
+    grouped = valued.groupby(by, sort=False)
+    agg = grouped[['market_value', 'cost_basis', 'pnl']].sum()
+    agg['positions'] = grouped.size()
+    total = agg['market_value'].sum()
+    agg['weight'] = agg['market_value'] / total * 100 if total else 0.0
+    return agg
+
+
+def value_portfolio(holdings, market_data, rates=None, currency='USD', registry=None):
+    """
+    Holdings x prices x FX x registry in one pass. Returns the per-position frame,
+    per-category aggregates and portfolio totals, all in `currency`. `rates` is a
+    fx_rates.RateTable (costs converted from their own currency) or a plain
+    {code: units per USD} dict (costs taken as already in `currency`).
+    """
+    fx = rates if hasattr(rates, 'rate') else None
+    rate = fx.rate('USD', currency) if fx is not None else (rates or {}).get(currency, 1.0)
+    categories = category_map(registry) if registry is not None else {}
+    valued = value_holdings(holdings, market_data, rate, categories, fx, currency)
+    return {
+        'rate': rate,
+        'positions': valued,
+        'categories': category_aggregates(valued),
+        'totals': portfolio_totals(valued)
+    }
+
+
+def render_holdings_grid(valued, currency_symbol, logo_for, key="holdings_grid"):
+    """
+    One paginated, virtualized data_editor in place of per-row st.columns.
+    Returns the positional indexes (into the holdings list) ticked for removal.
+    """
+    total = len(valued)
+    page = 0
+    if total > PAGE_SIZE:
+        pages = (total + PAGE_SIZE - 1) // PAGE_SIZE
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1,
+                               key=f"{key}_page") - 1
+    window = valued.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+    # Logo lookups are per unique symbol, not per row
+    logos = {s: logo_for(s) for s in window['symbol'].unique()}
+    grid = pd.DataFrame({
+        'logo': window['symbol'].map(lambda s: logos[s] if str(logos[s]).startswith('data:image') else None),
+        'symbol': window['symbol'],
+        'qty': window['qty'],
+        'cost': window['cost'],
+        'price': window['price_local'],
+        'value': window['market_value'],
+        'pnl': window['pnl'],
+        'pnl_pct': window['pnl_pct'],
+        'remove': False
+    })
+
+    money = f"{currency_symbol}%.2f"
+    edited = st.data_editor(
+        grid,
+        key=f"{key}_{st.session_state.get('holdings_version', 0)}",
+        hide_index=True,
+        use_container_width=True,
+        height=min(36 * (len(grid) + 1) + 3, 600),
+        disabled=[c for c in grid.columns if c != 'remove'],
+        column_config={
+            'logo': st.column_config.ImageColumn("", width="small"),
+            'symbol': st.column_config.TextColumn("Asset"),
+            'qty': st.column_config.NumberColumn("Position", format="%.2f"),
+            'cost': st.column_config.NumberColumn("Avg Cost", format=money),
+            'price': st.column_config.NumberColumn("Price", format=money),
+            'value': st.column_config.NumberColumn("Value", format=money),
+            'pnl': st.column_config.NumberColumn("PnL", format=f"{currency_symbol}%+.2f"),
+            'pnl_pct': st.column_config.NumberColumn("PnL %", format="%+.2f%%"),
+            'remove': st.column_config.CheckboxColumn("🗑️", width="small")
+        }
+    )
+    offset = page * PAGE_SIZE
+    return [offset + i for i, flagged in enumerate(edited['remove'].tolist()) if flagged]
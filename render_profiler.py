@@ -0,0 +1,241 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Enable with ?profile=1 or GOALWEALTH_PROFILE=1
+ENV_FLAG = 'GOALWEALTH_PROFILE'
+LOG_PATH = os.environ.get('GOALWEALTH_PROFILE_LOG', os.path.join('logs', 'render_profile.jsonl'))
+LOG_MAX_BYTES = int(os.environ.get('GOALWEALTH_PROFILE_LOG_BYTES', 5 * 1024 * 1024))
+LOG_BACKUPS = 3
+
+KIND_COLORS = {
+    'section': '#3B82F6',
+    'fetch': '#F59E0B',
+    'build': '#8B5CF6',
+    'fragment': '#14F195',
+    'llm': '#EF4444',
+    'logo': '#64748B'
+}
+
+# Streamlit runs each rerun (and any cache computation it triggers) on the script thread
+_state = threading.local()
+
+
+class RenderProfile:
+    """
+    Timings for one rerun: linear named sections plus every fetch/build inside
+    them. Fetches are recorded as cache hits unless the cached body actually ran.
+    """
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self._section = None
+        self._stack = []
+
+    def _now(self):
+        return (time.perf_counter() - self._t0) * 1000
+
+    def section(self, name):
+        """Closes the current section and opens `name`"""
+        now = self._now()
+        if self._section is not None:
+            label, start = self._section
+            self.events.append({'name': label, 'kind': 'section', 'start_ms': start, 'ms': now - start})
+        self._section = (name, now) if name else None
+
+    @contextmanager
+    def timed(self, name, kind='fetch', cache=None):
+        start = self._now()
+        frame = {'miss': False}
+        self._stack.append(frame)
+        try:
+            yield frame
+        finally:
+            self._stack.pop()
+            if cache is None and kind in ('fetch', 'build'):
+                cache = 'miss' if frame['miss'] else 'hit'
+            self.events.append({
+                'name': name, 'kind': kind, 'start_ms': start, 'ms': self._now() - start,
+                'cache': cache, 'section': self._section[0] if self._section else None
+            })
+            if cache:
+                self.count(name, cache == 'hit')
+
+    def note_miss(self):
+        """Called from inside a cached body: the enclosing fetch was a cache miss"""
+        if self._stack:
+            self._stack[-1]['miss'] = True
+
+    def count(self, name, hit):
+        bucket = self.counters.setdefault(name, {'hits': 0, 'misses': 0})
+        bucket['hits' if hit else 'misses'] += 1
+
+    def finish(self, interrupted=False):
+        """Closes the open section; `interrupted` marks a run that ended in st.rerun()"""
+        self.section(None)
+        for event in self.events:
+            event['start_ms'] = round(event['start_ms'], 3)
+            event['ms'] = round(event['ms'], 3)
+        return {
+            'run_id': self.run_id,
+            'ts': self.started_at,
+            'total_ms': round(self._now(), 3),
+            'interrupted': interrupted,
+            'events': sorted(self.events, key=lambda e: e['start_ms']),
+            'counters': self.counters
+        }
+
+
+def is_enabled():
+    if os.environ.get(ENV_FLAG) == '1':
+        return True
+    try:
+        return st.query_params.get('profile') == '1'
+    except Exception:
+        return False
+
+
+def current():
+    """The active rerun profile, or None when profiling is off"""
+    return getattr(_state, 'profile', None)
+
+
+def begin_rerun(log_path=LOG_PATH):
+    """
+    Starts profiling this rerun if enabled; call right after st.set_page_config.
+    A run that ended in st.rerun() never reached finish_rerun; the rerun starts
+    right away on the same script thread, so its profile is still open here and
+    is logged first, closed now. Runs ending in st.stop() or an uncaught
+    exception end the thread and are not logged.
+    """
+    previous = current()
+    if previous is not None:
+        _append_log(previous.finish(interrupted=True), log_path)
+    _state.profile = RenderProfile() if is_enabled() else None
+    if _state.profile is not None:
+        _state.profile.section('imports')
+    return _state.profile
+
+
+def section(name):
+    profile = current()
+    if profile is not None:
+        profile.section(name)
+
+
+@contextmanager
+def timed(name, kind='fetch', cache=None):
+    """Times a block inside the active profile (no-op when profiling is off)"""
+    profile = current()
+    if profile is None:
+        yield None
+        return
+    with profile.timed(name, kind, cache) as frame:
+        yield frame
+
+
+def count(name, hit):
+    profile = current()
+    if profile is not None:
+        profile.count(name, hit)
+
+
+def cached_fetch(name, cache, kind='fetch'):
+    """
+    Wraps a Streamlit cache decorator so each call is timed and classified as a
+    hit or miss, e.g. @cached_fetch("market_data", st.cache_data(ttl=300)).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            profile = current()
+            if profile is not None:
+                profile.note_miss()
+            return func(*args, **kwargs)
+
+        cached = cache(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(name, kind):
+                return cached(*args, **kwargs)
+
+        if hasattr(cached, 'clear'):
+            wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def _append_log(record, path=LOG_PATH, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Appends one rerun to the JSONL log, rotating path -> path.1 -> ... at max_bytes"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+            for i in range(backups - 1, 0, -1):
+                if os.path.exists(f"{path}.{i}"):
+                    os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+            os.replace(path, f"{path}.1")
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except Exception as e:
+        print(f"Profile log error: {e}")
+
+
+def render_waterfall(record):
+    """Waterfall of sections and fetches for one rerun, in an expander"""
+    import plotly.graph_objects as go
+
+    events = record['events']
+    with st.expander(f"⏱️ Render profile · {record['total_ms']:.0f} ms", expanded=False):
+        if not events:
+            st.caption("No sections recorded.")
+            return
+        labels = [f"{e['kind']}: {e['name']}" + (f" ({e['cache']})" if e.get('cache') else "") for e in events]
+        fig = go.Figure(go.Bar(
+            y=labels,
+            x=[max(e['ms'], 0.1) for e in events],
+            base=[e['start_ms'] for e in events],
+            orientation='h',
+            marker=dict(color=[KIND_COLORS.get(e['kind'], '#94A3B8') for e in events],
+                        opacity=[0.45 if e.get('cache') == 'hit' else 1.0 for e in events]),
+            hovertemplate="%{y}<br>start %{base:.1f} ms · %{x:.1f} ms<extra></extra>"
+        ))
+        fig.update_layout(
+            height=max(220, 22 * len(events) + 60),
+            margin=dict(l=10, r=10, t=10, b=30),
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family='JetBrains Mono', color='#94A3B8', size=11),
+            xaxis=dict(title='ms since rerun start', gridcolor='rgba(255,255,255,0.05)'),
+            yaxis=dict(autorange='reversed')
+        )
+        st.plotly_chart(fig, use_container_width=True, key=f"render_profile_{record['run_id']}")
+
+        if record['counters']:
+            rows = [f"`{name}` {c['hits']} hit / {c['misses']} miss" for name, c in sorted(record['counters'].items())]
+            st.caption(" · ".join(rows))
+
+
+def finish_rerun(render=True, log_path=LOG_PATH):
+    """Closes the profile, appends it to the JSONL log and shows the waterfall"""
+    profile = current()
+    if profile is None:
+        return None
+    _state.profile = None
+    record = profile.finish()
+    _append_log(record, log_path)
+    if render:
+        render_waterfall(record)
+    return record
@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+from solana_service import (
+    LAMPORTS_PER_SOL, METHOD_TIMEOUTS, RPC_TIMEOUT, EndpointFailure, EndpointPool, RPCError,
+    build_batch, is_valid_address, parse_batch, retry_after_seconds, timeout_for
+)
+
+# One pooled HTTP/1.1 client per AsyncSolanaClient; keep-alive connections are reused across calls
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30)
+# Slot rate is measured over this rolling window; the stream counts as stale after STREAM_STALE_AFTER
+SLOT_WINDOW_SECONDS = float(os.environ.get('SOLANA_SLOT_WINDOW', 30))
+STREAM_STALE_AFTER = float(os.environ.get('SOLANA_STREAM_STALE_AFTER', 5))
+RECONNECT_MAX_DELAY = 30
+
+
+class AsyncSolanaClient:
+    """
+    Async JSON-RPC client over a shared httpx.AsyncClient. Calls go to the
+    fastest healthy endpoint of an EndpointPool and fail over to the next one on
+    timeouts, 429s (honouring Retry-After), 5xx and connection errors. Timeouts
+    are per method (METHOD_TIMEOUTS); a batch uses its slowest method's timeout.
+
+        async with AsyncSolanaClient(["http://127.0.0.1:8899", DEFAULT_RPC_URL]) as client:
+            metrics = await client.get_network_metrics()
+    """
+
+    def __init__(self, endpoints=None, timeouts=None, pool=None, timeout=RPC_TIMEOUT, client=None):
+        self.pool = pool or EndpointPool(endpoints)
+        self.timeout = timeout
+        self.timeouts = {**METHOD_TIMEOUTS, **(timeouts or {})}
+        self._ids = itertools.count(1)
+        self._client = client or httpx.AsyncClient(limits=POOL_LIMITS, headers={'Content-Type': 'application/json'})
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _post_to(self, endpoint, payload, timeout):
+        start = time.perf_counter()
+        try:
+            resp = await self._client.post(endpoint.url, json=payload, timeout=timeout)
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise EndpointFailure(f"HTTP {resp.status_code}", retry_after_seconds(resp.headers))
+            resp.raise_for_status()
+            body = resp.json()
+        except (EndpointFailure, httpx.TimeoutException, httpx.TransportError) as e:
+            error = str(e) if isinstance(e, EndpointFailure) else f"{type(e).__name__} {e}".strip()
+            self.pool.record_failure(endpoint, error, getattr(e, 'retry_after', None))
+            raise EndpointFailure(f"{endpoint.url}: {error}")
+        self.pool.record_success(endpoint, time.perf_counter() - start)
+        return body
+
+    async def _post(self, payload, timeout):
+        errors = []
+        for endpoint in self.pool.ranked():
+            try:
+                return await self._post_to(endpoint, payload, timeout)
+            except EndpointFailure as e:
+                errors.append(str(e))
+        raise RPCError("all RPC endpoints failed: " + "; ".join(errors))
+
+    async def rpc_batch(self, calls, raise_errors=True):
+        """[(method, params), ...] as one JSON-RPC batch; results in call order"""
+        ids = [next(self._ids) for _ in calls]
+        body = await self._post(build_batch(ids, calls), timeout_for(calls, self.timeouts, self.timeout))
+        return parse_batch(body, ids, calls, raise_errors)
+
+    async def rpc(self, method, params=None):
+        return (await self.rpc_batch([(method, params or [])]))[0]
+
+    async def health_check(self):
+        """getHealth against every endpoint concurrently; returns the pool status"""
+        calls = [('getHealth', [])]
+        timeout = self.timeouts.get('getHealth', self.timeout)
+
+        async def probe(endpoint):
+            try:
+                result = parse_batch(await self._post_to(endpoint, build_batch([0], calls), timeout), [0], calls)[0]
+            except EndpointFailure:
+                return  # already recorded by _post_to
+            except RPCError as e:
+                result = e
+            if result != 'ok':
+                self.pool.record_failure(endpoint, f"unhealthy: {result}")
+
+        await asyncio.gather(*(probe(ep) for ep in self.pool.endpoints))
+        return self.pool.status()
+
+    async def get_network_metrics(self):
+        slot, samples = await self.rpc_batch([
+            ('getSlot', [{'commitment': 'confirmed'}]),
+            ('getRecentPerformanceSamples', [1])
+        ])
+        tps = 0
+        if samples:
+            sample = samples[0]
+            tps = int(sample['numTransactions'] / max(sample['samplePeriodSecs'], 1))
+        return {'tps': tps, 'slot': slot, 'fetched_at': time.time(), 'live': True}
+
+    async def get_balance(self, address_str):
+        """Balance in SOL, 0.0 for invalid addresses"""
+        if not is_valid_address(address_str):
+            return 0.0
+        result = await self.rpc('getBalance', [address_str.strip(), {'commitment': 'confirmed'}])
+        return result['value'] / LAMPORTS_PER_SOL
+
+
+class SlotStream:
+    """
+    One websocket slotSubscribe stream in a daemon thread. Keeps the latest slot
+    and a rolling slots/second rate in memory; readers call snapshot() and never
+    touch the network. Reconnects with exponential backoff.
+    """
+
+    def __init__(self, ws_url, window=SLOT_WINDOW_SECONDS, stale_after=STREAM_STALE_AFTER):
+        self.ws_url = ws_url
+        self.window = window
+        self.stale_after = stale_after
+        self.slot = None
+        self.received_at = None
+        self.connected = False
+        self.reconnects = 0
+        self.last_error = None
+        self._samples = deque()  # (monotonic time, slot)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def _record(self, slot):
+        now = time.monotonic()
+        with self._lock:
+            self.slot = slot
+            self.received_at = time.time()
+            self._samples.append((now, slot))
+            while now - self._samples[0][0] > self.window:
+                self._samples.popleft()
+
+    def snapshot(self):
+        with self._lock:
+            slot, received_at = self.slot, self.received_at
+            first, last = (self._samples[0], self._samples[-1]) if self._samples else (None, None)
+        rate = None
+        if first and last[0] > first[0]:
+            rate = (last[1] - first[1]) / (last[0] - first[0])
+        age = time.time() - received_at if received_at else None
+        return {
+            'slot': slot,
+            'slots_per_sec': rate,
+            'received_at': received_at,
+            'age_s': age,
+            'fresh': self.connected and age is not None and age <= self.stale_after,
+            'connected': self.connected,
+            'reconnects': self.reconnects
+        }
+
+    async def _consume(self):
+        """Subscribes and records notifications until the socket closes; returns the count"""
+        received = 0
+        async with ws_connect(self.ws_url, open_timeout=RPC_TIMEOUT, ping_interval=20, ping_timeout=20) as ws:
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'slotSubscribe'}))
+            async for message in ws:
+                msg = json.loads(message)
+                if msg.get('method') == 'slotNotification':
+                    self._record(msg['params']['result']['slot'])
+                    received += 1
+                elif msg.get('id') == 1:
+                    if 'error' in msg:
+                        raise RPCError(f"slotSubscribe: {msg['error']}")
+                    self.connected = True
+        return received
+
+    async def run(self):
+        delay = 1
+        while True:
+            try:
+                if await self._consume():
+                    delay = 1
+            except asyncio.CancelledError:
+                self.connected = False
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__} {e}".strip()
+                print(f"Solana slot stream error ({self.ws_url}): {self.last_error}")
+            self.connected = False
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    def start(self):
+        if ws_connect is None:
+            raise RuntimeError("websockets is not installed")
+        if self._thread and self._thread.is_alive():
+            return self
+
+        async def main():
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.current_task()
+            await self.run()
+
+        def target():
+            try:
+                asyncio.run(main())
+            except asyncio.CancelledError:
+                pass
+
+        self._thread = threading.Thread(target=target, daemon=True, name="solana-slot-stream")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop and self._task:
+            self._loop.call_soon_threadsafe(self._task.cancel)
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from solana_service import TOKEN_PROGRAM_ID, b58decode, b58encode
+
+TOKEN_ACCOUNT_SIZE = 165
+
+
+class StubState:
+    """Canned chain state served by the stub; tests mutate it directly"""
+
+    def __init__(self):
+        self.slot = 300_000_000
+        self.num_transactions = 180_000
+        self.sample_period_secs = 60
+        self.balances = {}      # address -> lamports
+        self.token_accounts = {}  # owner -> [(mint, raw amount[, program id])]
+        self.account_data = {}    # address -> raw account bytes (stake pools, mints, ...)
+        self.epoch = 700
+        self.slot_index = 100_000
+        self.slots_in_epoch = 432_000
+        self.latency = 0.0      # seconds added to every HTTP request
+        self.fail_status = None   # e.g. 429 or 503: every request is answered with this status
+        self.retry_after = None   # Retry-After header sent with fail_status
+        self.healthy = True
+        self.slot_interval = 0.4  # seconds between slotNotification messages (mainnet ~0.4)
+        self.stream_paused = False
+        self.ws_connections = 0
+        self.http_requests = 0  # one per POST, however many calls it batches
+        self.calls = []         # method names, in arrival order
+        self.lock = threading.Lock()
+
+    def handle(self, method, params):
+        if method == 'getHealth':
+            if not self.healthy:
+                raise RuntimeError("Node is unhealthy")
+            return 'ok'
+        if method == 'getSlot':
+            self.slot += 1
+            return self.slot
+        if method == 'getRecentPerformanceSamples':
+            return [{'slot': self.slot, 'numTransactions': self.num_transactions,
+                     'numSlots': 150, 'samplePeriodSecs': self.sample_period_secs}]
+        if method == 'getBalance':
+            return {'context': {'slot': self.slot}, 'value': self.balances.get(params[0], 0)}
+        if method == 'getEpochInfo':
+            return {'epoch': self.epoch, 'slotIndex': self.slot_index, 'slotsInEpoch': self.slots_in_epoch,
+                    'absoluteSlot': self.slot, 'blockHeight': self.slot - 20_000_000}
+        if method == 'getMultipleAccounts':
+            data_slice = (params[1] if len(params) > 1 else {}).get('dataSlice')
+            value = []
+            for a in params[0]:
+                if a not in self.balances and a not in self.account_data:
+                    value.append(None)
+                    continue
+                data = self.account_data.get(a, b'')
+                if data_slice:
+                    data = data[data_slice['offset']:data_slice['offset'] + data_slice['length']]
+                value.append({'lamports': self.balances.get(a, 1_000_000), 'owner': '11111111111111111111111111111111',
+                              'data': [base64.b64encode(data).decode(), 'base64'], 'executable': False, 'rentEpoch': 0})
+            return {'context': {'slot': self.slot}, 'value': value}
+        if method == 'getTokenAccountsByOwner':
+            owner, program = params[0], params[1].get('programId')
+            value = []
+            for entry in self.token_accounts.get(owner, []):
+                mint, amount = entry[0], entry[1]
+                if (entry[2] if len(entry) > 2 else TOKEN_PROGRAM_ID) != program:
+                    continue
+                value.append({'pubkey': b58encode(hashlib.sha256((owner + mint).encode()).digest()),
+                              'account': {'lamports': 2_039_280, 'owner': program, 'executable': False,
+                                          'rentEpoch': 0, 'data': [token_account_data(mint, owner, amount), 'base64']}})
+            return {'context': {'slot': self.slot}, 'value': value}
+        raise KeyError(method)
+
+
+def token_account_data(mint, owner, amount):
+    """Base64 SPL token account: mint | owner | amount, zero-padded to 165 bytes"""
+    data = b58decode(mint) + b58decode(owner) + struct.pack('<Q', amount)
+    return base64.b64encode(data.ljust(TOKEN_ACCOUNT_SIZE, b'\x00')).decode()
+
+
+def _response(state, call):
+    method = call.get('method')
+    try:
+        with state.lock:
+            state.calls.append(method)
+            result = state.handle(method, call.get('params') or [])
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
+    except KeyError:
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': f"Method not found: {method}"}}
+    except RuntimeError as e:
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32005, 'message': str(e)}}
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            with state.lock:
+                state.http_requests += 1
+            if state.latency:
+                time.sleep(state.latency)
+            length = int(self.headers.get('Content-Length', 0))
+            if state.fail_status:
+                self.rfile.read(length)
+                self.send_response(state.fail_status)
+                if state.retry_after is not None:
+                    self.send_header('Retry-After', str(state.retry_after))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            try:
+                body = json.loads(self.rfile.read(length))
+            except json.JSONDecodeError:
+                body, reply = None, {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}}
+            if isinstance(body, list):
+                reply = [_response(state, call) for call in body]
+            elif isinstance(body, dict):
+                reply = _response(state, body)
+            data = json.dumps(reply).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            try:
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client timed out and moved on to another endpoint
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    # Concurrent async clients open many connections at once; the default backlog is 5
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_stub_server(host='127.0.0.1', port=0, state=None):
+    """Runs the stub in a daemon thread; returns (server, url, state). Call server.shutdown() to stop."""
+    state = state or StubState()
+    server = StubServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True, name="solana-rpc-stub").start()
+    return server, f"http://{host}:{server.server_address[1]}", state
+
+
+def start_stub_slot_stream(host='127.0.0.1', port=0, state=None):
+    """
+    Websocket slotSubscribe endpoint in a daemon thread, advancing state.slot every
+    state.slot_interval seconds. Returns (ws_url, state, stop). Needs websockets.
+    """
+    from websockets.asyncio.server import serve
+    from websockets.exceptions import ConnectionClosed
+
+    state = state or StubState()
+    ready = threading.Event()
+    holder = {}
+
+    async def handler(ws):
+        with state.lock:
+            state.ws_connections += 1
+        try:
+            request = json.loads(await ws.recv())
+            await ws.send(json.dumps({'jsonrpc': '2.0', 'result': 0, 'id': request.get('id')}))
+            while True:
+                await asyncio.sleep(state.slot_interval)
+                if state.stream_paused:
+                    continue
+                with state.lock:
+                    state.slot += 1
+                    slot = state.slot
+                await ws.send(json.dumps({'jsonrpc': '2.0', 'method': 'slotNotification', 'params': {
+                    'result': {'parent': slot - 1, 'root': slot - 32, 'slot': slot}, 'subscription': 0}}))
+        except ConnectionClosed:
+            pass
+
+    async def main():
+        async with serve(handler, host, port) as server:
+            holder['port'] = server.sockets[0].getsockname()[1]
+            holder['loop'] = asyncio.get_running_loop()
+            holder['stop'] = asyncio.Event()
+            ready.set()
+            await holder['stop'].wait()
+
+    threading.Thread(target=lambda: asyncio.run(main()), daemon=True, name="solana-ws-stub").start()
+    ready.wait(5)
+
+    def stop():
+        holder['loop'].call_soon_threadsafe(holder['stop'].set)
+
+    return f"ws://{host}:{holder['port']}", state, stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Solana JSON-RPC stub (use with SOLANA_RPC_URL)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--ws-port', type=int, default=8900, help="slotSubscribe websocket port (0 disables)")
+    args = parser.parse_args()
+
+    state = StubState()
+    server = StubServer((args.host, args.port), make_handler(state))
+    print(f"Solana RPC stub on http://{args.host}:{args.port}")
+    if args.ws_port:
+        ws_url, _, _ = start_stub_slot_stream(args.host, args.ws_port, state)
+        print(f"Slot stream on {ws_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -1,71 +1,713 @@
-from solana.rpc.api import Client
-from solders.pubkey import Pubkey # type: ignore
-import streamlit as st
+import base64
+import functools
+import itertools
+import json
+import os
+import struct
+import threading
 import time
 
-# Default public RPC - in production this should be an env var
-DEFAULT_RPC_URL = "https://api.mainnet-beta.solana.com"
+import requests
+import streamlit as st
+
+from asset_registry import get_registry
+
+# Default public RPC; point SOLANA_RPC_URL at a private endpoint or solana_rpc_stub.py
+DEFAULT_RPC_URL = os.environ.get('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com")
+# Ordered failover list, e.g. SOLANA_RPC_URLS="https://my-provider,https://api.mainnet-beta.solana.com"
+RPC_ENDPOINTS = [u.strip() for u in os.environ.get('SOLANA_RPC_URLS', DEFAULT_RPC_URL).split(',') if u.strip()]
+RPC_TIMEOUT = float(os.environ.get('SOLANA_RPC_TIMEOUT', 5))
+# Per-method timeouts (seconds); override with SOLANA_RPC_TIMEOUTS="getSlot=1,getTokenAccountsByOwner=10"
+METHOD_TIMEOUTS = {
+    'getHealth': 1.5,
+    'getSlot': 2.0,
+    'getRecentPerformanceSamples': 3.0,
+    'getBalance': 3.0,
+    'getMultipleAccounts': 5.0,
+    'getTokenAccountsByOwner': 8.0
+}
+METHOD_TIMEOUTS.update({k.strip(): float(v) for k, _, v in (
+    item.partition('=') for item in os.environ.get('SOLANA_RPC_TIMEOUTS', '').split(',') if '=' in item)})
+# An endpoint that times out, rate-limits (429) or errors sits out this long, doubling per repeat failure
+ENDPOINT_COOLDOWN = float(os.environ.get('SOLANA_RPC_COOLDOWN', 15))
+HEALTH_CHECK_INTERVAL = float(os.environ.get('SOLANA_HEALTH_INTERVAL', 60))
+# Network metrics are served from memory and refreshed in the background at this interval
+METRICS_TTL = float(os.environ.get('SOLANA_METRICS_TTL', 10))
+# Websocket endpoint for the shared slotSubscribe stream; derived from the RPC URL when unset, "off" disables
+DEFAULT_WS_URL = os.environ.get('SOLANA_WS_URL', '')
+# While the slot stream is live, performance samples (transactions per slot) are only re-polled this often
+SAMPLES_TTL = float(os.environ.get('SOLANA_SAMPLES_TTL', 60))
+# The status strip only reads memory, so it can redraw often
+STATUS_REFRESH_SECONDS = float(os.environ.get('SOLANA_STATUS_REFRESH', 3))
+LAMPORTS_PER_SOL = 1_000_000_000
+# Most RPC providers cap getMultipleAccounts at 100 keys and batches at ~100 calls
+MULTIPLE_ACCOUNTS_LIMIT = 100
+RPC_BATCH_LIMIT = int(os.environ.get('SOLANA_RPC_BATCH_LIMIT', 100))
+
+TOKEN_PROGRAM_ID = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+TOKEN_2022_PROGRAM_ID = 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb'
+NATIVE_MINT = 'So11111111111111111111111111111111111111112'
+
+# Liquid staking: APY is derived from the pool's SOL-per-token exchange rate across epochs
+JITO_STAKE_POOL = 'Jito4APyf642JPZPx3hGc6WWJ8zPKtRbRs4P815Awbb'
+MARINADE_STATE = '8szGkuLTAux9XMgZ2vtY39jVSowEcpBfFfD8hXSEqdGC'
+MSOL_MINT = 'mSoLzYCxHdYgdzU16g5QSh3i5K3z3KZK7ytfqcJm7So'
+# SPL stake pool: total_lamports | pool_token_supply | last_update_epoch (u64 LE) at byte 258
+STAKE_POOL_LAYOUT = struct.Struct('<QQQ')
+STAKE_POOL_OFFSET = 258
+# Marinade state: msol_price (SOL per mSOL, u64 scaled by 2^32) at byte 512
+MARINADE_PRICE_LAYOUT = struct.Struct('<Q')
+MARINADE_PRICE_OFFSET = 512
+MARINADE_PRICE_DENOMINATOR = 2 ** 32
+# SPL mint: supply (u64 LE) at byte 36
+MINT_SUPPLY_LAYOUT = struct.Struct('<Q')
+MINT_SUPPLY_OFFSET = 36
+# Exchange rates recorded per epoch (runtime state, next to the render profile log)
+LST_HISTORY_PATH = os.environ.get('SOLANA_LST_HISTORY', os.path.join('logs', 'lst_rates.json'))
+LST_HISTORY_EPOCHS = 30
+LST_APY_WINDOW = 10        # epochs spanned by the APY estimate, at most
+LST_RETRY_SECONDS = 900    # re-read this often while a pool has not been updated for the new epoch
+LST_ERROR_BACKOFF = 60     # seconds before retrying after a failed pool read
+DEFAULT_SLOT_SECONDS = 0.4
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+# SPL token account layout: mint (32) | owner (32) | amount (u64 LE) | ...
+TOKEN_ACCOUNT_LAYOUT = struct.Struct('<32s32sQ')
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+_B58_INDEX = {c: i for i, c in enumerate(B58_ALPHABET)}
+
+
+def b58decode(value):
+    num = 0
+    for char in value:
+        num = num * 58 + _B58_INDEX[char]
+    body = num.to_bytes((num.bit_length() + 7) // 8, 'big') if num else b''
+    return b'\x00' * (len(value) - len(value.lstrip('1'))) + body
+
+
+def b58encode(data):
+    num = int.from_bytes(data, 'big')
+    chars = []
+    while num:
+        num, rem = divmod(num, 58)
+        chars.append(B58_ALPHABET[rem])
+    return '1' * (len(data) - len(data.lstrip(b'\x00'))) + ''.join(reversed(chars))
+
+
+def ws_url_for(rpc_url):
+    """RPC websocket URL for an HTTP endpoint (local validators listen on the RPC port + 1)"""
+    scheme, sep, rest = rpc_url.partition('://')
+    ws = {'http': 'ws', 'https': 'wss'}.get(scheme, scheme) + sep + rest
+    return ws.replace(':8899', ':8900', 1)
+
+
+def is_valid_address(address):
+    """32-byte base58 public key"""
+    try:
+        return bool(address) and len(b58decode(address.strip())) == 32
+    except (KeyError, ValueError):
+        return False
+
+
+@functools.lru_cache(maxsize=4096)
+def _mint_address(raw):
+    return b58encode(raw)
+
+
+def decode_token_account(data):
+    """
+    (mint, amount) from raw SPL token account bytes. Reads the fixed-offset
+    header straight out of the buffer; Token-2022 extensions after it are ignored.
+    """
+    view = memoryview(data)
+    if len(view) < TOKEN_ACCOUNT_LAYOUT.size:
+        return None
+    mint, _owner, amount = TOKEN_ACCOUNT_LAYOUT.unpack_from(view, 0)
+    return _mint_address(mint), amount
+
+
+def decode_stake_pool(data):
+    """(total_lamports, pool_token_supply, last_update_epoch) from SPL stake pool account bytes"""
+    return STAKE_POOL_LAYOUT.unpack_from(memoryview(data), STAKE_POOL_OFFSET)
+
+
+def decode_marinade_price(data):
+    """SOL per mSOL from the Marinade state account"""
+    return MARINADE_PRICE_LAYOUT.unpack_from(memoryview(data), MARINADE_PRICE_OFFSET)[0] / MARINADE_PRICE_DENOMINATOR
+
+
+def lst_apy(rates, epochs_per_year, window=LST_APY_WINDOW):
+    """
+    Annualized yield (%) from {epoch: exchange rate}: compounds the per-epoch
+    growth between the latest epoch and the oldest one within `window`.
+    None until two distinct epochs are known.
+    """
+    if len(rates) < 2:
+        return None
+    epochs = sorted(rates)
+    last = epochs[-1]
+    first = next(e for e in epochs if e >= last - window)
+    if first == last or rates[first] <= 0:
+        return None
+    growth = (rates[last] / rates[first]) ** (1 / (last - first))
+    return (growth ** epochs_per_year - 1) * 100
+
+
+def _load_lst_history(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {name: {int(e): r for e, r in rates.items()} for name, rates in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_lst_history(history, path):
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(history, f)
+    except OSError as e:
+        print(f"LST history save error: {e}")
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class RPCError(Exception):
+    pass
+
+
+class EndpointFailure(Exception):
+    """Transport-level failure (timeout, 429, 5xx) that should move on to the next endpoint"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RPCEndpoint:
+    def __init__(self, url):
+        self.url = url
+        self.latency = None     # EWMA of successful round trips, seconds
+        self.failures = 0       # consecutive
+        self.down_until = 0.0
+        self.last_error = None
+
+    def status(self, now=None):
+        now = now or time.time()
+        return {'url': self.url, 'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+                'healthy': self.down_until <= now, 'failures': self.failures, 'last_error': self.last_error}
+
+
+class EndpointPool:
+    """
+    RPC endpoints ranked by observed latency. Failed endpoints cool down with
+    exponential backoff (or the server's Retry-After) and are only tried again,
+    last, once every healthy endpoint has failed. Shared by the sync and async clients.
+    """
+
+    def __init__(self, urls=None, cooldown=ENDPOINT_COOLDOWN, alpha=0.3):
+        self.endpoints = [RPCEndpoint(u) for u in (urls or RPC_ENDPOINTS)]
+        if not self.endpoints:
+            raise ValueError("EndpointPool needs at least one RPC URL")
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+    def ranked(self, now=None):
+        """
+        Healthy endpoints: untried ones first in configured order (so a fresh
+        primary is used, and measured, before any fallback), then measured ones
+        fastest first; cooling endpoints last.
+        """
+        now = now or time.time()
+        with self._lock:
+            order = {ep.url: i for i, ep in enumerate(self.endpoints)}
+            healthy = [ep for ep in self.endpoints if ep.down_until <= now]
+            cooling = [ep for ep in self.endpoints if ep.down_until > now]
+        healthy.sort(key=lambda ep: (ep.latency is not None, ep.latency or 0, order[ep.url]))
+        cooling.sort(key=lambda ep: ep.down_until)
+        return healthy + cooling
+
+    def record_success(self, endpoint, elapsed):
+        with self._lock:
+            endpoint.latency = elapsed if endpoint.latency is None else (
+                self.alpha * elapsed + (1 - self.alpha) * endpoint.latency)
+            endpoint.failures = 0
+            endpoint.down_until = 0.0
+            endpoint.last_error = None
+
+    def record_failure(self, endpoint, error, retry_after=None):
+        with self._lock:
+            endpoint.failures += 1
+            backoff = retry_after if retry_after else self.cooldown * 2 ** min(endpoint.failures - 1, 4)
+            endpoint.down_until = time.time() + backoff
+            endpoint.last_error = str(error)
+
+    def status(self):
+        now = time.time()
+        return [ep.status(now) for ep in self.endpoints]
+
+
+def timeout_for(calls, timeouts=METHOD_TIMEOUTS, default=RPC_TIMEOUT):
+    """A batch gets the longest timeout of the methods it carries"""
+    return max((timeouts.get(method, default) for method, _ in calls), default=default)
+
+
+def build_batch(ids, calls):
+    return [{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+            for i, (method, params) in zip(ids, calls)]
+
+
+def parse_batch(body, ids, calls, raise_errors=True):
+    """Results of a JSON-RPC batch response in call order (see SolanaService.rpc_batch)"""
+    if isinstance(body, dict):
+        # Some gateways answer a failed batch with a single error object
+        raise RPCError(body.get('error', body))
+    by_id = {item.get('id'): item for item in body}
+    results = []
+    for i, (method, _) in zip(ids, calls):
+        item = by_id.get(i)
+        if item is None or 'error' in item:
+            error = RPCError(f"{method}: {item.get('error') if item else 'no response'}")
+            if raise_errors:
+                raise error
+            results.append(error)
+            continue
+        results.append(item['result'])
+    return results
+
+
+def retry_after_seconds(headers):
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
 
 class SolanaService:
-    def __init__(self, rpc_url=None):
-        self.rpc_url = rpc_url or DEFAULT_RPC_URL
+    """
+    JSON-RPC client for the dashboard. The slot comes from one shared websocket
+    slotSubscribe stream; TPS is the streamed slot rate times transactions per
+    slot from performance samples polled in the background. Everything is served
+    from memory, so reruns never wait on the RPC; without a live stream the
+    refresher falls back to polling slot + samples every `ttl` seconds. Requests
+    go to the fastest healthy endpoint in `endpoints` and fail over on timeouts,
+    429s and 5xx.
+    """
+
+    def __init__(self, rpc_url=None, ttl=METRICS_TTL, timeout=RPC_TIMEOUT, endpoints=None, timeouts=None, ws_url=None):
+        self.pool = EndpointPool(endpoints or ([rpc_url] if rpc_url else None))
+        self.rpc_url = self.pool.endpoints[0].url
+        self.ws_url = ws_url or DEFAULT_WS_URL or ws_url_for(self.rpc_url)
+        self._stream = None
+        self.ttl = ttl
+        self.timeout = timeout
+        self.timeouts = {**METHOD_TIMEOUTS, **(timeouts or {})}
+        self._ids = itertools.count(1)
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._metrics = None
+        self._refreshing = False
+        self._refresher = None
+        self._stop = threading.Event()
+        self._last_health_check = 0.0
+        self._lst = None
+        self._lst_history = None
+        self._lst_refresh = threading.Lock()
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    # --- JSON-RPC transport ---
+
+    def _post(self, payload, timeout):
+        """POSTs to the best endpoint, failing over on timeouts, 429s, 5xx and connection errors"""
+        errors = []
+        for endpoint in self.pool.ranked():
+            start = time.perf_counter()
+            try:
+                resp = self._session.post(endpoint.url, json=payload, timeout=timeout)
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    raise EndpointFailure(f"HTTP {resp.status_code}", retry_after_seconds(resp.headers))
+                resp.raise_for_status()
+                body = resp.json()
+            except (EndpointFailure, requests.Timeout, requests.ConnectionError) as e:
+                self.pool.record_failure(endpoint, e, getattr(e, 'retry_after', None))
+                errors.append(f"{endpoint.url}: {e}")
+                continue
+            self.pool.record_success(endpoint, time.perf_counter() - start)
+            return body
+        raise RPCError("all RPC endpoints failed: " + "; ".join(errors))
+
+    def rpc_batch(self, calls, raise_errors=True):
+        """
+        Sends [(method, params), ...] as one JSON-RPC batch and returns the results
+        in call order. Raises RPCError if any call failed, or with raise_errors=False
+        puts the RPCError in that call's slot.
+        """
+        ids = [next(self._ids) for _ in calls]
+        body = self._post(build_batch(ids, calls), timeout_for(calls, self.timeouts, self.timeout))
+        return parse_batch(body, ids, calls, raise_errors)
+
+    def check_health(self):
+        """getHealth against every endpoint, so cooled-down or slow ones are re-ranked"""
+        self._last_health_check = time.time()
+        payload = build_batch([0], [('getHealth', [])])
+        timeout = self.timeouts.get('getHealth', self.timeout)
+        for endpoint in self.pool.endpoints:
+            start = time.perf_counter()
+            try:
+                resp = self._session.post(endpoint.url, json=payload, timeout=timeout)
+                if resp.status_code == 429 or resp.status_code >= 500:
+                    raise EndpointFailure(f"HTTP {resp.status_code}", retry_after_seconds(resp.headers))
+                result = parse_batch(resp.json(), [0], [('getHealth', [])])[0]
+                if result != 'ok':
+                    raise EndpointFailure(f"unhealthy: {result}")
+            except Exception as e:
+                self.pool.record_failure(endpoint, e, getattr(e, 'retry_after', None))
+                continue
+            self.pool.record_success(endpoint, time.perf_counter() - start)
+        return self.pool.status()
+
+    def rpc(self, method, params=None):
+        return self.rpc_batch([(method, params or [])])[0]
+
+    # --- Network metrics ---
+
+    def fetch_network_metrics(self):
+        """One round trip: getSlot + getRecentPerformanceSamples"""
+        slot, samples = self.rpc_batch([
+            ('getSlot', [{'commitment': 'confirmed'}]),
+            ('getRecentPerformanceSamples', [1])
+        ])
+        tps, tx_per_slot = 0, None
+        if samples:
+            sample = samples[0]
+            tps = int(sample['numTransactions'] / max(sample['samplePeriodSecs'], 1))
+            tx_per_slot = sample['numTransactions'] / max(sample.get('numSlots', 0), 1)
+            slot_seconds = sample['samplePeriodSecs'] / max(sample.get('numSlots', 0), 1)
+        return {'tps': tps, 'slot': slot, 'tx_per_slot': tx_per_slot, 'fetched_at': time.time(), 'live': True,
+                'slot_seconds': slot_seconds if samples else None}
+
+    def refresh_metrics(self):
+        """Fetches and stores a fresh snapshot; keeps the last good one on failure"""
         try:
-            self.client = Client(self.rpc_url)
+            metrics = self.fetch_network_metrics()
+            with self._lock:
+                self._metrics = metrics
             self.connected = True
         except Exception as e:
-            print(f"Failed to connect to Solana RPC: {e}")
-            self.client = None
+            print(f"Error fetching Solana network metrics: {e}")
             self.connected = False
+        finally:
+            with self._lock:
+                self._refreshing = False
 
-    def is_connected(self):
-        return self.connected
+    def _refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh_metrics, daemon=True, name="solana-metrics").start()
+
+    def start_slot_stream(self):
+        """Starts the shared slotSubscribe stream (needs the websockets package)"""
+        if self._stream is not None or self.ws_url == 'off':
+            return self._stream
+        from solana_async import SlotStream, ws_connect
+        if ws_connect is None:
+            print("websockets not installed; Solana status falls back to polling")
+            return None
+        self._stream = SlotStream(self.ws_url).start()
+        return self._stream
+
+    def stream_live(self):
+        return self._stream is not None and self._stream.snapshot()['fresh']
+
+    def start_background_refresh(self):
+        """
+        Daemon loop: polls slot + samples every `ttl` seconds, or only every
+        SAMPLES_TTL while the slot stream is live, and re-reads the liquid staking
+        pools whenever their cached yields expire
+        """
+        if self._refresher and self._refresher.is_alive():
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                if len(self.pool.endpoints) > 1 and time.time() - self._last_health_check > HEALTH_CHECK_INTERVAL:
+                    self.check_health()
+                self.refresh_metrics()
+                self.refresh_lst_yields()
+                self._stop.wait(SAMPLES_TTL if self.stream_live() else self.ttl)
+
+        self._stop.clear()
+        self._refresher = threading.Thread(target=loop, daemon=True, name="solana-metrics-loop")
+        self._refresher.start()
+
+    def stop_background_refresh(self):
+        self._stop.set()
+        if self._stream is not None:
+            self._stream.stop()
+
+    def get_network_metrics(self):
+        """
+        Latest metrics from memory, never blocking. `source` is 'websocket' while the
+        slot stream is live, else 'poll' ('estimate' before the first fetch), and
+        `age_s` says how old the slot is. A stale polled snapshot with no refresher
+        running triggers a background refresh.
+        """
+        with self._lock:
+            metrics = self._metrics
+        stream = self._stream.snapshot() if self._stream is not None else None
+        if stream and stream['fresh']:
+            tx_per_slot = metrics.get('tx_per_slot') if metrics else None
+            tps = metrics['tps'] if metrics else 0
+            if tx_per_slot and stream['slots_per_sec']:
+                tps = int(tx_per_slot * stream['slots_per_sec'])
+            return {'tps': tps, 'slot': stream['slot'], 'fetched_at': stream['received_at'],
+                    'age_s': stream['age_s'], 'live': True, 'stale': False, 'source': 'websocket'}
+
+        stale = metrics is None or time.time() - metrics['fetched_at'] > self.ttl
+        if stale and not (self._refresher and self._refresher.is_alive()):
+            self._refresh_async()
+        if metrics is None:
+            return {'tps': 2800 + int(time.time() % 400), 'slot': 245123456 + int(time.time() % 1000),
+                    'fetched_at': None, 'age_s': None, 'live': False, 'stale': True, 'source': 'estimate'}
+        return dict(metrics, stale=stale, age_s=time.time() - metrics['fetched_at'], source='poll')
 
     def get_tps(self):
-        """Estimate generic TPS or get recent performance samples with robust fallback"""
-        if not self.connected:
-            return 2800 + int(time.time() % 400) # Dynamic mock
-        
-        try:
-            # get_recent_performance_samples returns a list of samples
-            response = self.client.get_recent_performance_samples(1)
-            if response.value:
-                sample = response.value[0]
-                # TPS = num_transactions / sample_period_secs
-                tps = int(sample.num_transactions / sample.sample_period_secs)
-                return tps if tps > 0 else 2900
-            return 2900 # Fallback
-        except Exception as e:
-            print(f"Error fetching TPS: {e}")
-            return 2450 + int(time.time() % 500)
+        return self.get_network_metrics()['tps']
 
     def get_slot_height(self):
-        """Get current slot height with dynamic mock fallback"""
-        if not self.connected:
-            return 245123456 + int(time.time() % 1000)
-        try:
-            resp = self.client.get_slot()
-            return resp.value
-        except:
-            return 245123456 + int(time.time() % 1000)
+        return self.get_network_metrics()['slot']
+
+    # --- Accounts ---
 
     def get_balance(self, address_str):
         """Get balance in SOL for a given address"""
-        if not self.connected or not address_str:
+        if not is_valid_address(address_str):
             return 0.0
-        
         try:
-            pubkey = Pubkey.from_string(address_str)
-            resp = self.client.get_balance(pubkey)
+            result = self.rpc('getBalance', [address_str.strip(), {'commitment': 'confirmed'}])
             # Balance is in lamports (1 SOL = 10^9 lamports)
-            return resp.value / 1e9
+            return result['value'] / LAMPORTS_PER_SOL
         except Exception as e:
             print(f"Error fetching balance for {address_str}: {e}")
             return 0.0
 
+    def get_wallet_balances(self, addresses, registry=None, programs=(TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)):
+        """
+        SOL and SPL token balances for many wallets in as few round trips as possible:
+        native lamports via getMultipleAccounts (100 keys per call) plus one
+        getTokenAccountsByOwner per wallet and token program, all packed into JSON-RPC
+        batches of up to RPC_BATCH_LIMIT calls (one HTTP request for ~45 wallets).
+
+        Returns {address: {'balances': {symbol: qty}, 'unknown_mints': {mint: raw_amount},
+        'error': str or None}}. Mints are resolved through the instrument master;
+        mints of non-live (unpriced) instruments are reported as unknown, and
+        wrapped SOL counts towards SOL.
+        """
+        registry = registry or get_registry()
+        wallets = {}
+        valid = []
+        for address in addresses:
+            address = address.strip()
+            if not address or address in wallets:
+                continue
+            ok = is_valid_address(address)
+            wallets[address] = {'balances': {}, 'unknown_mints': {}, 'error': None if ok else 'invalid address'}
+            if ok:
+                valid.append(address)
+        if not valid:
+            return wallets
+
+        calls, owners = [], []
+        for chunk in _chunks(valid, MULTIPLE_ACCOUNTS_LIMIT):
+            # Zero-length data slice: only lamports are needed, not the account data
+            calls.append(('getMultipleAccounts', [chunk, {'encoding': 'base64', 'commitment': 'confirmed',
+                                                          'dataSlice': {'offset': 0, 'length': 0}}]))
+            owners.append(chunk)
+        for address in valid:
+            for program in programs:
+                calls.append(('getTokenAccountsByOwner', [address, {'programId': program},
+                                                          {'encoding': 'base64', 'commitment': 'confirmed'}]))
+                owners.append(address)
+
+        results = []
+        for batch in _chunks(calls, RPC_BATCH_LIMIT):
+            try:
+                results.extend(self.rpc_batch(batch, raise_errors=False))
+            except Exception as e:
+                print(f"Error fetching wallet balances: {e}")
+                results.extend(RPCError(str(e)) for _ in batch)
+
+        sol = (registry.token_for_mint(NATIVE_MINT) or ('SOL', 9))[0]
+        for (method, _), owner, result in zip(calls, owners, results):
+            if isinstance(result, RPCError):
+                for address in ([owner] if isinstance(owner, str) else owner):
+                    wallets[address]['error'] = str(result)
+                continue
+            if method == 'getMultipleAccounts':
+                for address, account in zip(owner, result['value']):
+                    if account and account['lamports']:
+                        balances = wallets[address]['balances']
+                        balances[sol] = balances.get(sol, 0.0) + account['lamports'] / LAMPORTS_PER_SOL
+                continue
+            wallet = wallets[owner]
+            for entry in result['value']:
+                decoded = decode_token_account(base64.b64decode(entry['account']['data'][0]))
+                if decoded is None or not decoded[1]:
+                    continue
+                mint, amount = decoded
+                token = registry.token_for_mint(mint)
+                # Mints of non-live instruments have no price: importing them would add 0-valued holdings
+                if token is None or not registry.instruments[token[0]]['live']:
+                    wallet['unknown_mints'][mint] = wallet['unknown_mints'].get(mint, 0) + amount
+                    continue
+                symbol, decimals = token
+                wallet['balances'][symbol] = wallet['balances'].get(symbol, 0.0) + amount / 10 ** decimals
+        return wallets
+
+    # --- Liquid staking yields ---
+
+    def fetch_lst_state(self):
+        """
+        One round trip: Jito stake pool, Marinade state and the mSOL mint via
+        getMultipleAccounts, plus getEpochInfo. Returns the epoch, its remaining
+        slots and per-pool {rate, rate_epoch, tvl_sol}. Marinade's state has no
+        update epoch, so its rate_epoch is the current one and flagged inferred.
+        """
+        epoch_info, accounts = self.rpc_batch([
+            ('getEpochInfo', [{'commitment': 'confirmed'}]),
+            ('getMultipleAccounts', [[JITO_STAKE_POOL, MARINADE_STATE, MSOL_MINT],
+                                     {'encoding': 'base64', 'commitment': 'confirmed'}])
+        ])
+        jito, marinade, msol_mint = (base64.b64decode(a['data'][0]) if a else None for a in accounts['value'])
+        epoch = epoch_info['epoch']
+        pools = {}
+        if jito:
+            total_lamports, supply, pool_epoch = decode_stake_pool(jito)
+            if supply:
+                pools['Jito Staking'] = {'rate': total_lamports / supply, 'rate_epoch': pool_epoch,
+                                         'tvl_sol': total_lamports / LAMPORTS_PER_SOL}
+        if marinade:
+            price = decode_marinade_price(marinade)
+            supply = MINT_SUPPLY_LAYOUT.unpack_from(memoryview(msol_mint), MINT_SUPPLY_OFFSET)[0] if msol_mint else None
+            pools['Marinade Native'] = {'rate': price, 'rate_epoch': epoch, 'inferred_epoch': True,
+                                        'tvl_sol': supply * price / LAMPORTS_PER_SOL if supply else None}
+        return {'epoch': epoch, 'slots_in_epoch': epoch_info['slotsInEpoch'],
+                'slots_left': epoch_info['slotsInEpoch'] - epoch_info['slotIndex'], 'pools': pools}
+
+    def refresh_lst_yields(self, history_path=LST_HISTORY_PATH):
+        """
+        Re-reads the pools once the cached yields expire (runs on the refresher
+        thread). Rates are recorded once per epoch (persisted to history_path) and
+        the result is cached until the epoch ends, so this is one small batch
+        request per epoch instead of a DefiLlama download. A pool only gets an APY
+        once two epochs of rates are recorded.
+        """
+        with self._lock:
+            cached = self._lst
+        if cached and time.time() < cached['expires_at']:
+            return
+        # One refresh at a time; a concurrent caller just keeps the cached value
+        if not self._lst_refresh.acquire(blocking=False):
+            return
+        try:
+            self._refresh_lst(cached, history_path)
+        finally:
+            self._lst_refresh.release()
+
+    def _refresh_lst(self, cached, history_path):
+        try:
+            state = self.fetch_lst_state()
+        except Exception as e:
+            print(f"Error fetching LST pool state: {e}")
+            # Keep serving the last result (or nothing) and retry after a short backoff
+            with self._lock:
+                self._lst = {'yields': cached['yields'] if cached else {}, 'epoch': cached and cached['epoch'],
+                             'expires_at': time.time() + LST_ERROR_BACKOFF}
+            return
+
+        if self._lst_history is None:
+            self._lst_history = _load_lst_history(history_path)
+        with self._lock:
+            metrics = self._metrics or {}
+        slot_seconds = metrics.get('slot_seconds') or DEFAULT_SLOT_SECONDS
+        epochs_per_year = SECONDS_PER_YEAR / (state['slots_in_epoch'] * slot_seconds)
+        yields, lagging = {}, False
+        for name, pool in state['pools'].items():
+            rates = self._lst_history.setdefault(name, {})
+            latest = max(rates) if rates else None
+            if pool.get('inferred_epoch') and latest is not None and latest < pool['rate_epoch'] \
+                    and rates[latest] == pool['rate']:
+                # Price unchanged since the last epoch: this epoch's update has not run yet
+                pool = dict(pool, rate_epoch=latest)
+            rates[pool['rate_epoch']] = pool['rate']
+            for old in sorted(rates)[:-LST_HISTORY_EPOCHS]:
+                del rates[old]
+            lagging |= pool['rate_epoch'] < state['epoch']
+            apy = lst_apy(rates, epochs_per_year)
+            if apy is not None:
+                yields[name] = {'apy': round(apy, 2), 'tvl_sol': pool['tvl_sol'], 'epoch': pool['rate_epoch']}
+        _save_lst_history(self._lst_history, history_path)
+
+        # Valid until the epoch rolls over; sooner if a pool has not been cranked for this epoch yet
+        ttl = state['slots_left'] * slot_seconds
+        if lagging:
+            ttl = min(ttl, LST_RETRY_SECONDS)
+        with self._lock:
+            self._lst = {'yields': yields, 'epoch': state['epoch'], 'expires_at': time.time() + max(ttl, 60)}
+
+    def get_lst_yields(self):
+        """
+        {'Jito Staking': {'apy', 'tvl_sol', 'epoch'}, 'Marinade Native': {...}} from
+        on-chain exchange rates, never blocking: {} until the refresher has read
+        the pools (callers fall back to DefiLlama). With no refresher running, an
+        expired value triggers a background refresh.
+        """
+        with self._lock:
+            cached = self._lst
+        expired = cached is None or time.time() >= cached['expires_at']
+        if expired and not (self._refresher and self._refresher.is_alive()):
+            threading.Thread(target=self.refresh_lst_yields, daemon=True, name="solana-lst").start()
+        return cached['yields'] if cached else {}
+
+def total_balances(wallets):
+    """Sums get_wallet_balances() output across wallets: {symbol: qty}"""
+    totals = {}
+    for wallet in wallets.values():
+        for symbol, qty in wallet['balances'].items():
+            totals[symbol] = totals.get(symbol, 0.0) + qty
+    return totals
+
+
+# Set once get_solana_service() has started the app's service in this process
+_service = None
+
+
 @st.cache_resource
 def get_solana_service():
-    """Singleton-ish pattern for Streamlit"""
-    return SolanaService()
+    """One service (one slot stream, one background refresher) per server"""
+    global _service
+    service = SolanaService()
+    service.start_slot_stream()
+    service.start_background_refresh()
+    _service = service
+    return service
+
+
+def running_solana_service():
+    """The app's service if it is already running, else None; never starts its threads"""
+    return _service
+
 
 # Mock wrapper for testing without actual RPC calls if needed
 def get_mock_solana_metrics():
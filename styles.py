@@ -1,8 +1,15 @@
+import base64
+import os
+import re
+from functools import lru_cache
+
 import streamlit as st
 
-def apply_custom_styles():
-    """Apply premium financial dashboard styling (Dark/Glassmorphism)"""
-    st.markdown("""
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Served by Streamlit at /app/static/ when server.enableStaticServing is on
+STATIC_URL = "app/static"
+
+CUSTOM_CSS = """
     <style>
     /* Import Professional Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@300;400;500;600;700;800&display=swap');
@@ -498,7 +505,27 @@ def apply_custom_styles():
     }
     
     </style>
-    """, unsafe_allow_html=True)
+"""
+
+
+def minify_css(css):
+    """Strips comments and redundant whitespace from a <style> block"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=1)
+def get_custom_css():
+    """CUSTOM_CSS minified once per process"""
+    return minify_css(CUSTOM_CSS)
+
+
+def apply_custom_styles():
+    """Apply premium financial dashboard styling (Dark/Glassmorphism)"""
+    st.markdown(get_custom_css(), unsafe_allow_html=True)
 
 
 def create_glass_card():
@@ -506,11 +533,9 @@ def create_glass_card():
     return "background: rgba(22, 27, 34, 0.7); backdrop-filter: blur(12px); -webkit-backdrop-filter: blur(12px); border: 1px solid rgba(255, 255, 255, 0.08); border-radius: 16px; padding: 1.5rem; margin-bottom: 1.5rem; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);"
 
 
-import base64
-import os
-
+@lru_cache(maxsize=16)
 def get_img_as_base64(file_path):
-    """Reads an image and returns a base64 string"""
+    """Reads an image and returns a base64 string (read once per process)"""
     try:
         # Use absolute path resolution for robustness in cloud environments
         abs_path = os.path.abspath(file_path)
@@ -526,16 +551,31 @@ def get_img_as_base64(file_path):
         print(f"Error loading image {file_path}: {e}")
         return ""
 
+def get_background_url(img_name):
+    """
+    URL for a background image. Prefers the compressed copy in static/ (see
+    build_logo_assets.py --backgrounds), which the browser fetches and caches once,
+    over inlining the PNG as base64 into every rerun.
+    """
+    static_name = os.path.splitext(img_name)[0] + ".jpg"
+    try:
+        if st.get_option("server.enableStaticServing") and os.path.exists(os.path.join(STATIC_DIR, static_name)):
+            return f"{STATIC_URL}/{static_name}"
+    except Exception:
+        pass
+    img_base64 = get_img_as_base64(os.path.join("assets", img_name))
+    return f"data:image/png;base64,{img_base64}" if img_base64 else ""
+
+@lru_cache(maxsize=1)
 def create_hero_section():
     """Create premium hero section with responsive design"""
-    img_path = os.path.join("assets", "hero_bg.png")
-    img_base64 = get_img_as_base64(img_path)
+    img_url = get_background_url("hero_bg.png")
     
     # Fallback gradient if image fails
     bg_style = "background: linear-gradient(135deg, rgba(59, 130, 246, 0.1) 0%, rgba(99, 102, 241, 0.15) 100%);"
     
-    if img_base64:
-        bg_style = f"background-image: linear-gradient(rgba(0,0,0,0.6), rgba(0,0,0,0.8)), url('data:image/png;base64,{img_base64}'); background-size: cover; background-position: center;"
+    if img_url:
+        bg_style = f"background-image: linear-gradient(rgba(0,0,0,0.6), rgba(0,0,0,0.8)), url('{img_url}'); background-size: cover; background-position: center;"
 
     return f"""<div class="hero-section" style="
         {bg_style}
@@ -555,6 +595,7 @@ def create_hero_section():
         </div>
     </div>"""
 
+@lru_cache(maxsize=8)
 def get_section_background(section_name):
     """Returns CSS to apply a specific background image to the whole app based on the section"""
     images = {
@@ -565,15 +606,15 @@ def get_section_background(section_name):
     }
     
     img_name = images.get(section_name, "hero_bg.png")
-    img_base64 = get_img_as_base64(os.path.join("assets", img_name))
+    img_url = get_background_url(img_name)
     
-    if not img_base64:
+    if not img_url:
         return ""
         
     return f"""
     <style>
     .stApp {{
-        background-image: linear-gradient(rgba(11, 14, 20, 0.7), rgba(11, 14, 20, 0.85)), url('data:image/png;base64,{img_base64}');
+        background-image: linear-gradient(rgba(11, 14, 20, 0.7), rgba(11, 14, 20, 0.85)), url('{img_url}');
         background-size: cover;
         background-position: center;
         background-attachment: fixed;
@@ -587,6 +628,7 @@ def apply_tab_backgrounds():
     pass
 
 
+@lru_cache(maxsize=256)
 def create_stat_card(title, value, change=None, logo_url=None):
     """Create a glassmorphic stat card with logo support"""
     change_html = ""
@@ -618,6 +660,7 @@ def create_metric_card_large(title, value, change=None, logo_url=None):
     """Same as stat card but potentially emphasized"""
     return create_stat_card(title, value, change, logo_url)
 
+@lru_cache(maxsize=32)
 def create_success_banner(message):
     return f"""
     <div style="
@@ -636,6 +679,7 @@ def create_success_banner(message):
     </div>
     """
 
+@lru_cache(maxsize=128)
 def create_health_score_dial(score, level="Optimal"):
     """Create a semi-circular health score dial using SVG"""
     color = "#10B981" if score > 70 else "#F59E0B" if score > 40 else "#EF4444"
@@ -661,6 +705,7 @@ def create_health_score_dial(score, level="Optimal"):
     </div>
     """
 
+@lru_cache(maxsize=64)
 def create_vault_card(name, description, apy, risk, tvl, status, logo_url=None):
     """Create a premium institutional strategy vault card with rigid horizontal alignment"""
     risk_color = "#10B981" if risk == "Low" else "#F59E0B" if risk == "Medium" else "#EF4444"
@@ -0,0 +1,111 @@
+import itertools
+
+from asset_registry import AssetRegistry
+from opportunities import RuleSet
+
+
+def legacy_opportunities(market_data, user_profile):
+    """The hand-written checks check_opportunities() ran before RULES, kept as the reference"""
+    opportunities = []
+    sol_data = market_data.get('SOL', {})
+    btc_data = market_data.get('BTC', {})
+    sol_price = sol_data.get('price', 0)
+    sol_change = sol_data.get('change_24h', 0)
+    btc_change = btc_data.get('change_24h', 0)
+
+    if sol_change < -5:
+        opportunities.append({
+            'type': 'BUY_DIP',
+            'asset': 'Solana (SOL)',
+            'reason': f'SOL is down {abs(sol_change):.1f}% in 24h - potential buy opportunity',
+            'action': f'Consider buying at ${sol_price:.2f} and dollar-cost averaging',
+            'risk': 'Medium'
+        })
+    if abs(sol_change) > 3:
+        opportunities.append({
+            'type': 'YIELD_FARMING',
+            'asset': 'Jito Staking',
+            'reason': f'Market volatility ({abs(sol_change):.1f}%) - lock in stable 8-9% APY',
+            'action': 'Stake SOL on Jito (jito.network) for MEV rewards',
+            'risk': 'Low'
+        })
+    if user_profile.get('risk_tolerance') == 'High':
+        opportunities.append({
+            'type': 'DEFI_POOLS',
+            'asset': 'Raydium Liquidity Pools',
+            'reason': 'High risk tolerance - eligible for 20-25% APY liquidity pools',
+            'action': 'Provide SOL-USDC liquidity on Raydium (raydium.io)',
+            'risk': 'High (Impermanent Loss)'
+        })
+    if user_profile.get('capital', 0) > 5000 and user_profile.get('risk_tolerance') in ['Medium', 'High']:
+        opportunities.append({
+            'type': 'AUTOMATED_VAULTS',
+            'asset': 'Kamino Finance Vaults',
+            'reason': f'Capital of ${user_profile["capital"]:,} can benefit from automated strategies',
+            'action': 'Explore Kamino vaults (kamino.finance) for 25-35% APY',
+            'risk': 'High (Leverage Risk)'
+        })
+    if btc_change < -3 and user_profile.get('risk_tolerance') in ['Low', 'Medium']:
+        opportunities.append({
+            'type': 'BTC_DCA',
+            'asset': 'Bitcoin (BTC)',
+            'reason': f'BTC down {abs(btc_change):.1f}% - good time to dollar-cost average',
+            'action': 'Add to Bitcoin holdings as digital gold hedge',
+            'risk': 'Medium'
+        })
+    if user_profile.get('age', 30) < 35 and user_profile.get('risk_tolerance') != 'High':
+        opportunities.append({
+            'type': 'REBALANCE',
+            'asset': 'Portfolio Rebalance',
+            'reason': 'Young age + long timeline - consider increasing growth allocation',
+            'action': 'Review portfolio: Target 70% stocks, 20% crypto, 10% bonds',
+            'risk': 'Low'
+        })
+    return opportunities
+
+
+def market_snapshot(sol_change, btc_change):
+    """SOL/BTC around the rule thresholds plus tickers no rule looks at"""
+    def quote(price, change):
+        history = [{'date': f"2026-01-{d:02d}", 'price': price * (1 + d / 1000)} for d in range(1, 31)]
+        return {'price': price, 'change_24h': change, 'history': history}
+    return {
+        'SOL': quote(142.37, sol_change),
+        'BTC': quote(64250.5, btc_change),
+        'ETH': quote(3120.0, sol_change),
+        'AAPL': quote(189.9, btc_change)
+    }
+
+
+# Values on and around every threshold in RULES
+SOL_CHANGES = (-8.25, -5.0, -4.99, -3.0, 0.0, 3.0, 3.01, 6.5)
+BTC_CHANGES = (-4.5, -3.0, -2.99, 1.2)
+RISKS = ('Low', 'Medium', 'High')
+CAPITALS = (1000, 5000, 5001, 15000)
+AGES = (25, 34, 35)
+
+
+def compare_grid(ruleset):
+    """Checks every grid case against the legacy output (same dicts, same order, unique alert keys)"""
+    cases = 0
+    for sol_change, btc_change in itertools.product(SOL_CHANGES, BTC_CHANGES):
+        market_data = market_snapshot(sol_change, btc_change)
+        for risk, capital, age in itertools.product(RISKS, CAPITALS, AGES):
+            profile = {'age': age, 'risk_tolerance': risk, 'capital': capital}
+            expected = legacy_opportunities(market_data, profile)
+            assert ruleset.scan(market_data, profile) == expected, (sol_change, btc_change, profile)
+
+            keys = [ruleset.alert_key(m) for m in ruleset.evaluate(market_data, profile)]
+            assert len(set(keys)) == len(keys), keys
+            assert [k.split(':')[0] for k in keys] == [o['type'] for o in expected], keys
+            cases += 1
+    return cases
+
+
+def test_ruleset_matches_legacy_scanner():
+    assert compare_grid(RuleSet(registry=AssetRegistry.from_csv())) == 1152
+
+
+if __name__ == "__main__":
+    cases = compare_grid(RuleSet(registry=AssetRegistry.from_csv()))
+    print(f"RuleSet matches the legacy scanner on {cases} cases")
@@ -1,9 +1,15 @@
 import os
-import google.generativeai as genai
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import time
 import json
 
+from audio_pipeline import prepare_audio
+from llm_gateway import generate_content
+from render_profiler import timed
+
 # Robust env loading
 gemini_key = os.environ.get('GEMINI_API_KEY')
 if not gemini_key:
@@ -24,25 +30,61 @@ if not gemini_key:
             if gemini_key: break
     except: pass
 
-def get_gemini_response(prompt, audio_data=None):
+VOICE_MODEL = "gemini-1.5-flash"
+INTAKE_CACHE_SIZE = 32
+
+PROFILE_FIELDS = ('age', 'income', 'capital', 'monthly', 'timeline', 'risk_tolerance', 'goal')
+RISK_LEVELS = ('Low', 'Medium', 'High')
+PROFILE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "age": {"type": "INTEGER"},
+        "income": {"type": "INTEGER", "description": "yearly income"},
+        "capital": {"type": "INTEGER", "description": "savings available to invest"},
+        "monthly": {"type": "INTEGER", "description": "monthly contribution"},
+        "timeline": {"type": "INTEGER", "description": "investment horizon in years"},
+        "risk_tolerance": {"type": "STRING", "enum": list(RISK_LEVELS)},
+        "goal": {"type": "STRING"}
+    }
+}
+
+INTAKE_PROMPT = """
+Listen to this recording from a user of a personal finance app.
+- "transcript": exactly what was said.
+- "profile": financial profile details the speaker states about themselves.
+  Leave out every field that was not said; never guess.
+"""
+ADVICE_INSTRUCTIONS = """
+- "answer": your answer to the spoken question, following these instructions.
+  Details the speaker states about themselves override the USER CONTEXT.
+"""
+SPOKEN_QUESTION = "the question asked in this recording"
+
+# Intake results by (audio sha256, advice prompt sha256 or None): a retry or rerun with the same
+# recording and the same sidebar context never re-uploads it
+_intake_cache = OrderedDict()
+_intake_lock = threading.Lock()
+
+
+def audio_part(audio_data):
+    """Inline audio for a Gemini request, preprocessed to a fraction of the raw recorder upload"""
+    with timed("audio_prepare", kind='build'):
+        payload, mime_type = prepare_audio(bytes(audio_data))
+    return {"mime_type": mime_type, "data": payload}
+
+
+def get_gemini_response(prompt, audio_data=None, generation_config=None, scope=None):
     """Generic helper for Gemini calls with optional audio"""
     if not gemini_key:
         print("Missing Gemini API Key")
         return "ERROR: Missing API Key. Please ensure GEMINI_API_KEY is set in .env"
         
     try:
-        genai.configure(api_key=gemini_key)
-        # Using a more stable model name
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        
         content = [prompt]
         if audio_data:
-            content.append({
-                "mime_type": "audio/wav", 
-                "data": audio_data
-            })
+            content.append(audio_part(audio_data))
             
-        response = model.generate_content(content)
+        response = generate_content(gemini_key, VOICE_MODEL, content, generation_config, scope)
         return response.text
     except Exception as e:
         error_msg = str(e).lower()
@@ -51,52 +93,129 @@ def get_gemini_response(prompt, audio_data=None):
             return "ERROR: API capacity reached. Please use manual input while we rebalance."
         return f"ERROR: {error_msg}"
 
-def transcribe_voice(audio_bytes):
-    """Simple transcription of audio bytes"""
-    prompt = "Transcribe this audio exactly as spoken. Return only the text."
-    return get_gemini_response(prompt, audio_bytes)
 
-def extract_profile_from_voice(audio_bytes):
-    """Extracts financial profile data from audio"""
-    prompt = """
-    Analyze this audio for financial profile information. 
-    Extract the following fields in JSON format:
-    - age (integer)
-    - income (integer)
-    - capital (integer)
-    - monthly (integer)
-    - timeline (integer)
-    - risk_tolerance (one of: Low, Medium, High)
-    - goal (string)
-    
-    Only return a raw valid JSON object. No Markdown.
+def _parse_json(response_text):
+    clean_json = response_text.strip()
+    # Clean up Markdown formatting if present
+    if '```json' in clean_json:
+        clean_json = clean_json.split('```json')[1].split('```')[0].strip()
+    elif '```' in clean_json:
+        clean_json = clean_json.split('```')[1].split('```')[0].strip()
+    return json.loads(clean_json)
+
+
+def _clean_profile(raw):
+    """Every PROFILE_FIELDS key, None where nothing usable was said"""
+    profile = dict.fromkeys(PROFILE_FIELDS)
+    if not isinstance(raw, dict):
+        return profile
+    for field in ('age', 'income', 'capital', 'monthly', 'timeline'):
+        try:
+            value = int(float(raw.get(field)))
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            profile[field] = value
+    risk = str(raw.get('risk_tolerance') or '').strip().title()
+    if risk in RISK_LEVELS:
+        profile['risk_tolerance'] = risk
+    if isinstance(raw.get('goal'), str) and raw['goal'].strip():
+        profile['goal'] = raw['goal'].strip()
+    return profile
+
+
+def voice_intake(audio_bytes, advice_prompt=None):
+    """
+    Uploads a recording once and returns {'transcript', 'profile', 'answer', 'audio_sha256'}
+    from a single JSON-schema call, or {'error': message}. With advice_prompt
+    the same call also answers the spoken question ('answer' is None otherwise).
+    Successful results are cached by audio hash and advice prompt, so a changed
+    profile or market narrative gets a fresh answer.
     """
-    response_text = get_gemini_response(prompt, audio_bytes)
+    digest = hashlib.sha256(bytes(audio_bytes)).hexdigest()
+    prompt_digest = hashlib.sha256(advice_prompt.encode('utf-8')).hexdigest() if advice_prompt is not None else None
+    key = (digest, prompt_digest)
+    with _intake_lock:
+        cached = key if key in _intake_cache else None
+        if cached is None and prompt_digest is None:
+            # Any answered intake of the same audio also serves plain transcript/profile lookups
+            cached = next((k for k in reversed(_intake_cache) if k[0] == digest), None)
+        if cached is not None:
+            _intake_cache.move_to_end(cached)
+            return _intake_cache[cached]
+
+    properties = {"transcript": {"type": "STRING"}, "profile": PROFILE_SCHEMA}
+    prompt = INTAKE_PROMPT
+    if advice_prompt is not None:
+        properties["answer"] = {"type": "STRING", "description": "Markdown"}
+        prompt = INTAKE_PROMPT + ADVICE_INSTRUCTIONS + advice_prompt
+    generation_config = {
+        "response_mime_type": "application/json",
+        "response_schema": {"type": "OBJECT", "properties": properties, "required": list(properties)}
+    }
+    response_text = get_gemini_response(prompt, audio_bytes, generation_config,
+                                        scope=f"voice:{digest[:16]}:{'advice' if advice_prompt else 'intake'}")
     if not response_text or response_text.startswith("ERROR:"):
         return {"error": "Voice recognition failed. Please try again."}
-        
     try:
-        # Clean up Markdown formatting if present
-        clean_json = response_text.strip()
-        if '```json' in clean_json:
-            clean_json = clean_json.split('```json')[1].split('```')[0].strip()
-        elif '```' in clean_json:
-            clean_json = clean_json.split('```')[1].split('```')[0].strip()
-            
-        data = json.loads(clean_json)
-        # Ensure it's a dict
-        if not isinstance(data, dict):
-            return {"error": "Invalid response format. Please try again."}
-        return data
-    except Exception as e:
+        data = _parse_json(response_text)
+    except Exception:
         return {"error": "Could not understand audio. Please speak clearly."}
+    if not isinstance(data, dict):
+        return {"error": "Invalid response format. Please try again."}
+
+    result = {
+        'transcript': str(data.get('transcript') or '').strip(),
+        'profile': _clean_profile(data.get('profile')),
+        'answer': data.get('answer') or None,
+        'audio_sha256': digest
+    }
+    with _intake_lock:
+        _intake_cache[key] = result
+        while len(_intake_cache) > INTAKE_CACHE_SIZE:
+            _intake_cache.popitem(last=False)
+    return result
+
+
+def transcribe_voice(audio_bytes):
+    """Simple transcription of audio bytes"""
+    intake = voice_intake(audio_bytes)
+    if 'error' in intake:
+        return f"ERROR: {intake['error']}"
+    return intake['transcript']
+
+def extract_profile_from_voice(audio_bytes):
+    """Extracts financial profile data from audio"""
+    intake = voice_intake(audio_bytes)
+    if 'error' in intake:
+        return {"error": intake['error']}
+    return intake['profile']
 
 def process_voice_advisor_query(audio_bytes, user_context=None):
-    """Processes a voice query for the advisor agent"""
-    # First transcribe
-    question = transcribe_voice(audio_bytes)
+    """
+    Processes a voice query for the advisor agent. One upload returns the
+    question, any profile details spoken with it and the answer; the compliance
+    audit is the only other call (was: transcription, answer, audit).
+    """
+    from advisor_agent import build_advice_prompt, build_audit_prompt, get_investment_advice, get_market_narrative
+
+    context = dict(user_context or {})
+    market_narrative = get_market_narrative() if get_market_narrative else "Stable markets."
+    intake = voice_intake(audio_bytes, build_advice_prompt(SPOKEN_QUESTION, context, market_narrative))
+    question = intake.get('transcript')
     if not question or len(question.strip()) < 2:
         return "Sorry, I couldn't understand the audio. Please try again."
-        
-    from advisor_agent import get_investment_advice
-    return get_investment_advice(question, user_context or {})
+
+    # Details spoken with the question ("I'm 45 and careful...") apply to this answer
+    context.update({k: v for k, v in intake['profile'].items() if v and k in ('age', 'risk_tolerance', 'goal')})
+    answer = intake['answer']
+    if answer:
+        audit = get_gemini_response(build_audit_prompt(answer, context))
+        if not audit.startswith("ERROR:") and "FAIL" not in audit:
+            return answer
+        reason = f"audit: {audit.strip()[:200]}"
+    else:
+        reason = "no answer in the intake response"
+    # The text advisor costs at least two more calls (answer + audit) on top of the intake
+    print(f"Voice answer not used ({reason}); falling back to get_investment_advice")
+    return get_investment_advice(question, context)